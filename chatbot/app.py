@@ -1,133 +1,615 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, session
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, disconnect
+import hmac
+import json
 import numpy as np
-import pandas as pd
-import pickle
-from difflib import get_close_matches
 import os
 import logging
+import threading
 import time
 import uuid
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from bundle import BUNDLE_FILE, BundleError, load_bundle
+from catalog import SymptomCatalog
+import fast_json
+from inference import LinearOvOClassifier
+from microbatch import BATCH_SIZE_BUCKETS, MicroBatcher
+from metrics import CONTENT_TYPE, CallbackGauge, Counter, Gauge, Histogram, Registry, StageTimer
+from knowledge import build_knowledge_index, build_disease_info, render_chat_headline
+from lexicon import LEXICON_FILE, SymptomLexicon
+from log_config import dropped_records, setup_logging
+from phrase_matcher import PhraseMatcher
+from prediction_cache import PredictionCache, mask_indices, symptom_mask
+from rate_limit import PendingQueue, RateLimiter
+from session_store import create_session_store, new_session_state
+from signatures import SignatureTable
+from snapshot import Snapshot, SnapshotError, smoke_test
+from symptom_matcher import SymptomMatcher, space_form
+
+# Configure logging; records are written by a background thread
+setup_logging()
 logger = logging.getLogger(__name__)
+# High-frequency events, kept separate so they can be sampled with LOG_SAMPLE_RATES
+connection_logger = logging.getLogger('chatbot.connections')
+message_logger = logging.getLogger('chatbot.messages')
 
 # Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 
+# Upper bound on the number of symptom sets accepted by /api/predict/batch
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 1000))
+
 # CORS configuration
 CORS(app, origins=["http://localhost:5173", "http://frontend:5173"])
 
+# Seconds to wait before answering a chat message; 0 leaves pacing to the client
+CHAT_RESPONSE_DELAY = float(os.environ.get('CHAT_RESPONSE_DELAY', 0))
+
+# Chat flood control: token buckets per socket session and per user id, refilled
+# at RATE messages per second up to BURST; a rate of 0 disables the limit
+CHAT_RATE = float(os.environ.get('CHAT_RATE', 1))
+CHAT_BURST = int(os.environ.get('CHAT_BURST', 5))
+# user_id comes from the client unverified, so the per-user limit is off unless a
+# gateway in front authenticates it; otherwise anyone could exhaust another user's bucket
+CHAT_USER_RATE = float(os.environ.get('CHAT_USER_RATE', 0))
+CHAT_USER_BURST = int(os.environ.get('CHAT_USER_BURST', 10))
+# Messages waiting behind the one being answered, per connection; beyond that
+# they are merged into the newest waiting message ('coalesce') or dropped ('drop')
+CHAT_MAX_PENDING = int(os.environ.get('CHAT_MAX_PENDING', 2))
+CHAT_OVERFLOW = os.environ.get('CHAT_OVERFLOW', 'coalesce')
+
 # SocketIO configuration
-socketio = SocketIO(
-    app, 
-    cors_allowed_origins=["http://localhost:5173", "http://frontend:5173"],
-    logger=True,
-    engineio_logger=True
-)
+def socketio_options(environ=os.environ):
+    """SocketIO settings; a message queue lets several replicas deliver each other's emits"""
+    options = {
+        'async_mode': environ.get('SOCKETIO_ASYNC_MODE') or None,
+        'cors_allowed_origins': ["http://localhost:5173", "http://frontend:5173"],
+        # Logger objects, so their levels follow LOG_LEVELS instead of being forced to INFO
+        'logger': logging.getLogger('socketio.server'),
+        'engineio_logger': logging.getLogger('engineio.server'),
+    }
+    message_queue = environ.get('SOCKETIO_MESSAGE_QUEUE')
+    if message_queue:
+        options['message_queue'] = message_queue
+        options['channel'] = environ.get('SOCKETIO_CHANNEL', 'flask-socketio')
+    # Long-polling needs sticky sessions behind a load balancer; websocket-only does not
+    transports = environ.get('SOCKETIO_TRANSPORTS')
+    if transports:
+        options['transports'] = [t.strip() for t in transports.split(',') if t.strip()]
+    return options
 
-# Load datasets
-try:
-    sym_des = pd.read_csv("symtoms_df.csv")
-    precautions = pd.read_csv("precautions_df.csv")
-    workout = pd.read_csv("workout_df.csv")
-    description = pd.read_csv("description.csv")
-    medications = pd.read_csv('medications.csv')
-    diets = pd.read_csv("diets.csv")
-    logger.info("Datasets loaded successfully")
-except Exception as e:
-    logger.error(f"Error loading datasets: {str(e)}")
-    raise e
+socketio = SocketIO(app, **socketio_options())
 
-# Load model
+# Prometheus metrics served at /metrics
+metrics_registry = Registry()
+stage_latency = metrics_registry.register(Histogram(
+    'chatbot_stage_seconds', 'Time spent in each stage of a request', ('handler', 'stage')
+))
+model_latency = metrics_registry.register(Histogram(
+    'chatbot_model_seconds', 'Time spent in the classifier on prediction cache misses', ('call',)
+))
+batch_size_histogram = metrics_registry.register(Histogram(
+    'chatbot_batch_size', 'Predictions coalesced into one micro-batched model call', buckets=BATCH_SIZE_BUCKETS
+))
+batch_wait_histogram = metrics_registry.register(Histogram(
+    'chatbot_batch_queue_wait_seconds', 'Time a prediction waited for its micro-batch to run'
+))
+suggestion_latency = metrics_registry.register(Histogram(
+    'chatbot_suggestion_seconds', 'Time spent suggesting matches for one unknown symptom'
+))
+predictions_counter = metrics_registry.register(Counter(
+    'chatbot_predictions_total', 'Predictions served, by disease', ('disease',)
+))
+symptoms_counter = metrics_registry.register(Counter(
+    'chatbot_symptoms_total', 'Submitted symptoms, by whether they are known', ('result',)
+))
+socket_connections = metrics_registry.register(Gauge(
+    'chatbot_socket_connections', 'Open Socket.IO connections'
+))
+throttled_counter = metrics_registry.register(Counter(
+    'chatbot_messages_throttled_total', 'Chat messages rate limited, coalesced or dropped, by reason', ('reason',)
+))
+metrics_registry.register(CallbackGauge(
+    'chatbot_pending_messages', 'Chat messages waiting behind the one being answered on their connection',
+    lambda: pending_messages.pending()
+))
+reloads_counter = metrics_registry.register(Counter(
+    'chatbot_reloads_total', 'Bundle reloads, by outcome', ('result',)
+))
+metrics_registry.register(CallbackGauge(
+    'chatbot_prediction_cache_hits_total', 'Prediction cache hits',
+    lambda: prediction_cache.hits, kind='counter'
+))
+metrics_registry.register(CallbackGauge(
+    'chatbot_prediction_cache_misses_total', 'Prediction cache misses',
+    lambda: prediction_cache.misses, kind='counter'
+))
+metrics_registry.register(CallbackGauge(
+    'chatbot_prediction_cache_hit_ratio', 'Share of prediction cache lookups that hit',
+    lambda: prediction_cache.stats()['hit_ratio']
+))
+metrics_registry.register(CallbackGauge(
+    'chatbot_signature_table_hits_total', 'Predictions answered from the training pattern table',
+    lambda: snapshot.signature_table.hits, kind='counter'
+))
+metrics_registry.register(CallbackGauge(
+    'chatbot_signature_table_misses_total', 'Predictions left to the model because the pattern is unseen',
+    lambda: snapshot.signature_table.misses, kind='counter'
+))
+metrics_registry.register(CallbackGauge(
+    'chatbot_signature_table_hit_ratio', 'Share of predictions answered from the training pattern table',
+    lambda: snapshot.signature_table.stats()['hit_ratio']
+))
+metrics_registry.register(CallbackGauge(
+    'chatbot_log_records_dropped_total', 'Log records dropped because the log queue was full',
+    dropped_records, kind='counter'
+))
+
+def suggestion_cache_hit_ratio():
+    info = snapshot.symptom_matcher.cache_info()
+    lookups = info.hits + info.misses
+    return info.hits / lookups if lookups else 0.0
+
+metrics_registry.register(CallbackGauge(
+    'chatbot_suggestion_cache_hit_ratio', 'Share of fuzzy suggestion lookups served from the cache',
+    suggestion_cache_hit_ratio
+))
+
+# Intent keywords, matched on word boundaries together with the symptom phrases
+GREETING_KEYWORDS = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening']
+HELP_KEYWORDS = ['help', 'how', 'what can you do']
+RESET_KEYWORDS = ['start over', 'reset', 'new diagnosis']
+
+def build_chat_matcher(symptoms_dict, lexicon=None):
+    """Compile symptom phrases, their synonyms and intent keywords into a single automaton"""
+    phrases = [(space_form(symptom), ('symptom', symptom)) for symptom in symptoms_dict]
+    if lexicon is not None:
+        for phrase, symptoms in lexicon.synonyms.items():
+            phrases.extend((phrase, ('synonym', symptom)) for symptom in symptoms)
+    for intent, keywords in (('greeting', GREETING_KEYWORDS), ('help', HELP_KEYWORDS), ('reset', RESET_KEYWORDS)):
+        phrases.extend((keyword, ('intent', intent)) for keyword in keywords)
+    return PhraseMatcher(phrases)
+
+# The bundle served at startup and by every reload
+BUNDLE_PATH = os.environ.get('CHATBOT_BUNDLE', BUNDLE_FILE)
+SUGGESTION_CACHE_SIZE = int(os.environ.get('SUGGESTION_CACHE_SIZE', 1024))
+# Lay terms and synonyms for symptom names; re-read on every reload
+SYNONYMS_PATH = os.environ.get('CHATBOT_SYNONYMS', LEXICON_FILE)
+
+# Seconds between checks of the bundle file in each worker; 0 leaves reloads to /admin/reload
+BUNDLE_WATCH_INTERVAL = float(os.environ.get('CHATBOT_BUNDLE_WATCH_INTERVAL', 0))
+
+# Micro-batching of concurrent model calls; a window of 0 predicts every row on its own
+PREDICTION_BATCH_WINDOW = float(os.environ.get('PREDICTION_BATCH_WINDOW_MS', 0)) / 1000
+PREDICTION_BATCH_MAX = int(os.environ.get('PREDICTION_BATCH_MAX', 32))
+
+def disease_payload(disease, info):
+    """The disease part of a /api/predict response, from its knowledge entry"""
+    return {
+        "disease": disease,
+        "description": info.description,
+        "precautions": info.precautions,
+        "medications": info.medications,
+        "diet": info.diet,
+        "workout": info.workout
+    }
+
+def build_batcher(svc, n_features):
+    """Micro-batcher that predicts queued symptom index lists with one matrix call"""
+    def predict_batch(rows):
+        input_matrix = np.zeros((len(rows), n_features))
+        for row, active_indices in enumerate(rows):
+            input_matrix[row, active_indices] = 1
+        started = time.perf_counter()
+        labels = svc.predict(input_matrix)
+        model_latency.observe(time.perf_counter() - started, 'microbatch')
+        return labels
+    return MicroBatcher(
+        predict_batch, window=PREDICTION_BATCH_WINDOW, max_batch=PREDICTION_BATCH_MAX,
+        batch_sizes=batch_size_histogram, queue_waits=batch_wait_histogram,
+    )
+
+def load_snapshot(path=None):
+    """Load a bundle and build everything served from it into a new snapshot"""
+    path = path or BUNDLE_PATH
+    bundle = load_bundle(path)
+    symptoms_dict = bundle.symptoms_dict
+    diseases_list = bundle.diseases_list
+    svc = LinearOvOClassifier.from_arrays(bundle.arrays)
+    knowledge_index = build_knowledge_index(bundle.knowledge, diseases=diseases_list.values())
+    symptom_lexicon = SymptomLexicon.from_file(symptoms_dict, SYNONYMS_PATH)
+    return Snapshot(
+        path=path,
+        # Identifies the served model and knowledge; the bundle hash covers both
+        version=bundle.content_hash[:16],
+        bundle=bundle,
+        svc=svc,
+        # Gevent leaves no unpatched locks for its threadpool to wait on, so it predicts unbatched
+        batcher=(build_batcher(svc, len(symptoms_dict))
+                 if PREDICTION_BATCH_WINDOW > 0 and socketio.async_mode != 'gevent' else None),
+        # Labels of the training patterns, answered without the classifier
+        signature_table=SignatureTable.from_arrays(bundle.arrays),
+        # Symptoms dictionary and label map, in training column / label encoder order
+        symptoms_dict=symptoms_dict,
+        symptom_names=bundle.features,
+        diseases_list=diseases_list,
+        # Per-disease knowledge, compiled once so each lookup is a single dict access
+        knowledge_index=knowledge_index,
+        # The disease part of every prediction response, encoded once
+        prediction_json={disease: fast_json.dumps(disease_payload(disease, info))
+                         for disease, info in knowledge_index.items()},
+        # Sorted, versioned symptom list with its response bodies encoded once
+        symptom_catalog=SymptomCatalog(symptoms_dict),
+        # Exact lookup of symptom names and lay terms, consulted before fuzzy matching
+        symptom_lexicon=symptom_lexicon,
+        # Fuzzy matcher over symptom names, with an LRU of recent misspellings
+        symptom_matcher=SymptomMatcher(symptoms_dict, cutoff=0.6, cache_size=SUGGESTION_CACHE_SIZE),
+        chat_matcher=build_chat_matcher(symptoms_dict, symptom_lexicon),
+    )
+
+# Load the compiled bundle: feature index, label map, disease knowledge and model weights.
+# Handlers read `snapshot` once per request; reload_snapshot replaces it as a whole.
 try:
-    svc = pickle.load(open('svc.pkl','rb'))
-    logger.info("Model loaded successfully")
+    snapshot = load_snapshot()
+    smoke_test(snapshot)
+    logger.info(f"Bundle loaded successfully ({snapshot.version}), "
+                f"{len(snapshot.signature_table)} training patterns")
 except Exception as e:
-    logger.error(f"Error loading model: {str(e)}")
+    logger.error(f"Error loading bundle: {str(e)}")
     raise e
 
-# Symptoms dictionary
-symptoms_dict = {'itching': 0, 'skin_rash': 1, 'nodal_skin_eruptions': 2, 'continuous_sneezing': 3, 'shivering': 4, 'chills': 5, 'joint_pain': 6, 'stomach_pain': 7, 'acidity': 8, 'ulcers_on_tongue': 9, 'muscle_wasting': 10, 'vomiting': 11, 'burning_micturition': 12, 'spotting_ urination': 13, 'fatigue': 14, 'weight_gain': 15, 'anxiety': 16, 'cold_hands_and_feets': 17, 'mood_swings': 18, 'weight_loss': 19, 'restlessness': 20, 'lethargy': 21, 'patches_in_throat': 22, 'irregular_sugar_level': 23, 'cough': 24, 'high_fever': 25, 'sunken_eyes': 26, 'breathlessness': 27, 'sweating': 28, 'dehydration': 29, 'indigestion': 30, 'headache': 31, 'yellowish_skin': 32, 'dark_urine': 33, 'nausea': 34, 'loss_of_appetite': 35, 'pain_behind_the_eyes': 36, 'back_pain': 37, 'constipation': 38, 'abdominal_pain': 39, 'diarrhoea': 40, 'mild_fever': 41, 'yellow_urine': 42, 'yellowing_of_eyes': 43, 'acute_liver_failure': 44, 'fluid_overload': 45, 'swelling_of_stomach': 46, 'swelled_lymph_nodes': 47, 'malaise': 48, 'blurred_and_distorted_vision': 49, 'phlegm': 50, 'throat_irritation': 51, 'redness_of_eyes': 52, 'sinus_pressure': 53, 'runny_nose': 54, 'congestion': 55, 'chest_pain': 56, 'weakness_in_limbs': 57, 'fast_heart_rate': 58, 'pain_during_bowel_movements': 59, 'pain_in_anal_region': 60, 'bloody_stool': 61, 'irritation_in_anus': 62, 'neck_pain': 63, 'dizziness': 64, 'cramps': 65, 'bruising': 66, 'obesity': 67, 'swollen_legs': 68, 'swollen_blood_vessels': 69, 'puffy_face_and_eyes': 70, 'enlarged_thyroid': 71, 'brittle_nails': 72, 'swollen_extremeties': 73, 'excessive_hunger': 74, 'extra_marital_contacts': 75, 'drying_and_tingling_lips': 76, 'slurred_speech': 77, 'knee_pain': 78, 'hip_joint_pain': 79, 'muscle_weakness': 80, 'stiff_neck': 81, 'swelling_joints': 82, 'movement_stiffness': 83, 'spinning_movements': 84, 'loss_of_balance': 85, 'unsteadiness': 86, 'weakness_of_one_body_side': 87, 'loss_of_smell': 88, 'bladder_discomfort': 89, 'foul_smell_of urine': 90, 'continuous_feel_of_urine': 91, 'passage_of_gases': 92, 'internal_itching': 93, 'toxic_look_(typhos)': 94, 'depression': 95, 'irritability': 96, 'muscle_pain': 97, 'altered_sensorium': 98, 'red_spots_over_body': 99, 'belly_pain': 100, 'abnormal_menstruation': 101, 'dischromic _patches': 102, 'watering_from_eyes': 103, 'increased_appetite': 104, 'polyuria': 105, 'family_history': 106, 'mucoid_sputum': 107, 'rusty_sputum': 108, 'lack_of_concentration': 109, 'visual_disturbances': 110, 'receiving_blood_transfusion': 111, 'receiving_unsterile_injections': 112, 'coma': 113, 'stomach_bleeding': 114, 'distention_of_abdomen': 115, 'history_of_alcohol_consumption': 116, 'fluid_overload.1': 117, 'blood_in_sputum': 118, 'prominent_veins_on_calf': 119, 'palpitations': 120, 'painful_walking': 121, 'pus_filled_pimples': 122, 'blackheads': 123, 'scurring': 124, 'skin_peeling': 125, 'silver_like_dusting': 126, 'small_dents_in_nails': 127, 'inflammatory_nails': 128, 'blister': 129, 'red_sore_around_nose': 130, 'yellow_crust_ooze': 131}
+# Predictions keyed by the bitmask of valid symptoms; bound to the snapshot version
+prediction_cache = PredictionCache(
+    maxsize=int(os.environ.get('PREDICTION_CACHE_SIZE', 4096)),
+    ttl=float(os.environ.get('PREDICTION_CACHE_TTL', 0)),
+    version=snapshot.version,
+)
 
-diseases_list = {15: 'Fungal infection', 4: 'Allergy', 16: 'GERD', 9: 'Chronic cholestasis', 14: 'Drug Reaction', 33: 'Peptic ulcer diseae', 1: 'AIDS', 12: 'Diabetes ', 17: 'Gastroenteritis', 6: 'Bronchial Asthma', 23: 'Hypertension ', 30: 'Migraine', 7: 'Cervical spondylosis', 32: 'Paralysis (brain hemorrhage)', 28: 'Jaundice', 29: 'Malaria', 8: 'Chicken pox', 11: 'Dengue', 37: 'Typhoid', 40: 'hepatitis A', 19: 'Hepatitis B', 20: 'Hepatitis C', 21: 'Hepatitis D', 22: 'Hepatitis E', 3: 'Alcoholic hepatitis', 36: 'Tuberculosis', 10: 'Common Cold', 34: 'Pneumonia', 13: 'Dimorphic hemmorhoids(piles)', 18: 'Heart attack', 39: 'Varicose veins', 26: 'Hypothyroidism', 24: 'Hyperthyroidism', 25: 'Hypoglycemia', 31: 'Osteoarthristis', 5: 'Arthritis', 0: '(vertigo) Paroymsal  Positional Vertigo', 2: 'Acne', 38: 'Urinary tract infection', 35: 'Psoriasis', 27: 'Impetigo'}
+SYMPTOM_CATALOG_MAX_AGE = int(os.environ.get('SYMPTOM_CATALOG_MAX_AGE', 300))
 
-def helper(dis):
-    """Get disease information including description, precautions, medications, diet, and workout"""
+# Token for the /admin endpoints; they are disabled when it is unset
+ADMIN_TOKEN = os.environ.get('CHATBOT_ADMIN_TOKEN')
+
+# Accumulated symptoms and last prediction per chat session
+session_store = create_session_store(
+    os.environ.get('CHAT_SESSION_STORE_URL'),
+    maxsize=int(os.environ.get('CHAT_SESSION_MAX', 10000)),
+    ttl=float(os.environ.get('CHAT_SESSION_TTL', 1800)),
+)
+
+# Serializes reloads; readers never lock, they only take the current snapshot
+reload_lock = threading.Lock()
+
+def reload_snapshot(path=None):
+    """
+    Load the bundle into a fresh snapshot, smoke test it and swap it in.
+
+    Returns (previous, current). A bundle that fails to load or to pass the
+    smoke test raises and leaves the served snapshot untouched.
+    """
+    global snapshot
+    path = path or BUNDLE_PATH
+    with reload_lock:
+        previous = snapshot
+        try:
+            candidate = load_snapshot(path)
+            smoke_test(candidate)
+        except Exception:
+            reloads_counter.inc('failed')
+            raise
+        # The bundle hash does not cover the synonym file, so a lexicon-only edit is compared on its own
+        unchanged = (candidate.version == previous.version
+                     and candidate.symptom_lexicon.version == previous.symptom_lexicon.version)
+        if unchanged:
+            reloads_counter.inc('unchanged')
+            return previous, previous
+        # Requests holding the previous snapshot finish on it; new ones see the candidate
+        snapshot = candidate
+        prediction_cache.set_version(candidate.version)
+        reloads_counter.inc('swapped')
+    logger.info(f"Reloaded bundle {path}: {previous.version} -> {candidate.version}, "
+                f"lexicon {previous.symptom_lexicon.version} -> {candidate.symptom_lexicon.version}")
+    return previous, candidate
+
+def bundle_stamp():
+    """(mtime, size) of the bundle and synonym files; replacing either changes it"""
+    stamp = ()
+    for path in (BUNDLE_PATH, SYNONYMS_PATH):
+        stat = os.stat(path)
+        stamp += (stat.st_mtime_ns, stat.st_size)
+    return stamp
+
+def check_bundle(stamp):
+    """Reload when the bundle or synonym file changed since `stamp`; returns the stamp to compare against next"""
     try:
-        desc = description[description['Disease'] == dis]['Description']
-        desc = " ".join([w for w in desc]) if not desc.empty else "No description available"
+        current = bundle_stamp()
+    except OSError as e:
+        logger.warning(f"Cannot check bundle files: {str(e)}")
+        return stamp
+    if current != stamp:
+        # A bundle that fails is reported once and retried only after the file changes again
+        try:
+            reload_snapshot()
+        except Exception as e:
+            logger.error(f"Bundle reload failed: {str(e)}")
+    return current
 
-        pre = precautions[precautions['Disease'] == dis][['Precaution_1', 'Precaution_2', 'Precaution_3', 'Precaution_4']]
-        pre = [col for col in pre.values] if not pre.empty else []
+def start_bundle_watcher(interval=None, stop=None):
+    """
+    Poll the bundle and synonym files in this process and reload when they change.
 
-        med = medications[medications['Disease'] == dis]['Medication']
-        med = [med for med in med.values] if not med.empty else []
+    Every worker holds its own snapshot and /admin/reload only reaches the one
+    that answered, so each worker starts a watcher after forking. Returns the
+    watcher thread, or None when the interval is 0.
+    """
+    interval = BUNDLE_WATCH_INTERVAL if interval is None else interval
+    if interval <= 0:
+        return None
+    stop = stop or threading.Event()
 
-        die = diets[diets['Disease'] == dis]['Diet']
-        die = [die for die in die.values] if not die.empty else []
+    def watch(stamp):
+        while not stop.wait(interval):
+            stamp = check_bundle(stamp)
 
-        wrkout = workout[workout['disease'] == dis]['workout']
-        wrkout = [w for w in wrkout.values] if not wrkout.empty else []
+    watcher = threading.Thread(target=watch, args=(bundle_stamp(),), name='bundle-watcher', daemon=True)
+    watcher.start()
+    logger.info(f"Watching {BUNDLE_PATH} and {SYNONYMS_PATH} for changes every {interval}s")
+    return watcher
 
-        return desc, pre, med, die, wrkout
-    except Exception as e:
-        logger.error(f"Error in helper function: {str(e)}")
-        return "Error retrieving information", [], [], [], []
+def get_disease_info(dis, snap=None):
+    """Look up the precompiled knowledge entry for a disease"""
+    info = (snap or snapshot).knowledge_index.get(dis)
+    return info if info is not None else build_disease_info(dis)
+
+def helper(dis, snap=None):
+    """Get disease information including description, precautions, medications, diet, and workout"""
+    info = get_disease_info(dis, snap)
+    return info.description, info.precautions, info.medications, info.diet, info.workout
 
-def suggest_symptoms(invalid_symptom, available_symptoms, n=3):
+def suggest_symptoms(invalid_symptom, n=3, snap=None):
     """Suggest similar symptoms using fuzzy string matching"""
-    suggestions = get_close_matches(invalid_symptom, available_symptoms, n=n, cutoff=0.6)
+    started = time.perf_counter()
+    suggestions = (snap or snapshot).symptom_matcher.suggest(invalid_symptom, n=n)
+    suggestion_latency.observe(time.perf_counter() - started)
     return suggestions
 
-def get_predicted_value(patient_symptoms):
+def parse_symptoms_input(symptoms_input):
+    """
+    Normalize a comma-separated string or list of symptoms, or return None for
+    other types, including lists that hold anything but strings
+    """
+    # Handle both string and list input
+    if isinstance(symptoms_input, str):
+        user_symptoms = [s.strip().lower() for s in symptoms_input.split(',')]
+    elif isinstance(symptoms_input, list) and all(isinstance(s, str) for s in symptoms_input):
+        user_symptoms = [s.strip().lower() for s in symptoms_input]
+    else:
+        return None
+    
+    # Remove empty symptoms
+    return [symptom.strip("[]' ") for symptom in user_symptoms if symptom.strip()]
+
+def analyze_symptoms(patient_symptoms, snap=None):
+    """
+    Split symptoms into known and unknown ones, returning the active feature
+    indices and suggestions. Synonyms and lay terms resolve through the
+    lexicon and are reported as the symptom names they stand for.
+    """
+    snap = snap or snapshot
+    symptoms_dict = snap.symptoms_dict
+    active_indices = []
+    valid_symptoms = []
+    invalid_symptoms = []
+    suggestions = {}
+    synonyms = 0
+    
+    for item in patient_symptoms:
+        if item in symptoms_dict:
+            if symptoms_dict[item] not in active_indices:
+                active_indices.append(symptoms_dict[item])
+            valid_symptoms.append(item)
+            continue
+        resolved = snap.symptom_lexicon.lookup(item)
+        if resolved:
+            synonyms += 1
+            for index in resolved:
+                if index not in active_indices:
+                    active_indices.append(index)
+                valid_symptoms.append(snap.symptom_names[index])
+        else:
+            invalid_symptoms.append(item)
+            symptom_suggestions = suggest_symptoms(item, snap=snap)
+            if symptom_suggestions:
+                suggestions[item] = symptom_suggestions
+    
+    if len(valid_symptoms) > synonyms:
+        symptoms_counter.inc('valid', amount=len(valid_symptoms) - synonyms)
+    if synonyms:
+        symptoms_counter.inc('synonym', amount=synonyms)
+    if invalid_symptoms:
+        symptoms_counter.inc('invalid', amount=len(invalid_symptoms))
+    return active_indices, valid_symptoms, invalid_symptoms, suggestions
+
+def get_predicted_value(patient_symptoms, snap=None):
     """Predict disease based on symptoms"""
     try:
-        input_vector = np.zeros(len(symptoms_dict))
-        valid_symptoms = []
-        invalid_symptoms = []
-        suggestions = {}
-        
-        available_symptoms = list(symptoms_dict.keys())
-        
-        for item in patient_symptoms:
-            if item in symptoms_dict:
-                input_vector[symptoms_dict[item]] = 1
-                valid_symptoms.append(item)
-            else:
-                invalid_symptoms.append(item)
-                symptom_suggestions = suggest_symptoms(item, available_symptoms)
-                if symptom_suggestions:
-                    suggestions[item] = symptom_suggestions
+        snap = snap or snapshot
+        active_indices, valid_symptoms, invalid_symptoms, suggestions = analyze_symptoms(patient_symptoms, snap)
         
         if not valid_symptoms:
             return None, [], invalid_symptoms, suggestions
         
-        prediction = svc.predict([input_vector])[0]
-        return diseases_list[prediction], valid_symptoms, invalid_symptoms, suggestions
+        predicted_disease, _ = predict_symptom_set(active_indices, snap)
+        return predicted_disease, valid_symptoms, invalid_symptoms, suggestions
     except Exception as e:
         logger.error(f"Error in prediction: {str(e)}")
         return None, [], [], {}
 
+def build_prediction_payload(disease, snap=None):
+    """Build the disease part of a /api/predict response"""
+    return disease_payload(disease, get_disease_info(disease, snap))
+
+def prediction_json(disease, snap=None):
+    """The disease part of a /api/predict response as JSON bytes, encoded once per snapshot"""
+    encoded = (snap or snapshot).prediction_json.get(disease)
+    return encoded if encoded is not None else fast_json.dumps(build_prediction_payload(disease, snap))
+
+def cache_prediction(key, label, snap=None):
+    """Store the disease name for a predicted label under a symptom mask and return it"""
+    snap = snap or snapshot
+    disease = snap.diseases_list[label]
+    # Responses splice in snap.prediction_json, so the name is all that needs caching.
+    # Dropped if a reload has moved the cache on to a newer snapshot meanwhile
+    prediction_cache.put(key, disease, version=snap.version)
+    return disease
+
+# Marks calls made through run_in_worker; with eventlet or gevent, everything else runs on the hub
+worker_context = threading.local()
+
+def on_event_loop():
+    """Whether the caller is a greenlet on the async hub, which must not block on a batch window"""
+    if socketio.async_mode not in ('eventlet', 'gevent'):
+        return False
+    # Under monkey-patching every greenlet looks like its own thread, so only the marker is trusted
+    return not getattr(worker_context, 'active', False)
+
+def predict_symptom_set(active_indices, snap=None):
+    """
+    Return (disease, source) for a set of feature indices. Training
+    patterns come from the signature table and everything else from the model,
+    which is skipped on cache hits.
+    """
+    snap = snap or snapshot
+    key = symptom_mask(active_indices)
+    disease = prediction_cache.get(key, version=snap.version)
+    if disease is None:
+        # Only consulted on a cache miss, so its hit ratio covers the lookups that reach it
+        label = snap.signature_table.get(key)
+        if label is None and snap.batcher is not None and not on_event_loop():
+            label = snap.batcher.submit(active_indices)
+        elif label is None:
+            started = time.perf_counter()
+            label = snap.svc.predict_indices(active_indices)
+            model_latency.observe(time.perf_counter() - started, 'single')
+        disease = cache_prediction(key, label, snap)
+    predictions_counter.inc(disease)
+    return disease, snap.signature_table.source(key)
+
+def encode_prediction_response(disease_json, valid_symptoms, invalid_symptoms, suggestions, source):
+    """
+    Encode a successful /api/predict body with the pre-encoded disease part
+    spliced in; the bytes match jsonify of build_prediction_response
+    """
+    analysis = fast_json.dumps({
+        "invalid_symptoms": invalid_symptoms,
+        "suggestions": suggestions,
+        "valid_symptoms": valid_symptoms
+    })
+    # Keys in jsonify's sorted order: input_analysis, prediction, prediction_source, success
+    return b''.join((
+        b'{"input_analysis":', analysis,
+        b',"prediction":', disease_json,
+        b',"prediction_source":', fast_json.dumps(source),
+        b',"success":true}',
+    ))
+
+def json_bytes_response(body, status=200):
+    """Response for encoded JSON, unless the app is set to pretty-print jsonify output"""
+    if app.json.compact is False or (app.json.compact is None and app.debug):
+        return jsonify(json.loads(body)), status
+    return Response(fast_json.response_body(body), status=status, mimetype=app.json.mimetype)
+
+def build_prediction_response(prediction, valid_symptoms, invalid_symptoms, suggestions, source=None):
+    """Assemble the /api/predict response body and status code from a prediction payload, or None"""
+    if prediction is None:
+        return {
+            "success": False,
+            "error": "No valid symptoms found",
+            "invalid_symptoms": invalid_symptoms,
+            "suggestions": suggestions
+        }, 400
+    
+    return {
+        "success": True,
+        "prediction": prediction,
+        "prediction_source": source,
+        "input_analysis": {
+            "valid_symptoms": valid_symptoms,
+            "invalid_symptoms": invalid_symptoms,
+            "suggestions": suggestions
+        }
+    }, 200
+
 # API Routes
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "chatbot"}), 200
+    snap = snapshot
+    return jsonify({
+        "status": "healthy",
+        "service": "chatbot",
+        "model_version": snap.version,
+        "model_loaded_at": snap.loaded_at,
+        "catalog_version": snap.symptom_catalog.version,
+        "lexicon_version": snap.symptom_lexicon.version,
+        "prediction_cache": prediction_cache.stats(),
+        "signature_table": snap.signature_table.stats(),
+        "chat_sessions": session_store.stats()
+    }), 200
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Reload the bundle without a restart; requires the X-Admin-Token header"""
+    if not ADMIN_TOKEN:
+        return jsonify({"success": False, "error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({"success": False, "error": "Invalid admin token"}), 403
+    
+    try:
+        previous, current = reload_snapshot()
+    except (BundleError, OSError, SnapshotError) as e:
+        logger.error(f"Bundle reload failed: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": f"Reload failed, still serving {snapshot.version}: {str(e)}"
+        }), 422
+    except Exception as e:
+        logger.error(f"Bundle reload failed: {str(e)}")
+        return jsonify({"success": False, "error": "An error occurred while reloading"}), 500
+    
+    return jsonify({
+        "success": True,
+        "reloaded": current is not previous,
+        "previous_version": previous.version,
+        "model_version": current.version,
+        "catalog_version": current.symptom_catalog.version,
+        "lexicon_version": current.symptom_lexicon.version
+    }), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus metrics in the text exposition format"""
+    return Response(metrics_registry.render(), content_type=CONTENT_TYPE)
 
 @app.route('/api/symptoms', methods=['GET'])
 def get_symptoms():
     """Get list of available symptoms"""
     try:
-        available_symptoms = sorted(list(symptoms_dict.keys()))
-        return jsonify({
-            "success": True,
-            "symptoms": available_symptoms,
-            "total": len(available_symptoms)
-        }), 200
+        symptom_catalog = snapshot.symptom_catalog
+        headers = {
+            "ETag": symptom_catalog.etag,
+            "Cache-Control": f"public, max-age={SYMPTOM_CATALOG_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+        if symptom_catalog.matches(request.headers.get('If-None-Match')):
+            return Response(status=304, headers=headers)
+        
+        encoding = symptom_catalog.select_encoding(request.accept_encodings)
+        if encoding != 'identity':
+            headers["Content-Encoding"] = encoding
+        return Response(symptom_catalog.bodies[encoding], status=200, headers=headers, mimetype='application/json')
     except Exception as e:
         logger.error(f"Error getting symptoms: {str(e)}")
         return jsonify({"success": False, "error": "Failed to retrieve symptoms"}), 500
@@ -136,6 +618,7 @@ def get_symptoms():
 def predict_disease():
     """Predict disease based on symptoms"""
     try:
+        timer = StageTimer(stage_latency, 'predict')
         data = request.get_json()
         
         if not data or 'symptoms' not in data:
@@ -144,70 +627,135 @@ def predict_disease():
                 "error": "Symptoms are required"
             }), 400
         
-        symptoms_input = data['symptoms']
+        user_symptoms = parse_symptoms_input(data['symptoms'])
         
-        # Handle both string and list input
-        if isinstance(symptoms_input, str):
-            user_symptoms = [s.strip().lower() for s in symptoms_input.split(',')]
-        elif isinstance(symptoms_input, list):
-            user_symptoms = [s.strip().lower() for s in symptoms_input]
-        else:
+        if user_symptoms is None:
             return jsonify({
                 "success": False,
                 "error": "Symptoms must be a string or array"
             }), 400
         
-        # Remove empty symptoms
-        user_symptoms = [symptom.strip("[]' ") for symptom in user_symptoms if symptom.strip()]
-        
         if not user_symptoms:
             return jsonify({
                 "success": False,
                 "error": "Please provide valid symptoms"
             }), 400
+        timer.lap('parse')
+        
+        # Get prediction, on one snapshot even if a reload happens meanwhile
+        snap = snapshot
+        active_indices, valid_symptoms, invalid_symptoms, suggestions = analyze_symptoms(user_symptoms, snap)
+        timer.lap('analyze')
+        if not valid_symptoms:
+            timer.lap('predict')
+            response_data, status = build_prediction_response(None, [], invalid_symptoms, suggestions)
+            return jsonify(response_data), status
+        disease, source = predict_symptom_set(active_indices, snap)
+        timer.lap('predict')
+        
+        response = json_bytes_response(encode_prediction_response(
+            prediction_json(disease, snap), valid_symptoms, invalid_symptoms, suggestions, source
+        ))
+        timer.lap('encode')
+        return response
         
-        # Get prediction
-        predicted_disease, valid_symptoms, invalid_symptoms, suggestions = get_predicted_value(user_symptoms)
+    except Exception as e:
+        logger.error(f"Error in prediction: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "An error occurred while processing your request"
+        }), 500
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_disease_batch():
+    """Predict diseases for many symptom sets with a single model call"""
+    try:
+        data = request.get_json()
         
-        if predicted_disease is None:
+        if not data or 'items' not in data:
             return jsonify({
                 "success": False,
-                "error": "No valid symptoms found",
-                "invalid_symptoms": invalid_symptoms,
-                "suggestions": suggestions
+                "error": "Items are required"
             }), 400
         
-        # Get disease information
-        dis_des, precautions, medications, rec_diet, workout = helper(predicted_disease)
+        items = data['items']
         
-        # Format precautions
-        my_precautions = []
-        if precautions and len(precautions) > 0:
-            for i in precautions[0]:
-                if i and i.strip():
-                    my_precautions.append(i)
+        if not isinstance(items, list):
+            return jsonify({
+                "success": False,
+                "error": "Items must be an array"
+            }), 400
         
-        response_data = {
-            "success": True,
-            "prediction": {
-                "disease": predicted_disease,
-                "description": dis_des,
-                "precautions": my_precautions,
-                "medications": list(medications) if medications else [],
-                "diet": list(rec_diet) if rec_diet else [],
-                "workout": list(workout) if workout else []
-            },
-            "input_analysis": {
-                "valid_symptoms": valid_symptoms,
-                "invalid_symptoms": invalid_symptoms,
-                "suggestions": suggestions
-            }
-        }
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({
+                "success": False,
+                "error": f"A batch can contain at most {MAX_BATCH_SIZE} items"
+            }), 400
         
-        return jsonify(response_data), 200
+        snap = snapshot
+        # Every result is encoded on its own and the list is joined at the end
+        results = [None] * len(items)
+        pending = []
+        
+        for position, item in enumerate(items):
+            # Items are symptom strings/arrays, or objects shaped like a /api/predict body
+            if isinstance(item, dict):
+                if 'symptoms' not in item:
+                    results[position] = fast_json.dumps({"success": False, "error": "Symptoms are required"})
+                    continue
+                item = item['symptoms']
+            
+            user_symptoms = parse_symptoms_input(item)
+            
+            if user_symptoms is None:
+                results[position] = fast_json.dumps({"success": False, "error": "Symptoms must be a string or array"})
+            elif not user_symptoms:
+                results[position] = fast_json.dumps({"success": False, "error": "Please provide valid symptoms"})
+            else:
+                active_indices, valid_symptoms, invalid_symptoms, suggestions = analyze_symptoms(user_symptoms, snap)
+                if not valid_symptoms:
+                    failure, _ = build_prediction_response(None, [], invalid_symptoms, suggestions)
+                    results[position] = fast_json.dumps(failure)
+                    continue
+                
+                key = symptom_mask(active_indices)
+                disease = prediction_cache.get(key, version=snap.version)
+                if disease is None:
+                    label = snap.signature_table.get(key)
+                    if label is not None:
+                        disease = cache_prediction(key, label, snap)
+                if disease is not None:
+                    predictions_counter.inc(disease)
+                    results[position] = encode_prediction_response(
+                        prediction_json(disease, snap), valid_symptoms, invalid_symptoms, suggestions,
+                        snap.signature_table.source(key)
+                    )
+                else:
+                    pending.append((position, key, active_indices, valid_symptoms, invalid_symptoms, suggestions))
+        
+        if pending:
+            # Stack every uncached, unseen symptom set into one matrix for a single predict call
+            input_matrix = np.zeros((len(pending), len(snap.symptoms_dict)))
+            for row, (_, _, active_indices, _, _, _) in enumerate(pending):
+                input_matrix[row, active_indices] = 1
+            started = time.perf_counter()
+            labels = snap.svc.predict(input_matrix)
+            model_latency.observe(time.perf_counter() - started, 'batch')
+            
+            for (position, key, _, valid_symptoms, invalid_symptoms, suggestions), label in zip(pending, labels):
+                disease = cache_prediction(key, label, snap)
+                predictions_counter.inc(disease)
+                results[position] = encode_prediction_response(
+                    prediction_json(disease, snap), valid_symptoms, invalid_symptoms, suggestions, 'model'
+                )
+        
+        # Keys in jsonify's sorted order: results, success, total
+        return json_bytes_response(b''.join((
+            b'{"results":[', b','.join(results), b'],"success":true,"total":', str(len(results)).encode(), b'}'
+        )))
         
     except Exception as e:
-        logger.error(f"Error in prediction: {str(e)}")
+        logger.error(f"Error in batch prediction: {str(e)}")
         return jsonify({
             "success": False,
             "error": "An error occurred while processing your request"
@@ -217,6 +765,7 @@ def predict_disease():
 def chat_endpoint():
     """Chat endpoint for conversational interface"""
     try:
+        timer = StageTimer(stage_latency, 'chat')
         data = request.get_json()
         
         if not data or 'message' not in data:
@@ -233,13 +782,18 @@ def chat_endpoint():
                 "error": "Message cannot be empty"
             }), 400
         
+        timer.lap('parse')
+        
         # Process the message using the chat logic
         response_data = process_chat_message(user_message)
+        timer.lap('classify')
         
-        return jsonify({
+        response = jsonify({
             "success": True,
             **response_data
-        }), 200
+        })
+        timer.lap('encode')
+        return response, 200
         
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}")
@@ -248,12 +802,39 @@ def chat_endpoint():
             "error": "An error occurred while processing your message"
         }), 500
 
+def call_as_worker(func, *args):
+    """Call `func` marked as running off the hub, so it may wait for a prediction batch"""
+    worker_context.active = True
+    try:
+        return func(*args)
+    finally:
+        worker_context.active = False
+
+def run_in_worker(func, *args):
+    """Run CPU-bound work in a real OS thread so the async hub keeps serving other sockets"""
+    if socketio.async_mode == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(call_as_worker, func, *args)
+    if socketio.async_mode == 'gevent':
+        from gevent import get_hub
+        return get_hub().threadpool.apply(call_as_worker, (func,) + args)
+    # In threading mode every event already runs in its own thread
+    return func(*args)
+
 # WebSocket Events
 @socketio.on('connect')
 def handle_connect(auth):
-    """Handle client connection"""
-    session_id = str(uuid.uuid4())
-    logger.info(f"Client connected with session: {session_id}")
+    """Handle client connection, resuming a stored chat session when the client sends its id"""
+    resume_id = auth.get('session_id') if isinstance(auth, dict) else None
+    if resume_id and session_store.get(resume_id) is not None:
+        session_id = resume_id
+        connection_logger.info(f"Client resumed session: {session_id}")
+    else:
+        session_id = str(uuid.uuid4())
+        session_store.put(session_id, new_session_state())
+        connection_logger.info(f"Client connected with session: {session_id}")
+    session['chat_session_id'] = session_id
+    socket_connections.inc()
     
     # Send welcome message
     emit('message', {
@@ -262,48 +843,138 @@ def handle_connect(auth):
         'sender': 'bot',
         'timestamp': time.time() * 1000,
         'type': 'greeting',
-        'session_id': session_id
+        'session_id': session_id,
+        'resumed': session_id == resume_id,
+        'catalog_version': snapshot.symptom_catalog.version
     })
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
-    logger.info("Client disconnected")
+    socket_connections.dec()
+    session_limiter.forget(request.sid)
+    pending_messages.discard(request.sid)
+    connection_logger.info("Client disconnected")
+
+def merge_messages(waiting, data):
+    """Coalesce an excess message into the one already waiting; session symptoms accumulate either way"""
+    texts = [str(d.get('message', '')).strip() for d in (waiting, data)]
+    return {**data, 'message': "\n".join(text for text in texts if text)}
+
+session_limiter = RateLimiter(CHAT_RATE, CHAT_BURST)
+user_limiter = RateLimiter(CHAT_USER_RATE, CHAT_USER_BURST)
+pending_messages = PendingQueue(CHAT_MAX_PENDING, merge=merge_messages if CHAT_OVERFLOW == 'coalesce' else None)
+
+def emit_throttled(reason, data, retry_after=None):
+    """Tell the client a message will not get its own answer"""
+    throttled_counter.inc(reason)
+    payload = {
+        'reason': reason,
+        'message_timestamp': data.get('timestamp') if isinstance(data, dict) else None,
+        'timestamp': time.time() * 1000
+    }
+    if retry_after is not None:
+        payload['retry_after'] = round(retry_after, 3)
+    emit('throttled', payload)
 
 @socketio.on('send_message')
 def handle_message(data):
+    """Admit a chat message through the rate limits and the connection's backlog, then answer it"""
+    sid = request.sid
+    user_id = data.get('user_id') if isinstance(data, dict) else None
+    retry_after = session_limiter.allow(sid)
+    if retry_after:
+        emit_throttled('session_rate', data, retry_after)
+        return
+    if user_id is not None:
+        retry_after = user_limiter.allow(user_id)
+        if retry_after:
+            emit_throttled('user_rate', data, retry_after)
+            return
+    
+    # One handler per connection answers its messages in order; the rest wait in its backlog
+    outcome = pending_messages.offer(sid, data)
+    if outcome != 'run':
+        if outcome != 'queued':
+            emit_throttled(outcome, data)
+        return
+    try:
+        while data is not None:
+            answer_message(data)
+            data = pending_messages.next(sid)
+    finally:
+        if data is not None:
+            # Interrupted mid-backlog: release the connection so later messages are answered
+            pending_messages.discard(sid)
+            pending_messages.next(sid)
+
+def answer_message(data):
     """Handle incoming chat messages via WebSocket"""
     try:
+        timer = StageTimer(stage_latency, 'send_message')
         message_text = data.get('message', '').strip()
         user_id = data.get('user_id')
+        # Clients that handle message_section events opt in per message
+        stream = data.get('stream') is True
         
         if not message_text:
             emit('error', {'error': 'Message cannot be empty'})
             return
         
-        logger.info(f"Received message from user {user_id}: {message_text}")
+        # Message text may describe a patient's health; only log it when debugging
+        message_logger.info(f"Received message from user {user_id} ({len(message_text)} chars)")
+        message_logger.debug(f"Message from user {user_id}: {message_text}")
+        timer.lap('parse')
         
         # Send typing indicator
         emit('typing', {'typing': True})
         
-        # Simulate processing time
-        time.sleep(1)
+        # Optional pacing delay; yields to other sockets instead of blocking the worker
+        if CHAT_RESPONSE_DELAY > 0:
+            socketio.sleep(CHAT_RESPONSE_DELAY)
+            timer.lap('delay')
         
-        # Process the message using the chat logic
-        response_data = process_chat_message(message_text)
+        # Continue the session's accumulated symptoms; an expired session starts over
+        session_id = session.get('chat_session_id')
+        state = session_store.get(session_id) if session_id else None
+        if state is None:
+            state = new_session_state()
+        timer.lap('session')
+        
+        # Process the message using the chat logic, off the event loop
+        snap = snapshot
+        response_data = run_in_worker(process_chat_message, message_text, state, snap)
+        timer.lap('classify')
+        if session_id:
+            session_store.put(session_id, state)
         
         # Stop typing indicator
         emit('typing', {'typing': False})
         
         # Send response
-        emit('message', {
+        message = {
             'id': str(uuid.uuid4()),
             'text': response_data['response'],
             'sender': 'bot',
             'timestamp': time.time() * 1000,
             'type': response_data.get('type', 'default'),
             'data': response_data.get('data')
-        })
+        }
+        if stream and message['type'] == 'diagnosis':
+            # The disease goes out first; its knowledge follows section by section
+            disease = message['data']['disease']
+            sections = get_disease_info(disease, snap).chat_sections
+            emit('message', {
+                **message,
+                'text': render_chat_headline(disease),
+                'sections': [section.section for section in sections]
+            })
+            timer.lap('emit')
+            emit_chat_sections(message['id'], sections)
+            timer.lap('sections')
+        else:
+            emit('message', message)
+            timer.lap('emit')
         
     except Exception as e:
         logger.error(f"Error handling message: {str(e)}")
@@ -313,70 +984,111 @@ def handle_message(data):
             'timestamp': time.time() * 1000
         })
 
+def emit_chat_sections(message_id, sections):
+    """Emit each knowledge section of a streamed diagnosis as its own message_section event"""
+    last = len(sections) - 1
+    for index, section in enumerate(sections):
+        # Yield first so the previous event is written before the next one is queued
+        socketio.sleep(0)
+        emit('message_section', {
+            'id': message_id,
+            'section': section.section,
+            'title': section.title,
+            'text': section.text,
+            'items': list(section.items),
+            'index': index,
+            'final': index == last
+        })
+
 @socketio.on('get_symptoms')
 def handle_get_symptoms():
     """Handle request for available symptoms"""
     try:
-        available_symptoms = sorted(list(symptoms_dict.keys()))
-        emit('symptoms_list', {
-            'symptoms': available_symptoms,
-            'total': len(available_symptoms)
-        })
+        emit('symptoms_list', snapshot.symptom_catalog.payload)
     except Exception as e:
         logger.error(f"Error getting symptoms: {str(e)}")
         emit('error', {'error': 'Failed to retrieve symptoms'})
 
-def process_chat_message(message_text):
-    """Process chat message and return response data"""
-    # Simple keyword detection for symptoms
-    if any(keyword in message_text.lower() for keyword in ['symptom', 'feel', 'pain', 'ache', 'sick', 'problem']):
-        # Try to extract symptoms from the message
-        available_symptoms = list(symptoms_dict.keys())
-        found_symptoms = []
-        
-        for symptom in available_symptoms:
-            if symptom.replace('_', ' ') in message_text.lower():
-                found_symptoms.append(symptom)
+def process_chat_message(message_text, state=None, snap=None):
+    """
+    Process chat message and return response data.
+
+    With a session `state`, symptoms accumulate across turns in its bitmask and
+    the prediction is only recomputed when the set of symptoms grows.
+    """
+    snap = snap or snapshot
+    symptoms_dict = snap.symptoms_dict
+    
+    # One pass over the message finds every symptom phrase, synonym and intent keyword
+    matches = snap.chat_matcher.find(message_text)
+    found = set()
+    intents = set()
+    symptom_spans = [(start, end) for start, end, (kind, _) in matches if kind != 'intent']
+    for start, end, (kind, value) in matches:
+        if kind == 'intent':
+            intents.add(value)
+        elif kind == 'symptom' or not any(
+            other_start <= start and end <= other_end and (other_start, other_end) != (start, end)
+            for other_start, other_end in symptom_spans
+        ):
+            # A synonym inside a longer phrase, such as "fever" in "mild fever", defers to it
+            found.add(value)
+    
+    if state is not None:
+        state['turns'] += 1
+        # After a reload the mask's bits may name other symptoms, and the
+        # last prediction may come from another model
+        if state.get('catalog') not in (None, snap.symptom_catalog.version):
+            state.update(mask=0, disease=None)
+        if state.get('model') not in (None, snap.version):
+            state['disease'] = None
+        state.update(catalog=snap.symptom_catalog.version, model=snap.version)
+        if 'reset' in intents:
+            state.update(new_session_state(), turns=state['turns'])
+            if not found:
+                return {
+                    'response': "Okay, let's start over. Please describe your symptoms.",
+                    'type': 'reset'
+                }
+    
+    # Symptom phrases only match whole words, so finding one is what starts a
+    # diagnosis rather than a loose keyword such as "ache" or "pain"
+    if found:
+        found_symptoms = sorted(found, key=symptoms_dict.get)
         
-        if found_symptoms:
+        if state is None:
             # Use the prediction logic
-            predicted_disease, valid_symptoms, invalid_symptoms, suggestions = get_predicted_value(found_symptoms)
-            
-            if predicted_disease:
-                dis_des, precautions, medications, rec_diet, workout = helper(predicted_disease)
-                
-                response_message = f"Based on your symptoms, you might have: **{predicted_disease}**\n\n"
-                response_message += f"**Description:** {dis_des}\n\n"
-                
-                if precautions and len(precautions) > 0:
-                    my_precautions = [p for p in precautions[0] if p and p.strip()]
-                    if my_precautions:
-                        response_message += "**Precautions:**\n"
-                        for i, precaution in enumerate(my_precautions[:3], 1):
-                            response_message += f"{i}. {precaution}\n"
-                        response_message += "\n"
-                
-                response_message += "Would you like more detailed information about medications, diet, or exercises?"
-                
-                return {
-                    'response': response_message,
-                    'type': 'diagnosis',
-                    'data': {
-                        'disease': predicted_disease,
-                        'symptoms_found': found_symptoms
-                    }
+            predicted_disease, valid_symptoms, invalid_symptoms, suggestions = get_predicted_value(found_symptoms, snap)
+            mask = symptom_mask(symptoms_dict[symptom] for symptom in found_symptoms)
+            data = {}
+        else:
+            mask = state['mask'] | symptom_mask(symptoms_dict[symptom] for symptom in found_symptoms)
+            if mask != state['mask'] or state['disease'] is None:
+                state['disease'], _ = predict_symptom_set(mask_indices(mask), snap)
+                state['mask'] = mask
+            predicted_disease = state['disease']
+            data = {'session_symptoms': [snap.symptom_names[index] for index in mask_indices(mask)]}
+        
+        if predicted_disease:
+            return {
+                'response': get_disease_info(predicted_disease, snap).chat_response,
+                'type': 'diagnosis',
+                'data': {
+                    'disease': predicted_disease,
+                    'symptoms_found': found_symptoms,
+                    'prediction_source': snap.signature_table.source(mask),
+                    **data
                 }
+            }
     
     # Default responses for common queries
-    greetings = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening']
-    if any(greeting in message_text.lower() for greeting in greetings):
+    if 'greeting' in intents:
         return {
             'response': "Hello! I'm your medical assistant. You can tell me about your symptoms and I'll help identify possible conditions. For example, you can say 'I have a headache and fever' or list symptoms.",
             'type': 'greeting'
         }
     
-    help_keywords = ['help', 'how', 'what can you do']
-    if any(keyword in message_text.lower() for keyword in help_keywords):
+    if 'help' in intents:
         return {
             'response': "I can help you identify possible medical conditions based on your symptoms. Here's how to use me:\n\n1. Describe your symptoms in natural language\n2. List symptoms separated by commas\n3. Ask for information about specific conditions\n\nExample: 'I have headache, fever, and nausea'",
             'type': 'help'
@@ -390,4 +1102,5 @@ def process_chat_message(message_text):
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
+    start_bundle_watcher()
     socketio.run(app, host='0.0.0.0', port=port, debug=True)
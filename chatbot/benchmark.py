@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+In-process load test and micro-benchmarks for the chatbot service.
+
+Endpoints are driven through the Flask and Socket.IO test clients, so no
+server or network is involved and runs are comparable across commits:
+
+    python benchmark.py --concurrency 1,8 --requests 2000 --output results.json
+    python benchmark.py --compare results.json --max-regression 0.2
+
+Results are written as JSON: per-scenario throughput and p50/p95/p99 latency
+at each concurrency level, and per-call timings of the hot functions.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+# Benchmarks measure the service, not its configured pacing delay. The load is
+# generated from OS threads, which eventlet's thread pool cannot be called from,
+# so the Socket.IO server runs in threading mode unless told otherwise.
+os.environ['CHAT_RESPONSE_DELAY'] = '0'
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'threading')
+
+import numpy as np
+
+import app as chatbot
+from latency_stats import summarize
+from symptom_matcher import space_form
+
+DEFAULT_OUTPUT = 'benchmark_results.json'
+
+
+def sample_symptom_sets(count, seed):
+    """Deterministic symptom sets of 1-5 symptoms drawn from the feature index"""
+    rng = random.Random(seed)
+    names = list(chatbot.snapshot.symptoms_dict)
+    return [rng.sample(names, rng.randint(1, 5)) for _ in range(count)]
+
+
+def chat_text(symptoms):
+    return "I have " + " and ".join(space_form(symptom) for symptom in symptoms)
+
+
+# A scenario factory runs once per load thread and returns (run, cleanup): run(i)
+# performs the i-th request and reports whether it succeeded
+def predict_scenario(inputs):
+    def factory():
+        client = chatbot.app.test_client()
+
+        def run(i):
+            response = client.post('/api/predict', json={"symptoms": inputs[i % len(inputs)]})
+            return response.status_code == 200
+        return run, None
+    return factory
+
+
+def chat_scenario(inputs):
+    def factory():
+        client = chatbot.app.test_client()
+
+        def run(i):
+            response = client.post('/api/chat', json={"message": chat_text(inputs[i % len(inputs)])})
+            return response.status_code == 200
+        return run, None
+    return factory
+
+
+def symptoms_scenario():
+    def factory():
+        client = chatbot.app.test_client()
+
+        def run(i):
+            return client.get('/api/symptoms').status_code == 200
+        return run, None
+    return factory
+
+
+def send_message_scenario(inputs):
+    def factory():
+        client = chatbot.socketio.test_client(chatbot.app)
+        client.get_received()
+
+        def run(i):
+            client.emit('send_message', {'message': chat_text(inputs[i % len(inputs)])})
+            received = client.get_received()
+            return any(packet['name'] == 'message' for packet in received)
+        return run, client.disconnect
+    return factory
+
+
+def run_load(factory, requests, concurrency):
+    """Spread `requests` calls over `concurrency` threads and time each one"""
+    per_thread = [requests // concurrency + (1 if t < requests % concurrency else 0) for t in range(concurrency)]
+
+    def worker(thread_index):
+        run, cleanup = factory()
+        latencies, errors = [], 0
+        offset = sum(per_thread[:thread_index])
+        for i in range(offset, offset + per_thread[thread_index]):
+            started = time.perf_counter()
+            ok = run(i)
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+        if cleanup:
+            cleanup()
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for thread_latencies, _ in outcomes for latency in thread_latencies]
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in outcomes),
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": summarize(latencies, 1e3),
+    }
+
+
+def time_calls(func, inputs, iterations):
+    """Per-call timings of `func` over the inputs, cycled"""
+    latencies = []
+    for i in range(iterations):
+        argument = inputs[i % len(inputs)]
+        started = time.perf_counter()
+        func(argument)
+        latencies.append(time.perf_counter() - started)
+    return {"iterations": iterations, "latency_us": summarize(latencies, 1e6)}
+
+
+def run_micro(inputs, iterations):
+    diseases = list(chatbot.snapshot.diseases_list.values())
+    messages = [chat_text(symptoms) for symptoms in inputs]
+    return {
+        "get_predicted_value": time_calls(chatbot.get_predicted_value, inputs, iterations),
+        "helper": time_calls(chatbot.helper, diseases, iterations),
+        "process_chat_message": time_calls(chatbot.process_chat_message, messages, iterations),
+    }
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "async_mode": chatbot.socketio.async_mode,
+        "model_version": chatbot.snapshot.version,
+    }
+
+
+def run_benchmarks(args):
+    inputs = sample_symptom_sets(args.distinct_inputs, args.seed)
+    scenarios = {
+        'predict': predict_scenario(inputs),
+        'chat': chat_scenario(inputs),
+        'symptoms': symptoms_scenario(),
+        'send_message': send_message_scenario(inputs),
+    }
+    selected = args.scenarios or list(scenarios)
+
+    results = {"environment": environment_info(), "settings": vars(args).copy(), "scenarios": {}, "micro": {}}
+    for name in selected:
+        factory = scenarios[name]
+        run_load(factory, args.warmup, 1)
+        results["scenarios"][name] = [run_load(factory, args.requests, c) for c in args.concurrency]
+    if args.micro_iterations:
+        results["micro"] = run_micro(inputs, args.micro_iterations)
+    return results
+
+
+def compare(results, baseline, max_regression=None):
+    """Print p95 latency and throughput changes against a baseline; return the regressions"""
+    regressions = []
+    for name, runs in results["scenarios"].items():
+        baseline_runs = {run["concurrency"]: run for run in baseline.get("scenarios", {}).get(name, [])}
+        for run in runs:
+            before = baseline_runs.get(run["concurrency"])
+            if not before:
+                continue
+            change = run["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1 if before["latency_ms"]["p95"] else 0.0
+            print(f"{name:<14} c={run['concurrency']:<3} p95 {before['latency_ms']['p95']:.3f} -> "
+                  f"{run['latency_ms']['p95']:.3f} ms ({change:+.1%}), "
+                  f"{before['throughput_rps']:.0f} -> {run['throughput_rps']:.0f} req/s")
+            if max_regression is not None and change > max_regression:
+                regressions.append(f"{name} c={run['concurrency']}")
+    for name, micro in results["micro"].items():
+        before = baseline.get("micro", {}).get(name)
+        if before and before["latency_us"]["p50"]:
+            change = micro["latency_us"]["p50"] / before["latency_us"]["p50"] - 1
+            print(f"{name:<22} p50 {before['latency_us']['p50']:.1f} -> {micro['latency_us']['p50']:.1f} us ({change:+.1%})")
+    return regressions
+
+
+def format_results(results):
+    lines = []
+    for name, runs in results["scenarios"].items():
+        for run in runs:
+            latency = run["latency_ms"]
+            lines.append(
+                f"{name:<14} c={run['concurrency']:<3} {run['throughput_rps']:>9.1f} req/s  "
+                f"p50 {latency['p50']:.3f}  p95 {latency['p95']:.3f}  p99 {latency['p99']:.3f} ms  "
+                f"errors {run['errors']}"
+            )
+    for name, micro in results["micro"].items():
+        latency = micro["latency_us"]
+        lines.append(f"{name:<22} p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  p99 {latency['p99']:.1f} us")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the chatbot service in-process")
+    parser.add_argument('--concurrency', type=lambda value: [int(c) for c in value.split(',')], default=[1, 4],
+                        help="comma-separated thread counts (default: 1,4)")
+    parser.add_argument('--requests', type=int, default=500, help="requests per scenario and concurrency level")
+    parser.add_argument('--warmup', type=int, default=50, help="untimed requests before each scenario")
+    parser.add_argument('--scenarios', type=lambda value: value.split(','),
+                        help="comma-separated subset of predict,chat,symptoms,send_message")
+    parser.add_argument('--micro-iterations', type=int, default=2000, help="calls per micro-benchmark (0 skips them)")
+    parser.add_argument('--distinct-inputs', type=int, default=200, help="distinct symptom sets cycled through")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-prediction-cache', action='store_true', help="disable the prediction cache")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"JSON results file (default: {DEFAULT_OUTPUT})")
+    parser.add_argument('--compare', help="baseline results file to compare against")
+    parser.add_argument('--max-regression', type=float,
+                        help="with --compare, exit non-zero if a p95 latency grows by more than this fraction")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Request logging would dominate the timings
+    logging.disable(logging.INFO)
+    # Each client sends back to back, far above the chat rate limits
+    chatbot.session_limiter.rate = 0
+    chatbot.user_limiter.rate = 0
+    if args.no_prediction_cache:
+        chatbot.prediction_cache.maxsize = 0
+        chatbot.prediction_cache.clear()
+
+    results = run_benchmarks(args)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(format_results(results))
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"p95 regressions over {args.max_regression:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Compiled chatbot bundle: everything the API needs to serve, in one file.
+
+`train_model.py` writes the bundle; `app.py` loads it without pandas or
+scikit-learn. The file layout is
+
+    MAGIC | format version (uint32) | header length (uint32) | JSON header | arrays
+
+The JSON header holds the feature index, label map, disease knowledge,
+training metadata and the dtype/shape/offset of every array. Arrays are stored
+raw and 64-byte aligned after the header. The content hash covers the header
+payload and all array bytes, and is checked on load.
+
+Arrays are stored in the layout they are served in and loaded as read-only
+views of a shared file mapping, so prefork workers share one copy of the
+weights in the page cache instead of each holding a private one.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+BUNDLE_FILE = 'chatbot_bundle.bin'
+MAGIC = b'CHATBNDL'
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct('<8sII')
+
+
+class BundleError(Exception):
+    """Raised when a bundle is missing, corrupt or of an unsupported version"""
+
+
+class Bundle:
+    """Loaded contents of a chatbot bundle"""
+
+    def __init__(self, features, labels, knowledge, arrays, metadata, content_hash,
+                 format_version=FORMAT_VERSION):
+        self.features = list(features)
+        self.labels = list(labels)
+        self.knowledge = knowledge
+        self.arrays = arrays
+        self.metadata = metadata
+        self.content_hash = content_hash
+        self.format_version = format_version
+
+    @property
+    def symptoms_dict(self):
+        """{symptom name: feature index}"""
+        return {name: index for index, name in enumerate(self.features)}
+
+    @property
+    def diseases_list(self):
+        """{label code: disease name}"""
+        return dict(enumerate(self.labels))
+
+
+def _content_hash(payload_bytes, arrays):
+    digest = hashlib.sha256(payload_bytes)
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(arrays[name]).data)
+    return digest.hexdigest()
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_bundle(path, features, labels, knowledge, arrays, metadata=None):
+    """Serialize a bundle and return its content hash"""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    for name, array in arrays.items():
+        if array.dtype.hasobject:
+            raise BundleError(f"Array '{name}' has an object dtype and cannot be bundled")
+
+    payload = {
+        'features': list(features),
+        'labels': list(labels),
+        'knowledge': knowledge,
+        'metadata': metadata or {},
+    }
+    payload_bytes = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    content_hash = _content_hash(payload_bytes, arrays)
+
+    # Array offsets are relative to the start of the (aligned) data section
+    descriptors = {}
+    offset = 0
+    for name in sorted(arrays):
+        offset = _align(offset)
+        descriptors[name] = {
+            'dtype': arrays[name].dtype.str,
+            'shape': list(arrays[name].shape),
+            'offset': offset,
+        }
+        offset += arrays[name].nbytes
+
+    header = json.dumps({
+        'payload': payload,
+        'arrays': descriptors,
+        'content_hash': content_hash,
+    }, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    # Written beside the target and renamed over it, so processes that have the
+    # old bundle mapped keep reading the old inode
+    data_start = _align(_PREAMBLE.size + len(header))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name in sorted(arrays):
+            f.seek(data_start + descriptors[name]['offset'])
+            f.write(arrays[name].tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+    return content_hash
+
+
+def _read(path, use_mmap):
+    """Bytes-like view of the whole file, memory-mapped read-only when `use_mmap`"""
+    try:
+        with open(path, 'rb') as f:
+            if not use_mmap:
+                return f.read()
+            # An empty file cannot be mapped; it fails the preamble check below instead
+            if f.seek(0, 2) == 0:
+                return b''
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        raise BundleError(f"{path} not found; run `python train_model.py --export-only` to build it")
+
+
+def load_bundle(path=BUNDLE_FILE, verify=True, use_mmap=True):
+    """
+    Load a bundle written by `write_bundle`.
+
+    With `use_mmap` the arrays are read-only views of a shared file mapping.
+    `write_bundle` replaces files atomically, so a mapped bundle is never
+    modified underneath its readers.
+    """
+    data = _read(path, use_mmap)
+
+    if len(data) < _PREAMBLE.size:
+        raise BundleError(f"{path} is truncated")
+    magic, format_version, header_length = _PREAMBLE.unpack_from(data)
+    if magic != MAGIC:
+        raise BundleError(f"{path} is not a chatbot bundle")
+    if format_version != FORMAT_VERSION:
+        raise BundleError(f"{path} has format version {format_version}, expected {FORMAT_VERSION}")
+
+    header = json.loads(data[_PREAMBLE.size:_PREAMBLE.size + header_length])
+    data_start = _align(_PREAMBLE.size + header_length)
+
+    arrays = {}
+    for name, descriptor in header['arrays'].items():
+        dtype = np.dtype(descriptor['dtype'])
+        count = int(np.prod(descriptor['shape'], dtype=np.int64))
+        start = data_start + descriptor['offset']
+        if start + count * dtype.itemsize > len(data):
+            raise BundleError(f"{path} is truncated")
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=start).reshape(descriptor['shape'])
+
+    payload = header['payload']
+    if verify:
+        payload_bytes = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        if _content_hash(payload_bytes, arrays) != header['content_hash']:
+            raise BundleError(f"{path} failed its content hash check")
+
+    return Bundle(
+        payload['features'], payload['labels'], payload['knowledge'], arrays,
+        payload['metadata'], header['content_hash'], format_version,
+    )
@@ -0,0 +1,51 @@
+"""
+Versioned symptom catalog, encoded once and served as a cacheable resource.
+
+The sorted symptom list, its JSON body and the compressed variants of that
+body are built when the catalog is created. Requests then only pick a
+prebuilt body, and clients revalidate with the version as a weak ETag.
+"""
+
+import gzip
+import hashlib
+import json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class SymptomCatalog:
+    """Sorted symptom names with a content version and precompressed JSON bodies"""
+
+    def __init__(self, symptoms):
+        self.symptoms = sorted(symptoms)
+        self.version = hashlib.sha256(json.dumps(self.symptoms).encode('utf-8')).hexdigest()[:16]
+        self.etag = f'W/"{self.version}"'
+        self.payload = {
+            "symptoms": self.symptoms,
+            "total": len(self.symptoms),
+            "version": self.version,
+        }
+
+        # Same shape and formatting as jsonify, so the body is unchanged for existing clients
+        body = json.dumps({"success": True, **self.payload}, sort_keys=True, separators=(',', ':'))
+        self.bodies = {'identity': (body + "\n").encode('utf-8')}
+        self.bodies['gzip'] = gzip.compress(self.bodies['identity'], compresslevel=9, mtime=0)
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(self.bodies['identity'])
+
+    def matches(self, if_none_match):
+        """Whether an If-None-Match header value names this version"""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or any(tag.removeprefix('W/') == f'"{self.version}"' for tag in tags)
+
+    def select_encoding(self, accept_encodings):
+        """Best prebuilt encoding the client accepts, given werkzeug's parsed Accept-Encoding"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.bodies and accept_encodings[encoding]:
+                return encoding
+        return 'identity'
@@ -0,0 +1,43 @@
+import os
+import sys
+
+# The chatbot loads its model and CSV files relative to the working directory,
+# so make the tests independent of where pytest is started from.
+chatbot_dir = os.path.abspath(os.path.dirname(__file__))
+if chatbot_dir not in sys.path:
+    sys.path.insert(0, chatbot_dir)
+os.chdir(chatbot_dir)
+
+import pytest
+
+import app as chatbot
+
+# Shared by the HTTP tests; the app keeps no per-client state between requests
+client = chatbot.app.test_client()
+
+
+class FakeClock:
+    """Clock for TTLs and rate limits that only moves when a test sets `now`"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def received_events(socket_client):
+    """(name, payload) of every event a Socket.IO test client received since the last call"""
+    events = []
+    for packet in socket_client.get_received():
+        args = packet['args']
+        events.append((packet['name'], args[0] if isinstance(args, list) else args))
+    return events
+
+
+@pytest.fixture
+def empty_cache():
+    """Start and end the test with an empty prediction cache"""
+    chatbot.prediction_cache.clear()
+    yield
+    chatbot.prediction_cache.clear()
@@ -0,0 +1,146 @@
+"""
+Deduplicated, bit-packed cache of the training dataset.
+
+Training.csv holds 4,920 rows but only a few hundred distinct (symptoms,
+prognosis) patterns. The cache keeps each distinct pattern once, with its
+symptom columns packed eight to a byte, plus the pattern index of every
+original row. Per-pattern counts then serve as sample weights, and any subset
+of the original rows, such as a train/test split, can be deduplicated
+without rereading the CSV.
+
+The cache is an uncompressed .npz file that NumPy loads without pickle or
+pandas. It records the SHA-256 of the CSV and is rebuilt whenever that hash
+no longer matches.
+"""
+
+import csv
+import hashlib
+import os
+
+import numpy as np
+
+CSV_FILE = 'Training.csv'
+CACHE_FILE = 'training_cache.npz'
+LABEL_COLUMN = 'prognosis'
+CACHE_VERSION = 1
+
+
+class TrainingData:
+    """Distinct training patterns with their weights and the original row layout"""
+
+    def __init__(self, features, classes, packed, labels, inverse, csv_hash):
+        self.features = [str(name) for name in features]
+        self.classes = [str(name) for name in classes]
+        self.packed = packed
+        self.labels = np.asarray(labels, dtype=np.intp)
+        self.inverse = np.asarray(inverse, dtype=np.intp)
+        self.csv_hash = csv_hash
+        self._X = None
+
+    @property
+    def n_rows(self):
+        """Number of rows in the original CSV"""
+        return len(self.inverse)
+
+    @property
+    def X(self):
+        """Distinct symptom patterns as a 0/1 uint8 matrix, unpacked on first use"""
+        if self._X is None:
+            self._X = np.unpackbits(self.packed, axis=1, count=len(self.features))
+        return self._X
+
+    @property
+    def weights(self):
+        """How many original rows each distinct pattern stands for"""
+        return np.bincount(self.inverse, minlength=len(self.labels))
+
+    def subset(self, rows):
+        """Deduplicate the given original rows into (X, y, weights)"""
+        counts = np.bincount(self.inverse[rows], minlength=len(self.labels))
+        keep = np.flatnonzero(counts)
+        return self.X[keep], self.labels[keep], counts[keep]
+
+    def expand(self):
+        """The original rows as (X, y), in CSV order"""
+        return self.X[self.inverse], self.labels[self.inverse]
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _unique_column_names(names):
+    """Rename repeated columns the way pandas does ('a', 'a.1', ...) so names match the model"""
+    seen = {}
+    unique = []
+    for name in names:
+        if name in seen:
+            seen[name] += 1
+            unique.append(f"{name}.{seen[name]}")
+        else:
+            seen[name] = 0
+            unique.append(name)
+    return unique
+
+
+def read_csv(path=CSV_FILE):
+    """Parse the training CSV into (features, classes, X, y) with sorted label codes"""
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = [row for row in reader if row]
+
+    label_position = header.index(LABEL_COLUMN)
+    feature_positions = [i for i in range(len(header)) if i != label_position]
+    features = _unique_column_names([header[i] for i in feature_positions])
+
+    X = np.array([[row[i] for i in feature_positions] for row in rows], dtype=np.uint8)
+    # Sorted names give the same codes as sklearn's LabelEncoder
+    classes, y = np.unique([row[label_position] for row in rows], return_inverse=True)
+    return features, list(classes), X, y
+
+
+def build_cache(csv_path=CSV_FILE, cache_path=CACHE_FILE):
+    """Deduplicate and pack the CSV, write the cache and return its TrainingData"""
+    csv_hash = file_hash(csv_path)
+    features, classes, X, y = read_csv(csv_path)
+
+    packed_rows = np.packbits(X, axis=1)
+    # Full-width labels as big-endian bytes, so any number of classes dedupes without wrapping
+    label_bytes = y.astype('>u4').view(np.uint8).reshape(-1, 4)
+    patterns, inverse = np.unique(
+        np.column_stack([packed_rows, label_bytes]), axis=0, return_inverse=True
+    )
+    packed = patterns[:, :-4]
+    labels = np.ascontiguousarray(patterns[:, -4:]).view('>u4').ravel().astype(np.int64)
+
+    tmp_path = f"{cache_path}.tmp.npz"
+    np.savez(
+        tmp_path,
+        cache_version=np.array(CACHE_VERSION),
+        csv_hash=np.array(csv_hash),
+        features=np.array(features),
+        classes=np.array(classes),
+        packed=packed,
+        labels=labels,
+        inverse=inverse.ravel().astype(np.int32),
+    )
+    os.replace(tmp_path, cache_path)
+    return TrainingData(features, classes, packed, labels, inverse.ravel(), csv_hash)
+
+
+def load_training_data(csv_path=CSV_FILE, cache_path=CACHE_FILE, rebuild=False):
+    """Load the cached dataset, rebuilding it when missing, outdated or forced"""
+    csv_hash = file_hash(csv_path)
+    if not rebuild and os.path.exists(cache_path):
+        with np.load(cache_path, allow_pickle=False) as cached:
+            if int(cached['cache_version']) == CACHE_VERSION and str(cached['csv_hash']) == csv_hash:
+                return TrainingData(
+                    cached['features'], cached['classes'], cached['packed'],
+                    cached['labels'], cached['inverse'], csv_hash,
+                )
+    return build_cache(csv_path, cache_path)
@@ -0,0 +1,40 @@
+"""
+Gunicorn settings for the chatbot service.
+
+The app is imported once in the master before forking, so the memory-mapped
+bundle and the compiled lookup tables are shared copy-on-write by every
+worker. Check the split with `python memory_report.py <master pid>`.
+
+Socket.IO needs every request of a session to reach the same worker, which
+gunicorn cannot do, so the default is one eventlet worker per process; scale
+out by running more processes behind a load balancer.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'eventlet')
+timeout = 120
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Move the preloaded objects out of the collector's reach; otherwise the
+    # first collection in each worker writes to their headers and unshares the pages
+    gc.freeze()
+    # Green workers patch threading after the fork, so their log listener
+    # thread is started in post_worker_init instead
+    import log_config
+    log_config.hold_listener_in_child()
+
+
+def post_worker_init(worker):
+    # Runs after eventlet/gevent workers patched threading, so the threads started here are green
+    import log_config
+    log_config.start_listener()
+    # Each worker holds its own snapshot, so each one watches the bundle file
+    # (CHATBOT_BUNDLE_WATCH_INTERVAL)
+    from app import start_bundle_watcher
+    start_bundle_watcher()
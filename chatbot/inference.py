@@ -0,0 +1,136 @@
+"""
+NumPy-only inference for the linear one-vs-one SVC used by the chatbot.
+
+`SVC(kernel='linear')` reduces to one hyperplane per pair of classes, so the
+coefficients and intercepts are exported once and a prediction becomes a sum
+of the coefficient rows of the active symptoms followed by a one-vs-one vote.
+The exported arrays live in the chatbot bundle and need only NumPy to load.
+
+Many pairwise decisions on this dataset are exactly zero, where libsvm's own
+rounding decides the vote. Those few near-zero pairs are re-evaluated with
+libsvm's support-vector arithmetic so the labels always match `SVC.predict`.
+"""
+
+import numpy as np
+
+# Primal and libsvm decision values differ by rounding noise (~1e-16); any
+# pairwise decision closer to zero than this is recomputed the libsvm way
+TIE_TOLERANCE = 1e-9
+
+
+def _pair_order(n_classes):
+    """libsvm orders the pairwise problems (0, 1), (0, 2), ..., (1, 2), ..."""
+    first, second = np.triu_indices(n_classes, k=1)
+    return first.astype(np.intp), second.astype(np.intp)
+
+
+def _pair_terms(dual_coef, n_support):
+    """Lay out the support-vector terms of every pair in libsvm's summation order"""
+    first, second = _pair_order(len(n_support))
+    starts = np.concatenate([[0], np.cumsum(n_support)[:-1]])
+    width = int(max(n_support[i] + n_support[j] for i, j in zip(first, second)))
+    pair_sv = np.zeros((len(first), width), dtype=np.intp)
+    pair_coef = np.zeros((len(first), width))
+
+    for pair, (i, j) in enumerate(zip(first, second)):
+        sv_i = np.arange(starts[i], starts[i] + n_support[i])
+        sv_j = np.arange(starts[j], starts[j] + n_support[j])
+        sv = np.concatenate([sv_i, sv_j])
+        pair_sv[pair, :len(sv)] = sv
+        pair_coef[pair, :len(sv_i)] = dual_coef[j - 1, sv_i]
+        pair_coef[pair, len(sv_i):len(sv)] = dual_coef[i, sv_j]
+    return pair_sv, pair_coef
+
+
+class LinearOvOClassifier:
+    """
+    Linear one-vs-one classifier that reproduces `SVC.predict` from exported weights.
+
+    The constructor takes the arrays in the layout they are served in, and never
+    copies arrays that already have it, so a memory-mapped bundle is used in place.
+    """
+
+    def __init__(self, coef_t, intercept, classes, support_vectors_t, pair_sv, pair_coef):
+        n_classes = len(classes)
+        n_pairs = n_classes * (n_classes - 1) // 2
+        if coef_t.shape[1] != n_pairs or len(intercept) != n_pairs or len(pair_sv) != n_pairs:
+            raise ValueError(
+                f"Expected {n_pairs} one-vs-one hyperplanes for {n_classes} classes, got {coef_t.shape[1]}"
+            )
+
+        # Stored feature-major so the rows of the active features are contiguous
+        self.coef_t = np.asarray(coef_t, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes = np.asarray(classes)
+        self.n_features = coef_t.shape[0]
+        self.support_vectors_t = np.asarray(support_vectors_t, dtype=np.float64)
+        self._pair_sv = np.asarray(pair_sv, dtype=np.intp)
+        self._pair_coef = np.asarray(pair_coef, dtype=np.float64)
+
+        self._first, self._second = _pair_order(n_classes)
+        self._n_classes = n_classes
+
+    @classmethod
+    def from_estimator(cls, model):
+        """Export the hyperplanes of a fitted linear-kernel `SVC`"""
+        if getattr(model, 'kernel', None) != 'linear' or not hasattr(model, 'dual_coef_'):
+            raise ValueError(f"Only linear-kernel SVC models can be exported, got {type(model).__name__}")
+        coef_t = np.ascontiguousarray(np.asarray(model.coef_, dtype=np.float64).T)
+        support_vectors_t = np.ascontiguousarray(np.asarray(model.support_vectors_, dtype=np.float64).T)
+        pair_sv, pair_coef = _pair_terms(model.dual_coef_, model.n_support_)
+        return cls(coef_t, model.intercept_, model.classes_, support_vectors_t, pair_sv, pair_coef)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild the classifier from the arrays returned by `to_arrays`"""
+        return cls(
+            arrays['coef_t'], arrays['intercept'], arrays['classes'],
+            arrays['support_vectors_t'], arrays['pair_sv'], arrays['pair_coef'],
+        )
+
+    def to_arrays(self):
+        """The serving arrays, for storage in the chatbot bundle"""
+        return {
+            'coef_t': self.coef_t,
+            'intercept': self.intercept,
+            'classes': self.classes,
+            'support_vectors_t': self.support_vectors_t,
+            'pair_sv': self._pair_sv.astype(np.int64),
+            'pair_coef': self._pair_coef,
+        }
+
+    def _exact_decisions(self, pairs, kernel_values):
+        """Recompute the decisions of `pairs` exactly as libsvm sums them"""
+        terms = self._pair_coef[pairs] * kernel_values
+        # cumsum accumulates left to right, matching the rounding of libsvm's loop
+        return np.cumsum(terms, axis=1)[:, -1] + self.intercept[pairs]
+
+    def predict_indices(self, active_indices):
+        """Predict the label of one binary sample given the distinct indices of its set features"""
+        active_indices = np.asarray(active_indices, dtype=np.intp)
+        decisions = self.intercept + np.add.reduce(self.coef_t[active_indices])
+
+        ties = np.flatnonzero(np.abs(decisions) < TIE_TOLERANCE)
+        if len(ties):
+            kernel = np.add.reduce(self.support_vectors_t[active_indices])
+            decisions[ties] = self._exact_decisions(ties, kernel[self._pair_sv[ties]])
+
+        # libsvm votes for the first class of a pair only on a strictly positive decision,
+        # and argmax keeps its tie-break towards the lowest class index
+        winners = np.where(decisions > 0, self._first, self._second)
+        return self.classes[np.bincount(winners, minlength=self._n_classes).argmax()]
+
+    def predict(self, X):
+        """Predict labels for a dense (n_samples, n_features) matrix, like `SVC.predict`"""
+        X = np.asarray(X, dtype=np.float64)
+        decisions = X @ self.coef_t + self.intercept
+
+        rows, ties = np.nonzero(np.abs(decisions) < TIE_TOLERANCE)
+        if len(rows):
+            kernel = X @ self.support_vectors_t
+            decisions[rows, ties] = self._exact_decisions(ties, kernel[rows[:, None], self._pair_sv[ties]])
+
+        winners = np.where(decisions > 0, self._first, self._second)
+        offsets = np.arange(len(X))[:, None] * self._n_classes
+        votes = np.bincount((winners + offsets).ravel(), minlength=len(X) * self._n_classes)
+        return self.classes[votes.reshape(len(X), self._n_classes).argmax(axis=1)]
@@ -0,0 +1,158 @@
+"""
+Per-disease knowledge index for the chatbot.
+
+The description, precaution, medication, diet and workout tables are compiled
+once into an immutable mapping keyed by disease name, so answering a
+prediction is a single dictionary lookup instead of five DataFrame scans.
+Training collects the tables into plain records stored in the chatbot bundle;
+the API builds the index from those records without pandas.
+"""
+
+from ast import literal_eval
+from collections import namedtuple
+from types import MappingProxyType
+
+NO_DESCRIPTION = "No description available"
+
+DiseaseInfo = namedtuple(
+    'DiseaseInfo',
+    ['description', 'precautions', 'medications', 'diet', 'workout', 'chat_response', 'chat_sections']
+)
+
+# One section of a streamed diagnosis: its key, heading, list items and rendered markdown
+ChatSection = namedtuple('ChatSection', ['section', 'title', 'items', 'text'])
+
+# Sections streamed after the diagnosis headline, in order
+CHAT_SECTIONS = (
+    ('description', 'Description'),
+    ('precautions', 'Precautions'),
+    ('medications', 'Medications'),
+    ('diet', 'Diet'),
+    ('workout', 'Workout'),
+)
+
+
+def _clean_values(values):
+    """Keep the non-empty string values of a column, in order"""
+    return tuple(v for v in values if isinstance(v, str) and v.strip())
+
+
+def _group_by_disease(frame, disease_column, value_columns):
+    """Collect the values of `value_columns` for every disease in one pass"""
+    grouped = {}
+    for row in frame[[disease_column] + value_columns].itertuples(index=False):
+        grouped.setdefault(row[0], []).extend(row[1:])
+    return grouped
+
+
+def render_chat_headline(disease):
+    """First line of a diagnosis message, sent ahead of the streamed sections"""
+    return f"Based on your symptoms, you might have: **{disease}**"
+
+
+def render_chat_response(disease, description, precautions):
+    """Render the markdown diagnosis message sent to chat clients"""
+    response_message = f"{render_chat_headline(disease)}\n\n"
+    response_message += f"**Description:** {description}\n\n"
+
+    if precautions:
+        response_message += "**Precautions:**\n"
+        for i, precaution in enumerate(precautions[:3], 1):
+            response_message += f"{i}. {precaution}\n"
+        response_message += "\n"
+
+    response_message += "Would you like more detailed information about medications, diet, or exercises?"
+    return response_message
+
+
+def _list_items(values):
+    """Flatten values, expanding the Python list literals some tables store in one cell"""
+    items = []
+    for value in values:
+        stripped = value.strip()
+        if stripped.startswith('[') and stripped.endswith(']'):
+            try:
+                parsed = literal_eval(stripped)
+            except (SyntaxError, ValueError):
+                parsed = None
+            if isinstance(parsed, list):
+                items.extend(str(item).strip() for item in parsed if str(item).strip())
+                continue
+        items.append(stripped)
+    return tuple(items)
+
+
+def render_chat_sections(description, **lists):
+    """Render the description and every non-empty list field as separate markdown sections"""
+    sections = []
+    for key, title in CHAT_SECTIONS:
+        if key == 'description':
+            sections.append(ChatSection(key, title, (), f"**{title}:** {description}"))
+            continue
+        items = _list_items(lists.get(key, ()))
+        if items:
+            lines = "\n".join(f"{i}. {item}" for i, item in enumerate(items, 1))
+            sections.append(ChatSection(key, title, items, f"**{title}:**\n{lines}"))
+    return tuple(sections)
+
+
+def build_disease_info(disease, descriptions=(), precautions=(), medications=(), diet=(), workout=()):
+    """Build the immutable knowledge entry for a single disease"""
+    descriptions = _clean_values(descriptions)
+    description = " ".join(descriptions) if descriptions else NO_DESCRIPTION
+    precautions = _clean_values(precautions)
+    medications = _clean_values(medications)
+    diet = _clean_values(diet)
+    workout = _clean_values(workout)
+    return DiseaseInfo(
+        description=description,
+        precautions=precautions,
+        medications=medications,
+        diet=diet,
+        workout=workout,
+        chat_response=render_chat_response(disease, description, precautions),
+        chat_sections=render_chat_sections(
+            description, precautions=precautions, medications=medications, diet=diet, workout=workout
+        ),
+    )
+
+
+def collect_knowledge(description, precautions, medications, diets, workout):
+    """
+    Gather the knowledge DataFrames into plain {disease: {field: [values]}} records.
+
+    The records hold only strings, so they can be stored in the compiled bundle
+    and turned into an index without pandas.
+    """
+    tables = {
+        'descriptions': _group_by_disease(description, 'Disease', ['Description']),
+        'precautions': _group_by_disease(
+            precautions, 'Disease', ['Precaution_1', 'Precaution_2', 'Precaution_3', 'Precaution_4']
+        ),
+        'medications': _group_by_disease(medications, 'Disease', ['Medication']),
+        'diet': _group_by_disease(diets, 'Disease', ['Diet']),
+        'workout': _group_by_disease(workout, 'disease', ['workout']),
+    }
+
+    names = set()
+    for table in tables.values():
+        names.update(table)
+
+    return {
+        name: {key: list(_clean_values(table.get(name, ()))) for key, table in tables.items()}
+        for name in sorted(names)
+    }
+
+
+def build_knowledge_index(records, diseases=()):
+    """
+    Compile knowledge records into a read-only {disease: DiseaseInfo} mapping.
+
+    `diseases` lists names the model can predict; they get an entry even when
+    the records know nothing about them, so lookups never have to fall back.
+    """
+    index = {name: build_disease_info(name, **record) for name, record in records.items()}
+    for name in diseases:
+        if name not in index:
+            index[name] = build_disease_info(name)
+    return MappingProxyType(index)
@@ -0,0 +1,28 @@
+"""
+Latency summaries for the benchmarks.
+
+Kept apart from benchmark.py, which configures the environment and loads the
+app when imported, so tests can use these without either.
+"""
+
+import math
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, scale):
+    """Latency summary of a list of durations in seconds, multiplied by `scale`"""
+    values = sorted(latency * scale for latency in latencies)
+    return {
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1] if values else 0.0,
+    }
@@ -0,0 +1,80 @@
+"""
+Synonym and lay-term lexicon for symptom names.
+
+Users write "fever", "tired" or "stomach ache", not `high_fever`, `fatigue`
+or `stomach_pain`. `symptom_synonyms.csv` lists curated phrases with the
+symptom each one stands for; a phrase may appear on several rows to stand for
+several symptoms. At load the phrases and every symptom name are compiled
+into one dict from normalized phrase to symptom indices, so resolving a term
+is a single lookup and only what it misses goes to fuzzy suggestions.
+"""
+
+import csv
+import hashlib
+import logging
+
+from symptom_matcher import space_form
+
+LEXICON_FILE = 'symptom_synonyms.csv'
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_phrase(text):
+    """Lowercase, treat '_' and '-' as spaces and collapse whitespace"""
+    return " ".join(text.lower().replace('_', ' ').replace('-', ' ').split())
+
+
+def read_synonyms(path=LEXICON_FILE):
+    """(phrase, symptom) rows of a synonym CSV with `phrase` and `symptom` columns"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [(row['phrase'], row['symptom']) for row in csv.DictReader(f) if row['phrase'] and row['symptom']]
+
+
+class SymptomLexicon:
+    """Normalized phrase -> symptom indices, for symptom names and their synonyms"""
+
+    def __init__(self, symptoms_dict, synonyms=()):
+        synonyms = list(synonyms)
+        # Identifies the synonym rows, so a reload notices a lexicon-only edit
+        digest = hashlib.sha256()
+        for phrase, symptom in synonyms:
+            digest.update(f"{phrase}\t{symptom}\n".encode('utf-8'))
+        self.version = digest.hexdigest()[:16]
+
+        index = {}
+        for symptom, position in symptoms_dict.items():
+            for form in {normalize_phrase(symptom), normalize_phrase(space_form(symptom))}:
+                index.setdefault(form, []).append(position)
+        canonical = set(index)
+
+        # Phrase -> symptom names, for the chat matcher; names already cover themselves
+        self.synonyms = {}
+        self.unknown = []
+        for phrase, symptom in synonyms:
+            phrase = normalize_phrase(phrase)
+            if not phrase or phrase in canonical:
+                continue
+            position = symptoms_dict.get(symptom)
+            if position is None:
+                self.unknown.append(symptom)
+                continue
+            targets = index.setdefault(phrase, [])
+            if position not in targets:
+                targets.append(position)
+                self.synonyms.setdefault(phrase, []).append(symptom)
+        if self.unknown:
+            logger.warning(f"Synonyms for unknown symptoms skipped: {sorted(set(self.unknown))}")
+
+        self.index = {phrase: tuple(positions) for phrase, positions in index.items()}
+
+    @classmethod
+    def from_file(cls, symptoms_dict, path=LEXICON_FILE):
+        return cls(symptoms_dict, read_synonyms(path))
+
+    def __len__(self):
+        return len(self.index)
+
+    def lookup(self, text):
+        """Indices of the symptoms `text` names, or an empty tuple"""
+        return self.index.get(normalize_phrase(text), ())
@@ -0,0 +1,211 @@
+"""
+Queued, sampled logging for the chatbot.
+
+Handlers only put records on a bounded queue; a listener thread formats and
+writes them, so a slow or contended stdout never stalls a request or the
+event loop. Records that arrive while the queue is full are dropped and
+counted instead of blocking. The queue and its listener are recreated in
+every forked child, since a prefork server forks after the app has logged.
+
+Eventlet and gevent workers monkey-patch after forking, and an OS thread
+started before that cannot take the locks the patching turns green. Servers
+running such workers call `hold_listener_in_child()` before forking and
+`start_listener()` once the worker is patched; records logged in between wait
+on the queue.
+
+Configured from the environment:
+
+    LOG_LEVEL          root level (default INFO)
+    LOG_LEVELS         per-logger levels, e.g. "engineio=INFO,chatbot.messages=DEBUG"
+    LOG_SAMPLE_RATES   share of records kept per logger, e.g. "chatbot.messages=0.1"
+    LOG_QUEUE_SIZE     records buffered before dropping (default 10000)
+
+Socket.IO and Engine.IO log every packet at INFO, so they default to WARNING.
+Sampling never drops warnings or errors.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+LOG_FORMAT = '%(levelname)s:%(name)s:%(message)s'
+DEFAULT_LEVELS = {'socketio': 'WARNING', 'engineio': 'WARNING'}
+DEFAULT_QUEUE_SIZE = 10000
+
+_queue_handler = None
+_listener = None
+_listener_settings = None
+_hold_in_child = False
+_sampled = set()
+
+
+def parse_settings(spec, convert):
+    """Parse "name=value,name=value" into a dict, converting each value"""
+    settings = {}
+    for entry in (spec or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, value = entry.partition('=')
+        if not sep or not name.strip():
+            raise ValueError(f"Expected name=value, got {entry!r}")
+        settings[name.strip()] = convert(value.strip())
+    return settings
+
+
+def parse_level(value):
+    level = logging.getLevelName(value.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level {value!r}")
+    return level
+
+
+def parse_rate(value):
+    rate = float(value)
+    if not 0 <= rate <= 1:
+        raise ValueError(f"Sample rate must be between 0 and 1, got {value!r}")
+    return rate
+
+
+class SampleFilter(logging.Filter):
+    """Keep an even `rate` share of records below WARNING; warnings and errors always pass"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self._seen = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            self._seen += 1
+            seen = self._seen
+        # Kept whenever seen * rate crosses an integer
+        return int(seen * self.rate) > int((seen - 1) * self.rate)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops and counts records instead of blocking on a full queue"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _start(queue_size, handlers, listen=True):
+    global _queue_handler, _listener, _listener_settings
+    log_queue = queue.Queue(queue_size)
+    if _queue_handler is None:
+        _queue_handler = DroppingQueueHandler(log_queue)
+    else:
+        _queue_handler.queue = log_queue
+    _listener = None
+    if listen:
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    _listener_settings = (queue_size, handlers)
+
+
+def _restart_in_child():
+    # The parent's listener thread does not exist in a forked child, and the
+    # copied queue may hold a lock taken mid-put; start over with fresh ones
+    if _listener is not None:
+        _start(*_listener_settings, listen=not _hold_in_child)
+
+
+def hold_listener_in_child(hold=True):
+    """Have forked children queue records without a listener until they call start_listener"""
+    global _hold_in_child
+    _hold_in_child = hold
+
+
+def start_listener():
+    """Start the listener held back in this process, on a new queue that takes over the waiting records"""
+    if _listener is not None or _listener_settings is None:
+        return
+    held = _queue_handler.queue
+    _start(*_listener_settings)
+    while True:
+        try:
+            record = held.get_nowait()
+        except queue.Empty:
+            break
+        _queue_handler.enqueue(record)
+
+
+def _drain(log_queue, handlers):
+    """Write queued records directly, for a process exiting before its listener started"""
+    while True:
+        try:
+            record = log_queue.get_nowait()
+        except queue.Empty:
+            return
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def stop_logging():
+    """Flush the queue and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    elif _listener_settings is not None and _queue_handler is not None:
+        _drain(_queue_handler.queue, _listener_settings[1])
+
+
+def dropped_records():
+    """Records dropped because the log queue was full"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def setup_logging(environ=os.environ, stream=None):
+    """
+    Route every log record through the queue, apply per-logger levels and
+    sample rates from the environment; calling it again reconfigures
+    """
+    levels = {**DEFAULT_LEVELS, **parse_settings(environ.get('LOG_LEVELS'), str)}
+    levels = {name: parse_level(value) for name, value in levels.items()}
+    rates = parse_settings(environ.get('LOG_SAMPLE_RATES'), parse_rate)
+    queue_size = int(environ.get('LOG_QUEUE_SIZE', DEFAULT_QUEUE_SIZE))
+
+    stop_logging()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+    _start(queue_size, [output])
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(parse_level(environ.get('LOG_LEVEL', 'INFO')))
+
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+    for name in _sampled | set(rates):
+        target = logging.getLogger(name)
+        for old in [f for f in target.filters if isinstance(f, SampleFilter)]:
+            target.removeFilter(old)
+    _sampled.clear()
+    for name, rate in rates.items():
+        if rate < 1:
+            # Logger filters see only records logged on that exact logger, not its children
+            logging.getLogger(name).addFilter(SampleFilter(rate))
+            _sampled.add(name)
+    return _queue_handler
+
+
+os.register_at_fork(after_in_child=_restart_in_child)
+atexit.register(stop_logging)
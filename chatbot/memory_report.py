@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Per-worker memory report for the chatbot running under gunicorn.
+
+Reads /proc/<pid>/smaps_rollup for the gunicorn master and each of its
+workers and splits resident memory into shared and private pages. With
+`preload_app` and the memory-mapped bundle, the model and knowledge live in
+shared pages; private memory is what each additional worker really costs.
+
+    python memory_report.py <master pid> [--max-private-mb 120]
+"""
+
+import argparse
+import os
+import sys
+
+# smaps_rollup fields summed into the report, all in kB
+SHARED_FIELDS = ('Shared_Clean', 'Shared_Dirty')
+PRIVATE_FIELDS = ('Private_Clean', 'Private_Dirty')
+
+
+def read_smaps_rollup(pid):
+    """Return the kB counters of /proc/<pid>/smaps_rollup as a dict"""
+    counters = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                counters[parts[0].rstrip(':')] = int(parts[1])
+    return counters
+
+
+def child_pids(pid):
+    """Direct children of `pid`, e.g. the workers of a gunicorn master"""
+    children = []
+    task_dir = f'/proc/{pid}/task'
+    for tid in os.listdir(task_dir):
+        with open(os.path.join(task_dir, tid, 'children')) as f:
+            children.extend(int(child) for child in f.read().split())
+    return sorted(children)
+
+
+def summarize(pid):
+    """RSS, PSS, shared and private memory of one process, in kB"""
+    counters = read_smaps_rollup(pid)
+    return {
+        'pid': pid,
+        'rss': counters.get('Rss', 0),
+        'pss': counters.get('Pss', 0),
+        'shared': sum(counters.get(field, 0) for field in SHARED_FIELDS),
+        'private': sum(counters.get(field, 0) for field in PRIVATE_FIELDS),
+    }
+
+
+def build_report(master_pid):
+    """Summaries of the master followed by each of its workers"""
+    return [summarize(master_pid)] + [summarize(pid) for pid in child_pids(master_pid)]
+
+
+def format_report(report):
+    lines = [f"{'role':<8}{'pid':>8}{'rss MB':>10}{'pss MB':>10}{'shared MB':>11}{'private MB':>12}"]
+    for index, row in enumerate(report):
+        role = 'master' if index == 0 else 'worker'
+        lines.append(
+            f"{role:<8}{row['pid']:>8}{row['rss'] / 1024:>10.1f}{row['pss'] / 1024:>10.1f}"
+            f"{row['shared'] / 1024:>11.1f}{row['private'] / 1024:>12.1f}"
+        )
+    total_pss = sum(row['pss'] for row in report)
+    lines.append(f"Total PSS: {total_pss / 1024:.1f} MB across {len(report)} processes")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report shared vs private memory of gunicorn workers")
+    parser.add_argument('pid', type=int, help="gunicorn master pid")
+    parser.add_argument('--max-private-mb', type=float,
+                        help="exit non-zero if any worker's private memory exceeds this")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.pid)
+    print(format_report(report))
+
+    workers = report[1:]
+    if args.max_private_mb is not None:
+        over = [row['pid'] for row in workers if row['private'] / 1024 > args.max_private_mb]
+        if over:
+            print(f"Workers over {args.max_private_mb} MB private: {over}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
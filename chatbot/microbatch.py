@@ -0,0 +1,125 @@
+"""
+Micro-batching of concurrent single-row predictions.
+
+Callers that arrive within a short window of each other are answered by one
+vectorized call instead of one call each. The first caller into an empty
+queue leads the batch: it waits until the window closes or the batch is full,
+runs the prediction for everyone queued, and hands each caller its result.
+There is no background thread, so the batcher is safe to create before a
+prefork server forks its workers.
+
+The callers must be OS threads. A greenlet waiting on the window would block
+its whole event loop, so async handlers should predict directly. Under
+eventlet the callers are tpool threads, which deadlock on the green locks
+monkey-patching puts into `threading`, so the batcher waits on the unpatched
+ones. Gevent keeps no unpatched copy of the module; the app does not batch
+in gevent mode.
+"""
+
+import threading
+import time
+
+try:
+    from eventlet.patcher import original
+except ImportError:
+    _threading = threading
+else:
+    # A fresh import of threading that monkey-patching never touches
+    _threading = original('threading')
+
+# Batch size buckets for the histogram of coalesced calls
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class _Request:
+    __slots__ = ('item', 'enqueued_at', 'done', 'lead', 'finished', 'result', 'error')
+
+    def __init__(self, item, enqueued_at):
+        self.item = item
+        self.enqueued_at = enqueued_at
+        self.done = _threading.Event()
+        self.lead = False
+        self.finished = False
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent `submit(item)` calls into `predict_batch(items)` calls.
+
+    `predict_batch` returns one result per item, in order. Batches close after
+    `window` seconds or at `max_batch` items; `batch_sizes` and `queue_waits`
+    are optional histograms observed once per batch and once per item.
+    """
+
+    def __init__(self, predict_batch, window=0.002, max_batch=32, batch_sizes=None, queue_waits=None):
+        self.predict_batch = predict_batch
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.batch_sizes = batch_sizes
+        self.queue_waits = queue_waits
+        self._pending = []
+        self._lock = _threading.Lock()
+        self._full = _threading.Condition(self._lock)
+
+    def submit(self, item):
+        """Queue `item` and block until its batch has been predicted; return its result"""
+        request = _Request(item, time.perf_counter())
+        with self._lock:
+            self._pending.append(request)
+            request.lead = len(self._pending) == 1
+            if len(self._pending) >= self.max_batch:
+                self._full.notify()
+
+        while not request.lead:
+            request.done.wait()
+            if request.finished:
+                return self._outcome(request)
+            # Left over from a full batch: this request leads the next one
+
+        self._lead()
+        return self._outcome(request)
+
+    def _lead(self):
+        deadline = time.perf_counter() + self.window
+        with self._lock:
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._full.wait(remaining)
+            batch = self._pending[:self.max_batch]
+            self._pending = self._pending[self.max_batch:]
+            if self._pending:
+                successor = self._pending[0]
+                successor.lead = True
+                successor.done.set()
+
+        started = time.perf_counter()
+        if self.batch_sizes is not None:
+            self.batch_sizes.observe(len(batch))
+        if self.queue_waits is not None:
+            for request in batch:
+                self.queue_waits.observe(started - request.enqueued_at)
+
+        try:
+            results = list(self.predict_batch([request.item for request in batch]))
+            if len(results) != len(batch):
+                raise ValueError(f"predict_batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for request in batch:
+                request.error = e
+                request.finished = True
+                request.done.set()
+            return
+        for request, result in zip(batch, results):
+            request.result = result
+            request.finished = True
+            request.done.set()
+
+    @staticmethod
+    def _outcome(request):
+        if request.error is not None:
+            raise request.error
+        return request.result
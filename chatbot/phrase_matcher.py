@@ -0,0 +1,81 @@
+"""
+Aho-Corasick automaton for finding known phrases in chat messages.
+
+All symptom phrases and intent keywords are compiled into one automaton at
+startup, so a message is scanned once regardless of how many phrases there
+are. Matches only count on word boundaries, so "ache" does not match inside
+"headache".
+"""
+
+from collections import deque
+
+
+def normalize_text(text):
+    """Lowercase and collapse whitespace, the form both phrases and messages are matched in"""
+    return " ".join(text.lower().split())
+
+
+class PhraseMatcher:
+    """Multi-pattern matcher returning the payloads of every whole-word phrase in a text"""
+
+    def __init__(self, phrases):
+        # Trie transitions, failure links and (length, payload) outputs per state
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+
+        for phrase, payload in phrases:
+            self._insert(normalize_text(phrase), payload)
+        self._link()
+
+    def _insert(self, phrase, payload):
+        if not phrase:
+            return
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((len(phrase), payload))
+
+    def _link(self):
+        """Compute failure links breadth-first and merge the outputs they reach"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def find(self, text):
+        """Return (start, end, payload) for every whole-word phrase in `text`, in order of their end"""
+        text = normalize_text(text)
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        last = len(text) - 1
+
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not outputs[state]:
+                continue
+            if position < last and text[position + 1].isalnum():
+                continue
+            for length, payload in outputs[state]:
+                start = position - length + 1
+                if start == 0 or not text[start - 1].isalnum():
+                    matches.append((start, position + 1, payload))
+        return matches
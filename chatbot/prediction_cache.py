@@ -0,0 +1,98 @@
+"""
+Prediction cache keyed by the canonical set of valid symptoms.
+
+Traffic concentrates on a small number of symptom combinations, so the
+predicted disease name is memoized per symptom bitmask; responses splice in
+the snapshot's pre-encoded payload for it. Entries belong to one
+model/knowledge version and are dropped when it changes.
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+def symptom_mask(active_indices):
+    """Canonical integer key for a set of feature indices, independent of order and repeats"""
+    mask = 0
+    for index in active_indices:
+        mask |= 1 << index
+    return mask
+
+
+def mask_indices(mask):
+    """Feature indices set in a symptom mask, in ascending order"""
+    indices = []
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with an optional TTL and hit/miss/eviction counters"""
+
+    def __init__(self, maxsize=4096, ttl=None, version=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self.version = version
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version=None):
+        """Return the cached value for `key`, or None; a `version` other than the cache's never hits"""
+        with self._lock:
+            entry = self._entries.get(key) if version is None or version == self.version else None
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, version=None):
+        """Store `value`; entries computed for a `version` other than the cache's are dropped"""
+        if self.maxsize <= 0:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def set_version(self, version):
+        """Bind the cache to a model/knowledge version, dropping entries of any other"""
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "version": self.version,
+            }
@@ -0,0 +1,108 @@
+"""
+Flow control for chat messages: token buckets and per-connection backlogs.
+
+Every chat message costs a classification on the worker that owns the
+socket, so one client sending faster than it can be answered slows down
+everyone else on that process. Messages are first checked against token
+buckets, one per socket session and one per user id; a bucket holds up to
+`burst` tokens and refills at `rate` per second. Admitted messages then go
+through a per-connection backlog: one handler answers a connection's messages
+in order, at most `max_pending` more wait behind it, and anything beyond that
+is merged into the newest waiting message or dropped.
+"""
+
+from collections import OrderedDict, deque
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket per key, with an LRU cap on the number of buckets; a rate of 0 disables it"""
+
+    def __init__(self, rate, burst, maxsize=10000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.maxsize = maxsize
+        self._clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        """
+        Take a token for `key`. Returns 0 when the message may proceed, otherwise
+        the seconds until a token is available.
+        """
+        if self.rate <= 0:
+            return 0
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                # A forgotten key starts again with a full bucket
+                self._buckets.popitem(last=False)
+            return wait
+
+    def forget(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class PendingQueue:
+    """
+    Per-key backlog served by one caller at a time.
+
+    `offer` returns 'run' when the caller should handle its item now and then
+    drain the key with `next`; otherwise the item was 'queued', 'coalesced'
+    into the newest waiting item with `merge`, or 'dropped'.
+    """
+
+    def __init__(self, max_pending=2, merge=None):
+        self.max_pending = max_pending
+        self.merge = merge
+        self._queues = {}
+        self._lock = threading.Lock()
+
+    def offer(self, key, item):
+        with self._lock:
+            waiting = self._queues.get(key)
+            if waiting is None:
+                self._queues[key] = deque()
+                return 'run'
+            if len(waiting) < self.max_pending:
+                waiting.append(item)
+                return 'queued'
+            if self.merge is not None and waiting:
+                waiting[-1] = self.merge(waiting[-1], item)
+                return 'coalesced'
+            return 'dropped'
+
+    def next(self, key):
+        """The next waiting item for `key`, or None once its backlog is empty"""
+        with self._lock:
+            waiting = self._queues.get(key)
+            if waiting:
+                return waiting.popleft()
+            self._queues.pop(key, None)
+            return None
+
+    def discard(self, key):
+        """Drop whatever is waiting for `key`; an item already being handled finishes"""
+        with self._lock:
+            waiting = self._queues.get(key)
+            if waiting:
+                waiting.clear()
+
+    def pending(self):
+        """Items waiting across all keys"""
+        with self._lock:
+            return sum(len(waiting) for waiting in self._queues.values())
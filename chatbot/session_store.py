@@ -0,0 +1,120 @@
+"""
+Per-session chat state: the accumulated symptom bitmask and last prediction.
+
+Each socket session keeps what the user has already reported, so a turn only
+adds the symptoms it mentions and the prediction is recomputed only when the
+set actually grows. Sessions expire after a period of inactivity; the
+in-process store also caps the number of live sessions, evicting the least
+recently used. Redis can hold the state instead when replicas share sessions.
+"""
+
+from collections import OrderedDict
+import json
+import threading
+import time
+
+
+def new_session_state():
+    """Empty state for a fresh chat session"""
+    return {'mask': 0, 'disease': None, 'turns': 0}
+
+
+class InMemorySessionStore:
+    """Thread-safe session store with an idle TTL and an LRU cap on the number of sessions"""
+
+    def __init__(self, maxsize=10000, ttl=1800, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self._clock = clock
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, session_id):
+        """Return a copy of the state for `session_id`, or None if unknown or expired"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            state, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._sessions[session_id]
+                self.expirations += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            return dict(state)
+
+    def put(self, session_id, state):
+        """Store `state` and restart the session's idle timer"""
+        if self.maxsize <= 0:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            self._sessions[session_id] = (dict(state), expires_at)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.maxsize:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "size": len(self._sessions),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
+
+
+class RedisSessionStore:
+    """
+    Session store shared through Redis.
+
+    Keys expire after the idle TTL; the memory cap is left to the server's
+    `maxmemory` with an LRU policy such as `volatile-lru`.
+    """
+
+    def __init__(self, client, ttl=1800, prefix='chatbot:session:'):
+        self.client = client
+        self.ttl = ttl or None
+        self.prefix = prefix
+
+    def get(self, session_id):
+        raw = self.client.get(self.prefix + session_id)
+        if raw is None:
+            return None
+        if self.ttl:
+            self.client.expire(self.prefix + session_id, int(self.ttl))
+        return json.loads(raw)
+
+    def put(self, session_id, state):
+        raw = json.dumps(state)
+        if self.ttl:
+            self.client.setex(self.prefix + session_id, int(self.ttl), raw)
+        else:
+            self.client.set(self.prefix + session_id, raw)
+
+    def delete(self, session_id):
+        self.client.delete(self.prefix + session_id)
+
+    def stats(self):
+        return {"backend": "redis", "ttl": self.ttl}
+
+
+def create_session_store(url=None, maxsize=10000, ttl=1800):
+    """In-process store by default, or a Redis store when `url` is given"""
+    if not url:
+        return InMemorySessionStore(maxsize=maxsize, ttl=ttl)
+
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("The redis package is required for a Redis chat session store")
+    return RedisSessionStore(redis.Redis.from_url(url), ttl=ttl)
@@ -0,0 +1,90 @@
+"""
+Exact lookup table of the symptom patterns seen in training.
+
+Most requests name a symptom combination that appears verbatim in the
+training data. The bundle stores every distinct training pattern with its
+label, and the API keys them by the same bitmask as the prediction cache, so
+those requests are answered with a dict lookup and only unseen combinations
+reach the classifier.
+"""
+
+import threading
+
+import numpy as np
+
+from prediction_cache import symptom_mask
+
+
+def build_signature_arrays(X, labels):
+    """
+    Bundle arrays for the distinct rows of a 0/1 pattern matrix and their labels.
+
+    Patterns seen with more than one label are left out, so the model decides them.
+    """
+    X = np.asarray(X, dtype=np.uint8)
+    labels = np.asarray(labels, dtype=np.int64)
+    patterns, inverse = np.unique(X, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    keep = []
+    for pattern in range(len(patterns)):
+        pattern_labels = np.unique(labels[inverse == pattern])
+        if len(pattern_labels) == 1:
+            keep.append((pattern, pattern_labels[0]))
+
+    rows = np.array([pattern for pattern, _ in keep], dtype=np.intp)
+    return {
+        # Little-endian bit order puts feature i at bit i of the packed row
+        'signature_bits': np.packbits(patterns[rows], axis=1, bitorder='little'),
+        'signature_labels': np.array([label for _, label in keep], dtype=np.int64),
+    }
+
+
+class SignatureTable:
+    """Symptom bitmask -> label for the training patterns, with hit/miss counters"""
+
+    def __init__(self, table):
+        self.table = table
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Load the table from bundle arrays; bundles without one give an empty table"""
+        if 'signature_bits' not in arrays:
+            return cls({})
+        table = {}
+        for bits, label in zip(arrays['signature_bits'], arrays['signature_labels'].tolist()):
+            table[symptom_mask(np.flatnonzero(np.unpackbits(bits, bitorder='little')).tolist())] = label
+        return cls(table)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, mask):
+        return mask in self.table
+
+    def get(self, mask):
+        """Label of a training pattern, or None if the model has to decide"""
+        label = self.table.get(mask)
+        with self._lock:
+            if label is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return label
+
+    def source(self, mask):
+        """Where the prediction for `mask` comes from, without counting a lookup"""
+        return 'table' if mask in self.table else 'model'
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.table),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
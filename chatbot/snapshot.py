@@ -0,0 +1,62 @@
+"""
+Immutable snapshot of everything the API serves from one bundle.
+
+The model, signature table, symptom index, knowledge and catalog are built
+together and never modified afterwards. Handlers read the current snapshot
+once and use it for the whole request, so replacing the module-level
+reference swaps the model and its knowledge atomically, and requests already
+in flight finish on the snapshot they started with.
+"""
+
+import time
+
+from prediction_cache import mask_indices
+
+
+class SnapshotError(Exception):
+    """Raised when a freshly loaded snapshot fails its smoke test"""
+
+
+class Snapshot:
+    """Read-only bundle of serving state, identified by the bundle's content hash"""
+
+    __slots__ = (
+        'path', 'version', 'loaded_at', 'bundle', 'svc', 'batcher', 'signature_table',
+        'symptoms_dict', 'symptom_names', 'diseases_list', 'knowledge_index', 'prediction_json',
+        'symptom_catalog', 'symptom_lexicon', 'symptom_matcher', 'chat_matcher',
+    )
+
+    def __init__(self, **fields):
+        fields.setdefault('loaded_at', time.time())
+        missing = set(self.__slots__) - set(fields)
+        if missing:
+            raise TypeError(f"Snapshot is missing {', '.join(sorted(missing))}")
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable; load a new one instead")
+
+    def __delattr__(self, name):
+        raise AttributeError("Snapshot is immutable; load a new one instead")
+
+
+def smoke_test(snapshot):
+    """Check that a snapshot can serve: every label is named and known, and a prediction resolves"""
+    if not snapshot.symptoms_dict:
+        raise SnapshotError("The bundle has no symptoms")
+    unknown = [label for label in snapshot.svc.classes.tolist() if label not in snapshot.diseases_list]
+    if unknown:
+        raise SnapshotError(f"Model labels without a disease name: {unknown}")
+
+    # A training pattern when the bundle has them, otherwise the first symptom alone
+    mask = next(iter(snapshot.signature_table.table), 1)
+    label = snapshot.svc.predict_indices(mask_indices(mask))
+    disease = snapshot.diseases_list[label]
+    if disease not in snapshot.knowledge_index:
+        raise SnapshotError(f"No knowledge entry for predicted disease {disease!r}")
+    expected = snapshot.signature_table.table.get(mask)
+    if expected is not None and expected != label:
+        raise SnapshotError(f"Model predicts {disease!r} for a training pattern labelled "
+                            f"{snapshot.diseases_list[expected]!r}")
+    return disease
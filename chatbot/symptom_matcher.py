@@ -0,0 +1,126 @@
+"""
+Indexed fuzzy matching of free-text symptoms against the known symptom names.
+
+`difflib.get_close_matches` runs a `SequenceMatcher` over every symptom name
+for each unknown token. The matcher below keeps a character-count matrix of
+every name and of its space-separated form, so one vectorized pass computes
+difflib's `quick_ratio` upper bound for all of them. The survivors get a
+tighter longest-common-subsequence bound, and only names that can still reach
+the cutoff or beat the current top results are scored exactly. Recent tokens
+are answered from an LRU cache.
+
+Scores are difflib's `ratio()`, taking the better of a name and its space
+form, so suggestions are the same as difflib's or better.
+"""
+
+from difflib import SequenceMatcher
+from functools import lru_cache
+import heapq
+
+import numpy as np
+
+
+def space_form(symptom):
+    """Human-readable form of a symptom name, e.g. 'skin_rash' -> 'skin rash'"""
+    return " ".join(symptom.replace('_', ' ').split())
+
+
+class SymptomMatcher:
+    """Fuzzy symptom suggestions with the same scoring as `difflib.get_close_matches`"""
+
+    def __init__(self, symptoms, cutoff=0.6, cache_size=1024):
+        self.symptoms = tuple(symptoms)
+        self.cutoff = cutoff
+
+        forms = []
+        owners = []
+        separator_only = []
+        for position, symptom in enumerate(self.symptoms):
+            for form in dict.fromkeys((symptom, space_form(symptom))):
+                forms.append(form)
+                owners.append(position)
+                separator_only.append(form != symptom and form == symptom.replace('_', ' '))
+        self._forms = tuple(forms)
+        self._owners = np.array(owners, dtype=np.intp)
+        # Forms that only swap '_' for ' ' score exactly like the name itself
+        # unless the query contains one of those separators
+        self._separator_only = np.array(separator_only, dtype=bool)
+        self._lengths = np.array([len(form) for form in forms], dtype=np.float64)
+
+        alphabet = sorted(set("".join(forms)))
+        self._columns = {char: column for column, char in enumerate(alphabet)}
+        self._counts = np.zeros((len(forms), len(alphabet)), dtype=np.int32)
+        for row, form in enumerate(forms):
+            for char in form:
+                self._counts[row, self._columns[char]] += 1
+
+        self._cached_suggest = lru_cache(maxsize=cache_size)(self._suggest)
+
+    def suggest(self, word, n=3):
+        """Return up to `n` symptom names similar to `word`, best first"""
+        return list(self._cached_suggest(word, n))
+
+    def cache_info(self):
+        return self._cached_suggest.cache_info()
+
+    def _upper_bounds(self, word):
+        """difflib's quick_ratio of `word` against every indexed form, in one pass"""
+        query = np.zeros(self._counts.shape[1], dtype=np.int32)
+        for char in word:
+            column = self._columns.get(char)
+            if column is not None:
+                query[column] += 1
+        matches = np.minimum(self._counts, query).sum(axis=1)
+        return 2.0 * matches / (self._lengths + len(word))
+
+    @staticmethod
+    def _lcs_length(word_masks, word_length, form):
+        """Bit-parallel longest common subsequence length (Allison-Dix / Hyyrö)"""
+        full = (1 << word_length) - 1
+        row = full
+        for char in form:
+            matches = row & word_masks.get(char, 0)
+            row = ((row + matches) | (row - matches)) & full
+        return word_length - bin(row).count('1')
+
+    def _suggest(self, word, n):
+        if not word or n <= 0:
+            return ()
+
+        bounds = self._upper_bounds(word)
+        eligible = bounds >= self.cutoff
+        if '_' not in word and ' ' not in word:
+            eligible &= ~self._separator_only
+
+        # SequenceMatcher only matches characters in order, so the longest common
+        # subsequence gives a much tighter bound than the character counts
+        word_masks = {}
+        for position, char in enumerate(word):
+            word_masks[char] = word_masks.get(char, 0) | (1 << position)
+        candidates = []
+        for row in np.flatnonzero(eligible):
+            form = self._forms[row]
+            bound = 2.0 * self._lcs_length(word_masks, len(word), form) / (len(form) + len(word))
+            if bound >= self.cutoff:
+                candidates.append((bound, row))
+        candidates.sort(key=lambda candidate: -candidate[0])
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        best = {}
+        top = []
+        for bound, row in candidates:
+            # Remaining forms cannot beat the current n-th best score, even on a tie
+            if len(top) == n and bound < top[0]:
+                break
+            matcher.set_seq1(self._forms[row])
+            score = matcher.ratio()
+            if score < self.cutoff:
+                continue
+            owner = self._owners[row]
+            if score > best.get(owner, -1.0):
+                best[owner] = score
+                top = heapq.nlargest(n, best.values())[::-1]
+
+        results = heapq.nlargest(n, ((score, self.symptoms[owner]) for owner, score in best.items()))
+        return tuple(symptom for _, symptom in results)
@@ -0,0 +1,41 @@
+import json
+import subprocess
+import sys
+
+from latency_stats import percentile
+
+
+def test_benchmark_writes_comparable_results(tmp_path):
+    output = tmp_path / 'results.json'
+    command = [
+        sys.executable, 'benchmark.py', '--requests', '6', '--warmup', '1', '--concurrency', '1,2',
+        '--micro-iterations', '5', '--output', str(output),
+    ]
+    subprocess.run(command, capture_output=True, text=True, check=True, timeout=120)
+
+    results = json.loads(output.read_text())
+    assert set(results["scenarios"]) == {'predict', 'chat', 'symptoms', 'send_message'}
+    for runs in results["scenarios"].values():
+        assert [run["concurrency"] for run in runs] == [1, 2]
+        assert all(run["requests"] == 6 and run["errors"] == 0 for run in runs)
+        assert set(runs[0]["latency_ms"]) == {"mean", "p50", "p95", "p99", "max"}
+    assert set(results["micro"]) == {'get_predicted_value', 'helper', 'process_chat_message'}
+
+    latency = results["scenarios"]["predict"][0]["latency_ms"]
+    assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+
+    # Comparing a run with itself never reports a regression
+    compared = subprocess.run(
+        command[:-1] + [str(tmp_path / 'again.json'), '--compare', str(output), '--max-regression', '100'],
+        capture_output=True, text=True, timeout=120,
+    )
+    assert compared.returncode == 0, compared.stderr
+
+
+def test_percentile_uses_nearest_rank():
+    values = [1, 2, 3, 4, 5]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 5
+    assert percentile(values, 20) == 1
+    assert percentile(values, 21) == 2
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bundle import BundleError, load_bundle, write_bundle
+
+
+def _write_sample(path):
+    arrays = {
+        'coef': np.arange(6, dtype=np.float64).reshape(2, 3),
+        'n_support': np.array([1, 2], dtype=np.int64),
+    }
+    knowledge = {'Flu': {'descriptions': ['A viral infection.'], 'precautions': ['rest']}}
+    return write_bundle(path, ['cough', 'fever', 'chills'], ['Cold', 'Flu'], knowledge, arrays, {'model': 'SVC'})
+
+
+def test_roundtrip(tmp_path):
+    path = tmp_path / 'bundle.bin'
+    content_hash = _write_sample(path)
+    bundle = load_bundle(path)
+
+    assert bundle.content_hash == content_hash
+    assert bundle.symptoms_dict == {'cough': 0, 'fever': 1, 'chills': 2}
+    assert bundle.diseases_list == {0: 'Cold', 1: 'Flu'}
+    assert bundle.knowledge['Flu']['precautions'] == ['rest']
+    assert bundle.metadata == {'model': 'SVC'}
+    assert np.array_equal(bundle.arrays['coef'], np.arange(6).reshape(2, 3))
+    assert bundle.arrays['n_support'].dtype == np.int64
+
+
+def test_hash_is_deterministic(tmp_path):
+    assert _write_sample(tmp_path / 'a.bin') == _write_sample(tmp_path / 'b.bin')
+    assert (tmp_path / 'a.bin').read_bytes() == (tmp_path / 'b.bin').read_bytes()
+
+
+def test_corruption_is_detected(tmp_path):
+    path = tmp_path / 'bundle.bin'
+    _write_sample(path)
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(BundleError, match='content hash'):
+        load_bundle(path)
+
+
+def test_missing_or_foreign_file(tmp_path):
+    with pytest.raises(BundleError, match='export-only'):
+        load_bundle(tmp_path / 'missing.bin')
+
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a bundle at all')
+    with pytest.raises(BundleError, match='not a chatbot bundle'):
+        load_bundle(path)
+
+
+def test_shipped_bundle_matches_training_data():
+    """The committed bundle must stay in sync with Training.csv"""
+    dataset = pd.read_csv('Training.csv')
+    bundle = load_bundle()
+    assert bundle.features == list(dataset.drop('prognosis', axis=1).columns)
+    assert bundle.labels == sorted(dataset['prognosis'].unique())
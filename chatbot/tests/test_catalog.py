@@ -0,0 +1,69 @@
+import gzip
+
+from flask import jsonify
+
+import app as chatbot
+from catalog import SymptomCatalog
+from conftest import client, received_events
+
+
+def test_body_matches_jsonify():
+    catalog = chatbot.snapshot.symptom_catalog
+    with chatbot.app.app_context():
+        expected = jsonify({"success": True, **catalog.payload}).get_data()
+    assert catalog.bodies['identity'] == expected
+    assert gzip.decompress(catalog.bodies['gzip']) == expected
+
+
+def test_version_depends_only_on_content():
+    assert SymptomCatalog(['b', 'a']).version == SymptomCatalog(['a', 'b']).version
+    assert SymptomCatalog(['a', 'b']).version != SymptomCatalog(['a', 'c']).version
+
+
+def test_symptoms_are_served_with_validators():
+    response = client.get('/api/symptoms')
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'W/"{chatbot.snapshot.symptom_catalog.version}"'
+    assert 'max-age' in response.headers['Cache-Control']
+    assert 'Content-Encoding' not in response.headers
+
+    data = response.get_json()
+    assert data["success"] is True
+    assert data["symptoms"] == sorted(chatbot.snapshot.symptoms_dict)
+    assert data["total"] == len(chatbot.snapshot.symptoms_dict)
+    assert data["version"] == chatbot.snapshot.symptom_catalog.version
+
+
+def test_revalidation_returns_not_modified():
+    etag = client.get('/api/symptoms').headers['ETag']
+    response = client.get('/api/symptoms', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == etag
+
+    stale = client.get('/api/symptoms', headers={'If-None-Match': 'W/"0000000000000000"'})
+    assert stale.status_code == 200
+
+
+def test_gzip_body_is_precompressed():
+    response = client.get('/api/symptoms', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.get_data() == chatbot.snapshot.symptom_catalog.bodies['gzip']
+    assert len(response.get_data()) < len(chatbot.snapshot.symptom_catalog.bodies['identity'])
+
+    refused = client.get('/api/symptoms', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in refused.headers
+
+
+def test_socket_greeting_carries_catalog_version():
+    socket_client = chatbot.socketio.test_client(chatbot.app)
+    (_, greeting), = received_events(socket_client)
+    assert greeting['catalog_version'] == chatbot.snapshot.symptom_catalog.version
+
+    socket_client.emit('get_symptoms')
+    (name, payload), = received_events(socket_client)
+    assert name == 'symptoms_list'
+    assert payload['version'] == greeting['catalog_version']
+    assert payload['total'] == len(payload['symptoms'])
+    socket_client.disconnect()
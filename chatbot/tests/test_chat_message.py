@@ -0,0 +1,55 @@
+import pytest
+
+import app as chatbot
+from conftest import client
+from phrase_matcher import PhraseMatcher
+
+
+def test_matcher_finds_overlapping_phrases():
+    matcher = PhraseMatcher([('pain', 'pain'), ('back pain', 'back'), ('stomach pain', 'stomach')])
+    found = [payload for _, _, payload in matcher.find('Back  pain and STOMACH pain')]
+    assert sorted(found) == ['back', 'pain', 'pain', 'stomach']
+
+
+def test_matcher_respects_word_boundaries():
+    matcher = PhraseMatcher([('ache', 'ache'), ('hi', 'hi')])
+    assert matcher.find('headache this morning, which hurts') == []
+    assert [payload for _, _, payload in matcher.find('Hi! my back aches, ache...')] == ['hi', 'ache']
+
+
+def test_matcher_reports_positions_in_normalized_text():
+    matcher = PhraseMatcher([('skin rash', 'rash')])
+    assert matcher.find('A   Skin rash') == [(2, 11, 'rash')]
+
+
+@pytest.mark.parametrize("message, symptoms", [
+    ("I have a headache and fever", ['high_fever', 'headache']),
+    ("itching, skin rash and nodal skin eruptions", ['itching', 'skin_rash', 'nodal_skin_eruptions']),
+    ("High fever with chills and vomiting", ['chills', 'vomiting', 'high_fever']),
+])
+def test_chat_extracts_symptoms(message, symptoms):
+    response = chatbot.process_chat_message(message)
+    assert response['type'] == 'diagnosis'
+    assert response['data']['symptoms_found'] == symptoms
+
+
+def test_substrings_of_words_are_not_symptoms():
+    """'cough' must not be read out of 'coughed', nor 'hi' out of 'this'"""
+    assert chatbot.process_chat_message("this coughed up stuff is bad")['type'] == 'default'
+
+
+@pytest.mark.parametrize("message, expected_type", [
+    ("Hello there", 'greeting'),
+    ("good morning", 'greeting'),
+    ("what can you do?", 'help'),
+    ("which one is it", 'default'),
+])
+def test_chat_intents(message, expected_type):
+    assert chatbot.process_chat_message(message)['type'] == expected_type
+
+
+def test_chat_endpoint_diagnosis_uses_knowledge():
+    response = client.post('/api/chat', json={"message": "I have itching and a skin rash"})
+    data = response.get_json()
+    assert data['success'] is True
+    assert data['response'] == chatbot.get_disease_info(data['data']['disease']).chat_response
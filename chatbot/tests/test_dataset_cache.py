@@ -0,0 +1,78 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import dataset_cache
+
+
+def _copy_csv(tmp_path):
+    csv_path = tmp_path / 'Training.csv'
+    shutil.copy('Training.csv', csv_path)
+    return str(csv_path), str(tmp_path / 'training_cache.npz')
+
+
+def test_cache_reproduces_the_csv(tmp_path):
+    csv_path, cache_path = _copy_csv(tmp_path)
+    data = dataset_cache.load_training_data(csv_path, cache_path)
+    frame = pd.read_csv('Training.csv')
+    X = frame.drop('prognosis', axis=1)
+
+    assert data.features == list(X.columns)
+    assert data.classes == sorted(frame['prognosis'].unique())
+    assert len(data.labels) < data.n_rows == len(frame)
+
+    rows, labels = data.expand()
+    np.testing.assert_array_equal(rows, X.values)
+    assert [data.classes[code] for code in labels] == list(frame['prognosis'])
+    assert data.weights.sum() == data.n_rows
+
+
+def test_cache_is_reused_until_the_csv_changes(tmp_path):
+    csv_path, cache_path = _copy_csv(tmp_path)
+    first = dataset_cache.load_training_data(csv_path, cache_path)
+    modified = os.path.getmtime(cache_path)
+
+    again = dataset_cache.load_training_data(csv_path, cache_path)
+    assert os.path.getmtime(cache_path) == modified
+    np.testing.assert_array_equal(again.packed, first.packed)
+
+    # Dropping the last row changes the hash, so the cache is rebuilt
+    with open(csv_path) as f:
+        lines = f.readlines()
+    with open(csv_path, 'w') as f:
+        f.writelines(lines[:-1])
+    rebuilt = dataset_cache.load_training_data(csv_path, cache_path)
+    assert rebuilt.csv_hash != first.csv_hash
+    assert rebuilt.n_rows == first.n_rows - 1
+
+
+def test_subset_deduplicates_rows(tmp_path):
+    csv_path, cache_path = _copy_csv(tmp_path)
+    data = dataset_cache.load_training_data(csv_path, cache_path)
+    rows = np.arange(0, data.n_rows, 3)
+
+    X, y, weights = data.subset(rows)
+    assert weights.sum() == len(rows)
+    assert len(np.unique(np.column_stack([X, y]), axis=0)) == len(X)
+    all_X, all_y = data.expand()
+    expanded = sorted(map(tuple, np.column_stack([all_X[rows], all_y[rows]])))
+    assert sorted(map(tuple, np.repeat(np.column_stack([X, y]), weights, axis=0))) == expanded
+
+
+def test_labels_beyond_256_classes_keep_their_codes(tmp_path):
+    csv_path, cache_path = str(tmp_path / 'many.csv'), str(tmp_path / 'many.npz')
+    # Classes 0 and 256 share a symptom pattern; 8-bit labels would merge them
+    with open(csv_path, 'w') as f:
+        f.write("fever,cough,prognosis\n")
+        for code in range(300):
+            f.write(f"{code % 2},0,disease_{code:03d}\n")
+        f.write("0,0,disease_256\n")
+
+    data = dataset_cache.build_cache(csv_path, cache_path)
+    assert len(data.classes) == 300
+    assert len(data.labels) == 300
+    _, labels = data.expand()
+    assert [data.classes[code] for code in labels] == [f"disease_{code:03d}" for code in range(300)] + ["disease_256"]
+    assert data.weights[list(data.labels).index(256)] == 2
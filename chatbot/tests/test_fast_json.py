@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from flask import jsonify
+
+import app as chatbot
+from conftest import client
+import fast_json
+
+pytestmark = pytest.mark.usefixtures('empty_cache')
+
+
+def _jsonify_bytes(obj):
+    with chatbot.app.app_context():
+        return jsonify(obj).get_data()
+
+
+@pytest.mark.parametrize("obj", [
+    {"text": "".join(chr(i) for i in range(128))},
+    {"b": ["fièvre", "咳嗽", " ", "\U0001f912"], "a": {"z": True, "y": None, "x": 3}},
+    {"deleted": "\x7f"},
+    [],
+    "plain",
+])
+def test_dumps_matches_jsonify(obj):
+    assert fast_json.response_body(fast_json.dumps(obj)) == _jsonify_bytes(obj)
+
+
+def test_dumps_falls_back_for_types_orjson_rejects():
+    class Text(str):
+        pass
+    assert fast_json.dumps({"a": Text("b")}) == b'{"a":"b"}'
+
+
+def test_snapshot_holds_encoded_payload_for_every_disease():
+    snap = chatbot.snapshot
+    assert set(snap.prediction_json) == set(snap.knowledge_index)
+    for disease, encoded in snap.prediction_json.items():
+        expected = json.dumps(chatbot.build_prediction_payload(disease, snap), sort_keys=True, separators=(',', ':'))
+        assert encoded == expected.encode()
+
+
+@pytest.mark.parametrize("symptoms", [
+    ["itching", "skin_rash", "nodal_skin_eruptions"],
+    ["headache", "fever", "skin_rsh", "fièvre"],
+])
+def test_predict_body_matches_jsonify(symptoms):
+    response = client.post('/api/predict', json={"symptoms": symptoms})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert response.get_data() == _jsonify_bytes(response.get_json())
+
+
+def test_batch_body_matches_jsonify():
+    items = [
+        ["itching", "skin_rash"],
+        ["nonexistent_symptom", "skin_rsh"],
+        [],
+        {"symptoms": "headache, fever, nausea"},
+        {"wrong": 1},
+    ]
+    response = client.post('/api/predict/batch', json={"items": items})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["total"] == len(items)
+    assert response.get_data() == _jsonify_bytes(data)
+
+
+def test_pretty_printing_still_applies(monkeypatch):
+    monkeypatch.setattr(chatbot.app.json, 'compact', False)
+    response = client.post('/api/predict', json={"symptoms": ["itching", "skin_rash"]})
+    assert response.status_code == 200
+    assert b'\n  "input_analysis"' in response.get_data()
@@ -0,0 +1,71 @@
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bundle import load_bundle
+from inference import LinearOvOClassifier
+
+
+@pytest.fixture(scope="module")
+def model():
+    with open('svc.pkl', 'rb') as f:
+        return pickle.load(f)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return LinearOvOClassifier.from_arrays(load_bundle().arrays)
+
+
+@pytest.fixture(scope="module")
+def training_matrix():
+    dataset = pd.read_csv('Training.csv')
+    return dataset.drop('prognosis', axis=1).values.astype(np.float64)
+
+
+def test_matches_svc_on_training_data(model, engine, training_matrix):
+    """Every row of Training.csv gets the label svc.predict gives it"""
+    expected = model.predict(training_matrix)
+    assert np.array_equal(engine.predict(training_matrix), expected)
+
+    sparse = [engine.predict_indices(np.flatnonzero(row)) for row in training_matrix]
+    assert np.array_equal(sparse, expected)
+
+
+def test_matches_svc_on_unseen_combinations(model, engine):
+    """Random symptom sets hit many exactly-zero pairwise decisions, which must vote like libsvm"""
+    rng = np.random.default_rng(7)
+    samples = (rng.random((2000, engine.n_features)) < 0.05).astype(np.float64)
+    expected = model.predict(samples)
+
+    assert np.array_equal(engine.predict(samples), expected)
+    sparse = [engine.predict_indices(np.flatnonzero(row)) for row in samples]
+    assert np.array_equal(sparse, expected)
+
+
+def test_array_roundtrip(model):
+    loaded = LinearOvOClassifier.from_arrays(LinearOvOClassifier.from_estimator(model).to_arrays())
+
+    sample = np.zeros((1, loaded.n_features))
+    sample[0, [0, 1, 2]] = 1
+    assert loaded.predict_indices([0, 1, 2]) == model.predict(sample)[0]
+
+
+def test_rejects_non_linear_models():
+    class RBFModel:
+        kernel = 'rbf'
+
+    with pytest.raises(ValueError):
+        LinearOvOClassifier.from_estimator(RBFModel())
+
+
+def test_serving_does_not_import_sklearn_or_pandas():
+    result = subprocess.run(
+        [sys.executable, '-c', "import sys, app; print('sklearn' in sys.modules, 'pandas' in sys.modules)"],
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip().splitlines()[-1] == 'False False'
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+import app as chatbot
+from conftest import client
+from knowledge import NO_DESCRIPTION, build_disease_info, render_chat_sections
+
+description_df = pd.read_csv("description.csv")
+precautions_df = pd.read_csv("precautions_df.csv")
+medications_df = pd.read_csv("medications.csv")
+diets_df = pd.read_csv("diets.csv")
+workout_df = pd.read_csv("workout_df.csv")
+
+
+def _scan(frame, column, disease, values):
+    """Reference lookup using the original DataFrame boolean-mask scans"""
+    rows = frame[frame[column] == disease][values]
+    return [v for v in rows.values.ravel() if isinstance(v, str) and v.strip()]
+
+
+@pytest.mark.parametrize("disease", sorted(set(chatbot.snapshot.diseases_list.values())))
+def test_index_matches_dataframe_scans(disease):
+    """Every predictable disease resolves to the same data the CSVs hold"""
+    desc, precautions, medications, diet, workout = chatbot.helper(disease)
+
+    expected_desc = _scan(description_df, 'Disease', disease, ['Description'])
+    assert desc == (" ".join(expected_desc) if expected_desc else NO_DESCRIPTION)
+    assert list(precautions) == _scan(
+        precautions_df, 'Disease', disease,
+        ['Precaution_1', 'Precaution_2', 'Precaution_3', 'Precaution_4'],
+    )
+    assert list(medications) == _scan(medications_df, 'Disease', disease, ['Medication'])
+    assert list(diet) == _scan(diets_df, 'Disease', disease, ['Diet'])
+    assert list(workout) == _scan(workout_df, 'disease', disease, ['workout'])
+
+
+def test_lookup_returns_shared_entry():
+    """Repeated lookups reuse the compiled entry instead of rebuilding it"""
+    assert chatbot.get_disease_info('Allergy') is chatbot.get_disease_info('Allergy')
+
+
+def test_unknown_disease_has_placeholder_entry():
+    info = chatbot.get_disease_info('Not a disease')
+    assert info == build_disease_info('Not a disease')
+    assert info.description == NO_DESCRIPTION
+    assert info.precautions == ()
+
+
+def test_chat_response_lists_first_three_precautions():
+    info = build_disease_info('Flu', ['A viral infection.'], ['rest', '', 'drink water', 'see a doctor', 'wash hands'])
+    assert info.chat_response == (
+        "Based on your symptoms, you might have: **Flu**\n\n"
+        "**Description:** A viral infection.\n\n"
+        "**Precautions:**\n1. rest\n2. drink water\n3. see a doctor\n\n"
+        "Would you like more detailed information about medications, diet, or exercises?"
+    )
+
+
+def test_chat_sections_expand_list_cells_and_skip_empty_fields():
+    sections = render_chat_sections(
+        'A viral infection.',
+        precautions=('rest', 'drink water'),
+        medications=("['Paracetamol', 'Fluids']",),
+        diet=(),
+        workout=('[not a list', 'walk'),
+    )
+    assert [s.section for s in sections] == ['description', 'precautions', 'medications', 'workout']
+    assert sections[0].text == "**Description:** A viral infection."
+    assert sections[2].items == ('Paracetamol', 'Fluids')
+    assert sections[2].text == "**Medications:**\n1. Paracetamol\n2. Fluids"
+    assert sections[3].items == ('[not a list', 'walk')
+
+
+def test_predict_skips_blank_precautions():
+    """Allergy has an empty precaution cell, which must not reach the response"""
+    response = client.post('/api/predict', json={"symptoms": ["continuous_sneezing", "shivering", "chills"]})
+    assert response.status_code == 200
+    prediction = response.get_json()["prediction"]
+    assert prediction["disease"] == "Allergy"
+    assert prediction["precautions"] == ["apply calamine", "cover area with bandage", "use ice to compress itching"]
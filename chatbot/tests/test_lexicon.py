@@ -0,0 +1,122 @@
+import pytest
+
+import app as chatbot
+from conftest import client
+from lexicon import SymptomLexicon, normalize_phrase, read_synonyms
+
+pytestmark = pytest.mark.usefixtures('empty_cache')
+
+SYMPTOMS = {'high_fever': 0, 'chills': 1, 'skin_rash': 2, 'spotting_ urination': 3}
+
+
+def test_names_resolve_in_any_spelling():
+    lexicon = SymptomLexicon(SYMPTOMS)
+    assert normalize_phrase("  Skin-Rash ") == "skin rash"
+    for text in ("skin_rash", "skin rash", "SKIN-RASH"):
+        assert lexicon.lookup(text) == (2,)
+    assert lexicon.lookup("spotting urination") == (3,)
+    assert lexicon.lookup("rash") == ()
+
+
+def test_synonyms_map_to_one_or_more_symptoms():
+    lexicon = SymptomLexicon(SYMPTOMS, [
+        ("Fever", "high_fever"),
+        ("flu like", "high_fever"),
+        ("flu like", "chills"),
+        ("flu like", "chills"),
+        ("skin rash", "chills"),
+        ("rash", "hives"),
+    ])
+    assert lexicon.lookup("fever") == (0,)
+    assert lexicon.lookup("flu-like") == (0, 1)
+    # Symptom names are not redefined by synonyms
+    assert lexicon.lookup("skin rash") == (2,)
+    assert lexicon.lookup("rash") == ()
+    assert lexicon.unknown == ["hives"]
+    assert lexicon.synonyms == {"fever": ["high_fever"], "flu like": ["high_fever", "chills"]}
+
+
+def test_shipped_synonyms_name_served_symptoms():
+    symptoms_dict = chatbot.snapshot.symptoms_dict
+    rows = read_synonyms()
+    assert rows
+    assert [symptom for _, symptom in rows if symptom not in symptoms_dict] == []
+    assert chatbot.snapshot.symptom_lexicon.unknown == []
+
+
+def test_lay_terms_skip_suggestions(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("lay terms should not need fuzzy suggestions")
+    monkeypatch.setattr(chatbot, 'suggest_symptoms', fail)
+
+    response = client.post('/api/predict', json={"symptoms": ["headache", "fever", "nausea"]})
+    assert response.status_code == 200
+    analysis = response.get_json()["input_analysis"]
+    assert analysis["valid_symptoms"] == ["headache", "high_fever", "nausea"]
+    assert analysis["invalid_symptoms"] == []
+
+    disease, valid, invalid, _ = chatbot.get_predicted_value(["tired", "Stomach ache", "skin rash"])
+    assert disease is not None
+    assert valid == ["fatigue", "stomach_pain", "skin_rash"]
+    assert invalid == []
+
+
+def test_synonym_gives_same_prediction_as_symptom_name():
+    lay = client.post('/api/predict', json={"symptoms": ["fever", "chills", "throwing up"]}).get_json()
+    named = client.post('/api/predict', json={"symptoms": ["high_fever", "chills", "vomiting"]}).get_json()
+    assert lay["prediction"] == named["prediction"]
+
+
+def test_chat_synonyms_defer_to_longer_phrases():
+    response = chatbot.process_chat_message("I have a mild fever, a stomach ache and I feel tired")
+    assert response['type'] == 'diagnosis'
+    assert sorted(response['data']['symptoms_found']) == ['fatigue', 'mild_fever', 'stomach_pain']
+
+
+def test_reload_reads_synonyms(monkeypatch, tmp_path):
+    path = tmp_path / 'synonyms.csv'
+    path.write_text("phrase,symptom\nhot flush,high_fever\n")
+    monkeypatch.setattr(chatbot, 'SYNONYMS_PATH', str(path))
+    snap = chatbot.load_snapshot()
+    assert snap.symptom_lexicon.lookup("hot flush") == (snap.symptoms_dict['high_fever'],)
+    assert snap.symptom_lexicon.lookup("fever") == ()
+
+
+def test_synonym_only_change_is_reloaded(monkeypatch, tmp_path):
+    original = chatbot.snapshot
+    path = tmp_path / 'synonyms.csv'
+    path.write_text(open(chatbot.SYNONYMS_PATH).read())
+    monkeypatch.setattr(chatbot, 'SYNONYMS_PATH', str(path))
+    monkeypatch.setattr(chatbot, 'ADMIN_TOKEN', 'token')
+    try:
+        assert chatbot.reload_snapshot() == (original, original)
+
+        path.write_text(path.read_text() + "hot flush,high_fever\n")
+        body = client.post('/admin/reload', headers={'X-Admin-Token': 'token'}).get_json()
+        assert body['reloaded']
+        assert body['model_version'] == body['previous_version'] == original.version
+        assert body['lexicon_version'] != original.symptom_lexicon.version
+        assert client.get('/health').get_json()['lexicon_version'] == body['lexicon_version']
+        assert chatbot.get_predicted_value(["hot flush", "chills"])[1] == ["high_fever", "chills"]
+    finally:
+        chatbot.snapshot = original
+
+
+def test_lexicon_version_follows_the_rows():
+    rows = [("fever", "high_fever")]
+    assert SymptomLexicon(SYMPTOMS, rows).version == SymptomLexicon(SYMPTOMS, list(rows)).version
+    assert SymptomLexicon(SYMPTOMS, rows).version != SymptomLexicon(SYMPTOMS, rows + [("chilly", "chills")]).version
+
+
+def test_watcher_notices_a_synonym_edit(monkeypatch, tmp_path):
+    original = chatbot.snapshot
+    path = tmp_path / 'synonyms.csv'
+    path.write_text("phrase,symptom\n")
+    monkeypatch.setattr(chatbot, 'SYNONYMS_PATH', str(path))
+    stamp = chatbot.bundle_stamp()
+    try:
+        path.write_text("phrase,symptom\nhot flush,high_fever\n")
+        chatbot.check_bundle(stamp)
+        assert chatbot.snapshot.symptom_lexicon.lookup("hot flush") == (original.symptoms_dict['high_fever'],)
+    finally:
+        chatbot.snapshot = original
@@ -0,0 +1,158 @@
+import io
+import logging
+import os
+import queue
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import log_config
+from log_config import DroppingQueueHandler, SampleFilter, parse_level, parse_rate, parse_settings, setup_logging
+
+
+@pytest.fixture
+def configure():
+    """Set up logging into a buffer; restore the default setup afterwards"""
+    def configure(**environ):
+        stream = io.StringIO()
+        setup_logging(environ, stream=stream)
+        return stream
+    yield configure
+    setup_logging({})
+
+
+def _flush():
+    # Stopping the listener drains the queue before the thread exits
+    log_config.stop_logging()
+
+
+def _record(level):
+    return logging.LogRecord('test', level, __file__, 1, 'message', None, None)
+
+
+def test_parse_settings():
+    assert parse_settings("engineio=info, chatbot.messages = DEBUG,", parse_level) == {
+        'engineio': logging.INFO, 'chatbot.messages': logging.DEBUG,
+    }
+    assert parse_settings(None, parse_rate) == {}
+    with pytest.raises(ValueError):
+        parse_settings("engineio", parse_level)
+    with pytest.raises(ValueError):
+        parse_settings("engineio=LOUD", parse_level)
+    with pytest.raises(ValueError):
+        parse_settings("chatbot.messages=2", parse_rate)
+
+
+def test_sample_filter_keeps_rate_share_and_all_warnings():
+    sample = SampleFilter(0.25)
+    kept = sum(sample.filter(_record(logging.INFO)) for _ in range(100))
+    assert kept == 25
+    assert all(sample.filter(_record(logging.WARNING)) for _ in range(10))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for _ in range(5):
+        handler.handle(_record(logging.INFO))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_records_are_written_by_listener(configure):
+    stream = configure(LOG_LEVELS="test.quiet=WARNING")
+    logging.getLogger('test.loud').info("kept")
+    logging.getLogger('test.quiet').info("filtered")
+    logging.getLogger('test.quiet').warning("warned")
+    logging.getLogger('engineio.server').info("transport chatter")
+    _flush()
+
+    output = stream.getvalue()
+    assert "INFO:test.loud:kept" in output
+    assert "warned" in output
+    assert "filtered" not in output
+    assert "transport chatter" not in output
+
+
+def test_sample_rates_apply_and_reset(configure):
+    stream = configure(LOG_SAMPLE_RATES="test.sampled=0.1")
+    sampled = logging.getLogger('test.sampled')
+    for i in range(50):
+        sampled.info(f"event {i}")
+    _flush()
+    assert stream.getvalue().count("event") == 5
+
+    stream = configure()
+    for i in range(10):
+        sampled.info(f"event {i}")
+    _flush()
+    assert stream.getvalue().count("event") == 10
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_forked_child_gets_its_own_listener(configure, tmp_path):
+    path = tmp_path / 'child.log'
+    configure()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            with open(path, 'w') as f:
+                log_config._listener.handlers[0].setStream(f)
+                logging.getLogger('test.child').info("from child")
+                log_config.stop_logging()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    assert "from child" in path.read_text()
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_setup_logging_under_eventlet_monkey_patch():
+    # Preloaded in the master, then forked into a worker that monkey-patches,
+    # as gunicorn's eventlet worker does; and set up directly after patching
+    script = textwrap.dedent("""
+        import logging, os, sys
+        import log_config
+        log_config.setup_logging({}, stream=sys.stdout)
+        log_config.hold_listener_in_child()
+        logging.getLogger('test').info("master")
+        pid = os.fork()
+        if pid == 0:
+            logging.getLogger('test').info("before patch")
+            import eventlet
+            eventlet.monkey_patch()
+            log_config.start_listener()
+            pool = eventlet.GreenPool()
+            for i in range(200):
+                pool.spawn(logging.getLogger('test').info, f"green {i}")
+            pool.waitall()
+            log_config.setup_logging({}, stream=sys.stdout)
+            pool.spawn(logging.getLogger('test').info, "reconfigured")
+            pool.waitall()
+            log_config.stop_logging()
+            sys.stdout.flush()
+            os._exit(0)
+        _, status = os.waitpid(pid, 0)
+        log_config.stop_logging()
+        sys.exit(os.waitstatus_to_exitcode(status))
+    """)
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert 'Traceback' not in result.stderr and 'greenlet' not in result.stderr, result.stderr
+    lines = result.stdout.splitlines()
+    for message in ["master", "before patch", "reconfigured"] + [f"green {i}" for i in range(200)]:
+        assert f"INFO:test:{message}" in lines
+
+
+def test_held_records_are_written_on_stop(tmp_path):
+    stream = io.StringIO()
+    try:
+        setup_logging({}, stream=stream)
+        log_config._start(*log_config._listener_settings, listen=False)
+        logging.getLogger('test.held').info("waiting")
+        assert stream.getvalue() == ""
+        log_config.stop_logging()
+        assert "INFO:test.held:waiting" in stream.getvalue()
+    finally:
+        setup_logging({})
@@ -0,0 +1,123 @@
+import importlib.util
+import queue
+import threading
+
+import socketio
+from werkzeug.serving import make_server
+
+import app as chatbot
+
+
+class InProcessBus:
+    """Fan-out channel standing in for Redis pub/sub between servers in one process"""
+
+    def __init__(self):
+        self.subscribers = []
+
+    def subscribe(self):
+        inbox = queue.Queue()
+        self.subscribers.append(inbox)
+        return inbox
+
+    def publish(self, message):
+        for inbox in self.subscribers:
+            inbox.put(message)
+
+
+class InProcessManager(socketio.PubSubManager):
+    """Takes the place of RedisManager; servers given the same URL share one bus"""
+    name = 'inprocess'
+    buses = {}
+
+    def __init__(self, url, channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.url = url
+        self.bus = self.buses.setdefault(url, InProcessBus())
+        self.inbox = self.bus.subscribe()
+
+    def _publish(self, data):
+        self.bus.publish(data)
+
+    def _listen(self):
+        while True:
+            yield self.inbox.get()
+
+
+def load_replica(name):
+    """Import another copy of the chatbot app module, configured from the environment"""
+    spec = importlib.util.spec_from_file_location(name, chatbot.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Replica:
+    """A copy of the real chatbot app served on its own port"""
+
+    def __init__(self, name):
+        self.module = load_replica(name)
+        self.http = make_server('127.0.0.1', 0, self.module.app, threaded=True)
+        self.url = f"http://127.0.0.1:{self.http.server_port}"
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.http.shutdown()
+
+
+def connect(replica):
+    """Connect a real client to `replica`; return it with its sid and the messages it receives"""
+    client = socketio.Client()
+    inbox = queue.Queue()
+    client.on('message', inbox.put)
+    client.connect(replica.url, transports=['polling'])
+    greeting = inbox.get(timeout=5)
+    assert greeting['type'] == 'greeting'
+    return client, client.get_sid(), inbox
+
+
+def test_two_app_replicas_exchange_emits(monkeypatch):
+    monkeypatch.setenv('SOCKETIO_ASYNC_MODE', 'threading')
+    monkeypatch.setenv('SOCKETIO_MESSAGE_QUEUE', 'redis://standin:6379/0')
+    monkeypatch.setenv('SOCKETIO_CHANNEL', 'chatbot-test')
+    # socketio_options hands the URL to Flask-SocketIO, which picks RedisManager for redis://
+    monkeypatch.setattr(socketio, 'RedisManager', InProcessManager)
+    InProcessManager.buses.clear()
+
+    replica_a, replica_b = Replica('chatbot_replica_a'), Replica('chatbot_replica_b')
+    client_a, sid_a, inbox_a = connect(replica_a)
+    client_b, sid_b, inbox_b = connect(replica_b)
+    try:
+        for replica in (replica_a, replica_b):
+            manager = replica.module.socketio.server.manager
+            assert isinstance(manager, InProcessManager)
+            assert (manager.url, manager.channel) == ('redis://standin:6379/0', 'chatbot-test')
+
+        # Each server reaches the client connected to the other one
+        replica_b.module.socketio.emit('message', {'text': 'from b'}, to=sid_a)
+        replica_a.module.socketio.emit('message', {'text': 'from a'}, to=sid_b)
+
+        assert inbox_a.get(timeout=5) == {'text': 'from b'}
+        assert inbox_b.get(timeout=5) == {'text': 'from a'}
+        assert inbox_a.empty() and inbox_b.empty()
+    finally:
+        client_a.disconnect()
+        client_b.disconnect()
+        replica_a.stop()
+        replica_b.stop()
+
+
+def test_message_queue_is_optional():
+    options = chatbot.socketio_options({})
+    assert 'message_queue' not in options
+    assert 'transports' not in options
+
+
+def test_message_queue_options_from_environment():
+    options = chatbot.socketio_options({
+        'SOCKETIO_MESSAGE_QUEUE': 'redis://redis:6379/0',
+        'SOCKETIO_CHANNEL': 'chatbot',
+        'SOCKETIO_TRANSPORTS': 'websocket',
+    })
+    assert options['message_queue'] == 'redis://redis:6379/0'
+    assert options['channel'] == 'chatbot'
+    assert options['transports'] == ['websocket']
@@ -0,0 +1,98 @@
+import time
+
+import app as chatbot
+from conftest import client
+from metrics import Counter, Gauge, Histogram, Registry, StageTimer
+
+
+def _sample(text, line_prefix):
+    """Value of the first sample line starting with `line_prefix`"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram('latency_seconds', 'Latency', ('stage',), buckets=(0.1, 1.0)))
+    histogram.observe(0.05, 'parse')
+    histogram.observe(0.1, 'parse')
+    histogram.observe(5.0, 'parse')
+
+    assert registry.render().splitlines() == [
+        '# HELP latency_seconds Latency',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{stage="parse",le="0.1"} 2',
+        'latency_seconds_bucket{stage="parse",le="1.0"} 2',
+        'latency_seconds_bucket{stage="parse",le="+Inf"} 3',
+        'latency_seconds_sum{stage="parse"} 5.15',
+        'latency_seconds_count{stage="parse"} 3',
+    ]
+
+
+def test_counter_and_gauge_escape_label_values():
+    registry = Registry()
+    counter = registry.register(Counter('predictions_total', 'Predictions', ('disease',)))
+    gauge = registry.register(Gauge('connections', 'Connections'))
+    counter.inc('Paralysis "brain"')
+    counter.inc('Paralysis "brain"', amount=2)
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    text = registry.render()
+    assert 'predictions_total{disease="Paralysis \\"brain\\""} 3' in text
+    assert '\nconnections 1\n' in text
+
+
+def test_stage_timer_records_each_lap():
+    histogram = Histogram('stage_seconds', 'Stages', ('handler', 'stage'))
+    timer = StageTimer(histogram, 'predict')
+    timer.lap('parse')
+    timer.lap('predict')
+    timer.lap('predict')
+    assert histogram.count('predict', 'parse') == 1
+    assert histogram.count('predict', 'predict') == 2
+
+
+def test_observation_overhead_is_microseconds():
+    histogram = Histogram('stage_seconds', 'Stages', ('handler', 'stage'))
+    timer = StageTimer(histogram, 'predict')
+    rounds = 20000
+    started = time.perf_counter()
+    for _ in range(rounds):
+        timer.lap('parse')
+    per_lap = (time.perf_counter() - started) / rounds
+    assert per_lap < 20e-6
+
+
+def test_metrics_endpoint_reports_request_stages():
+    client.post('/api/predict', json={"symptoms": ["itching", "skin_rash", "not_a_symptom"]})
+    client.post('/api/chat', json={"message": "I have a cough"})
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+
+    for handler, stage in [('predict', 'parse'), ('predict', 'analyze'), ('predict', 'predict'),
+                           ('predict', 'encode'), ('chat', 'classify'), ('chat', 'encode')]:
+        assert _sample(text, f'chatbot_stage_seconds_count{{handler="{handler}",stage="{stage}"}}') >= 1
+    assert _sample(text, 'chatbot_symptoms_total{result="invalid"}') >= 1
+    assert _sample(text, 'chatbot_suggestion_seconds_count') >= 1
+    assert 'chatbot_predictions_total{disease="' in text
+    assert _sample(text, 'chatbot_prediction_cache_hit_ratio') is not None
+
+
+def test_socket_metrics():
+    before = chatbot.socket_connections.value()
+    socket_client = chatbot.socketio.test_client(chatbot.app)
+    assert chatbot.socket_connections.value() == before + 1
+
+    socket_client.emit('send_message', {'message': 'I have itching'})
+    assert chatbot.stage_latency.count('send_message', 'classify') >= 1
+    assert chatbot.stage_latency.count('send_message', 'emit') >= 1
+
+    socket_client.disconnect()
+    assert chatbot.socket_connections.value() == before
@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+import random
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+import app as chatbot
+from metrics import Histogram
+from microbatch import BATCH_SIZE_BUCKETS, MicroBatcher
+
+
+def run_concurrently(batcher, items):
+    barrier = threading.Barrier(len(items))
+
+    def call(item):
+        barrier.wait()
+        return batcher.submit(item)
+
+    with ThreadPoolExecutor(max_workers=len(items)) as pool:
+        return list(pool.map(call, items))
+
+
+def test_concurrent_calls_share_one_batch():
+    batches = []
+
+    def predict_batch(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    sizes = Histogram('sizes', 'batch sizes', buckets=BATCH_SIZE_BUCKETS)
+    waits = Histogram('waits', 'queue waits')
+    batcher = MicroBatcher(predict_batch, window=0.5, max_batch=8, batch_sizes=sizes, queue_waits=waits)
+
+    assert run_concurrently(batcher, list(range(8))) == [item * 10 for item in range(8)]
+    # The batch fills up long before the window closes
+    assert len(batches) == 1 and sorted(batches[0]) == list(range(8))
+    assert sizes.count() == 1 and waits.count() == 8
+
+
+def test_leftovers_from_a_full_batch_get_a_new_leader():
+    batches = []
+
+    def predict_batch(items):
+        batches.append(len(items))
+        return [-item for item in items]
+
+    batcher = MicroBatcher(predict_batch, window=0.05, max_batch=4)
+    assert run_concurrently(batcher, list(range(10))) == [-item for item in range(10)]
+    assert sum(batches) == 10 and max(batches) <= 4
+
+
+def test_lone_caller_waits_at_most_the_window():
+    batcher = MicroBatcher(lambda items: items, window=0.01, max_batch=32)
+    started = time.perf_counter()
+    assert batcher.submit('a') == 'a'
+    assert time.perf_counter() - started < 0.5
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def predict_batch(items):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(predict_batch, window=0.2, max_batch=3)
+    barrier = threading.Barrier(3)
+    errors = []
+
+    def call(item):
+        barrier.wait()
+        try:
+            batcher.submit(item)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+
+
+def test_batched_predictions_match_single_rows():
+    snap = chatbot.snapshot
+    batcher = chatbot.build_batcher(snap.svc, len(snap.symptoms_dict))
+    batcher.window = 0.02
+    rng = random.Random(0)
+    rows = [sorted(rng.sample(range(len(snap.symptoms_dict)), rng.randint(1, 6))) for _ in range(24)]
+
+    labels = run_concurrently(batcher, rows)
+    assert labels == [snap.svc.predict_indices(row) for row in rows]
+
+
+@pytest.mark.parametrize("mode,in_worker,expected", [
+    ('eventlet', False, True), ('eventlet', True, False), ('gevent', False, True), ('threading', False, False),
+])
+def test_greenlets_on_the_hub_never_wait_for_a_batch(monkeypatch, mode, in_worker, expected):
+    monkeypatch.setattr(chatbot.socketio, 'async_mode', mode)
+    call = chatbot.call_as_worker if in_worker else (lambda func: func())
+    assert call(chatbot.on_event_loop) is expected
+    # Any other thread is treated the same way: under monkey-patching a greenlet looks like one
+    result = []
+    thread = threading.Thread(target=lambda: result.append(call(chatbot.on_event_loop)))
+    thread.start()
+    thread.join()
+    assert result == [expected]
+    assert chatbot.on_event_loop() is (mode != 'threading')
+
+
+def test_eventlet_greenlets_use_the_hub_and_tpool_work_may_batch():
+    script = textwrap.dedent("""
+        import eventlet
+        eventlet.monkey_patch()
+        import app as chatbot
+        chatbot.socketio.async_mode = 'eventlet'
+        greenlet = eventlet.spawn(chatbot.on_event_loop).wait()
+        worker = chatbot.run_in_worker(chatbot.on_event_loop)
+        print(greenlet, worker)
+    """)
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-2:] == ['True', 'False']
+
+
+def test_concurrent_submits_through_tpool_under_eventlet():
+    # Tpool threads must not wait on the green locks monkey-patching leaves in threading
+    script = textwrap.dedent("""
+        import os
+        os.environ['PREDICTION_BATCH_WINDOW_MS'] = '20'
+        import eventlet
+        eventlet.monkey_patch()
+        import app as chatbot
+        chatbot.socketio.async_mode = 'eventlet'
+        snap = chatbot.snapshot
+        sizes = []
+        predict_batch = snap.batcher.predict_batch
+        snap.batcher.predict_batch = lambda rows: sizes.append(len(rows)) or predict_batch(rows)
+
+        rows = [[0, 5], [1, 7], [2, 9], [3, 11], [4, 13], [5, 17]]
+        pool = eventlet.GreenPool()
+        labels = list(pool.imap(lambda row: chatbot.run_in_worker(snap.batcher.submit, row), rows))
+        assert labels == [snap.svc.predict_indices(row) for row in rows], labels
+        assert sum(sizes) == len(rows) and max(sizes) > 1, sizes
+        print("batched", sizes)
+    """)
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert 'batched' in result.stdout
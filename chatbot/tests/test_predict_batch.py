@@ -0,0 +1,80 @@
+import app as chatbot
+from conftest import client
+
+
+def test_batch_matches_single_predictions():
+    """Each batch result has the same body the single endpoint returns"""
+    items = [
+        ["itching", "skin_rash", "nodal_skin_eruptions"],
+        "continuous_sneezing, shivering, chills",
+        {"symptoms": ["headache", "fever", "nausea"]},
+    ]
+    response = client.post('/api/predict/batch', json={"items": items})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["success"] is True
+    assert data["total"] == len(items)
+
+    for item, result in zip(items, data["results"]):
+        body = item if isinstance(item, dict) else {"symptoms": item}
+        single = client.post('/api/predict', json=body)
+        assert single.status_code == 200
+        assert result == single.get_json()
+
+
+def test_batch_reports_per_item_errors():
+    items = [
+        ["itching", "skin_rash"],
+        ["nonexistent_symptom", "skin_rsh"],
+        [],
+        42,
+        {"notes": "missing symptoms"},
+        ["a", None],
+        {"symptoms": ["itching", 5]},
+    ]
+    response = client.post('/api/predict/batch', json={"items": items})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+
+    assert results[0]["success"] is True
+    assert results[1] == {
+        "success": False,
+        "error": "No valid symptoms found",
+        "invalid_symptoms": ["nonexistent_symptom", "skin_rsh"],
+        "suggestions": {"skin_rsh": ["skin_rash"]},
+    }
+    assert results[2] == {"success": False, "error": "Please provide valid symptoms"}
+    assert results[3] == {"success": False, "error": "Symptoms must be a string or array"}
+    assert results[4] == {"success": False, "error": "Symptoms are required"}
+    # A malformed row fails on its own instead of the whole batch
+    assert results[5] == results[6] == {"success": False, "error": "Symptoms must be a string or array"}
+
+
+def test_single_predict_rejects_non_string_symptoms():
+    response = client.post('/api/predict', json={"symptoms": ["itching", None]})
+    assert response.status_code == 400
+
+
+def test_batch_uses_one_model_call(monkeypatch):
+    chatbot.prediction_cache.clear()
+    calls = []
+    original_predict = chatbot.snapshot.svc.predict
+
+    def counting_predict(matrix):
+        calls.append(len(matrix))
+        return original_predict(matrix)
+
+    monkeypatch.setattr(chatbot.snapshot.svc, 'predict', counting_predict, raising=False)
+    items = [["itching"], ["cough", "high_fever"], ["joint_pain"]]
+    response = client.post('/api/predict/batch', json={"items": items})
+    assert response.status_code == 200
+    assert calls == [3]
+
+
+def test_batch_rejects_invalid_payloads(monkeypatch):
+    assert client.post('/api/predict/batch', json={}).status_code == 400
+    assert client.post('/api/predict/batch', json={"items": "itching"}).status_code == 400
+
+    monkeypatch.setattr(chatbot, 'MAX_BATCH_SIZE', 2)
+    response = client.post('/api/predict/batch', json={"items": [["itching"]] * 3})
+    assert response.status_code == 400
@@ -0,0 +1,85 @@
+import pytest
+
+import app as chatbot
+from conftest import FakeClock, client
+from prediction_cache import PredictionCache, symptom_mask
+
+pytestmark = pytest.mark.usefixtures('empty_cache')
+
+
+def test_mask_ignores_order_and_repeats():
+    assert symptom_mask([3, 1, 3]) == symptom_mask([1, 3]) == 0b1010
+    assert symptom_mask([]) == 0
+
+
+def test_lru_eviction_counts():
+    cache = PredictionCache(maxsize=2)
+    cache.put(1, 'a')
+    cache.put(2, 'b')
+    assert cache.get(1) == 'a'
+    cache.put(3, 'c')
+
+    assert cache.get(2) is None
+    assert cache.get(1) == 'a'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 1, 1, 2)
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = PredictionCache(maxsize=8, ttl=10, clock=clock)
+    cache.put(1, 'a')
+    clock.now = 9.9
+    assert cache.get(1) == 'a'
+    clock.now = 10.1
+    assert cache.get(1) is None
+    assert cache.stats()['size'] == 0
+
+
+def test_version_change_drops_entries():
+    cache = PredictionCache(version='v1')
+    cache.put(1, 'a')
+    cache.set_version('v1')
+    assert cache.get(1) == 'a'
+    cache.set_version('v2')
+    assert cache.get(1) is None
+
+
+def test_zero_size_disables_caching():
+    cache = PredictionCache(maxsize=0)
+    cache.put(1, 'a')
+    assert cache.get(1) is None
+
+
+def test_repeated_symptom_set_skips_the_model(monkeypatch):
+    first = client.post('/api/predict', json={"symptoms": ["itching", "skin_rash", "nodal_skin_eruptions"]})
+
+    def fail(*args):
+        raise AssertionError("model should not be called on a cache hit")
+
+    monkeypatch.setattr(chatbot.snapshot.svc, 'predict_indices', fail)
+    monkeypatch.setattr(chatbot.snapshot.svc, 'predict', fail)
+
+    # Same set in another order, with a repeat and an unknown symptom
+    second = client.post('/api/predict', json={"symptoms": ["nodal_skin_eruptions", "itching", "skin_rash", "itching", "rsh"]})
+    assert second.status_code == 200
+    assert second.get_json()["prediction"] == first.get_json()["prediction"]
+    assert second.get_json()["input_analysis"]["invalid_symptoms"] == ["rsh"]
+
+    batch = client.post('/api/predict/batch', json={"items": [["skin_rash", "itching", "nodal_skin_eruptions"]]})
+    assert batch.get_json()["results"][0]["prediction"] == first.get_json()["prediction"]
+
+    chat = chatbot.process_chat_message("itching, skin rash and nodal skin eruptions")
+    assert chat['data']['disease'] == first.get_json()["prediction"]["disease"]
+
+
+def test_health_reports_cache_stats():
+    client.post('/api/predict', json={"symptoms": ["cough"]})
+    client.post('/api/predict', json={"symptoms": ["cough"]})
+
+    data = client.get('/health').get_json()
+    assert data["status"] == "healthy"
+    assert data["model_version"] == chatbot.snapshot.version
+    stats = data["prediction_cache"]
+    assert stats["hits"] >= 1 and stats["misses"] >= 1
+    assert stats["version"] == chatbot.snapshot.version
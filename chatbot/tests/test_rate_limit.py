@@ -0,0 +1,129 @@
+from collections import deque
+
+import pytest
+
+import app as chatbot
+from conftest import FakeClock, received_events
+from rate_limit import PendingQueue, RateLimiter
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2, burst=3, clock=clock)
+    assert [limiter.allow('a') for _ in range(3)] == [0, 0, 0]
+    assert limiter.allow('a') == pytest.approx(0.5)
+    # Other keys have their own bucket
+    assert limiter.allow('b') == 0
+
+    clock.now += 0.5
+    assert limiter.allow('a') == 0
+    assert limiter.allow('a') > 0
+    clock.now += 60
+    assert [limiter.allow('a') for _ in range(4)] == [0, 0, 0, pytest.approx(0.5)]
+
+
+def test_zero_rate_disables_limit():
+    limiter = RateLimiter(rate=0, burst=1)
+    assert all(limiter.allow('a') == 0 for _ in range(100))
+
+
+def test_bucket_count_is_bounded():
+    limiter = RateLimiter(rate=1, burst=1, maxsize=2, clock=FakeClock())
+    for key in 'abc':
+        limiter.allow(key)
+    assert len(limiter) == 2
+    limiter.forget('c')
+    assert len(limiter) == 1
+
+
+def test_pending_queue_runs_one_item_per_key_and_bounds_the_rest():
+    queue = PendingQueue(max_pending=1, merge=lambda waiting, item: waiting + item)
+    assert queue.offer('a', 'x') == 'run'
+    assert queue.offer('b', 'y') == 'run'
+    assert queue.offer('a', '1') == 'queued'
+    assert queue.offer('a', '2') == 'coalesced'
+    assert queue.pending() == 1
+    assert queue.next('a') == '12'
+    assert queue.next('a') is None
+    assert queue.offer('a', 'z') == 'run'
+
+    dropping = PendingQueue(max_pending=0)
+    assert dropping.offer('a', 'x') == 'run'
+    assert dropping.offer('a', 'y') == 'dropped'
+
+
+def test_discard_empties_backlog():
+    queue = PendingQueue(max_pending=3)
+    queue.offer('a', 1)
+    queue.offer('a', 2)
+    queue.discard('a')
+    assert queue.next('a') is None
+    assert queue.pending() == 0
+
+
+def test_socket_session_rate_limit(monkeypatch):
+    monkeypatch.setattr(chatbot, 'session_limiter', RateLimiter(rate=0.01, burst=2))
+    before = chatbot.throttled_counter.value('session_rate')
+    client = chatbot.socketio.test_client(chatbot.app)
+    client.get_received()
+
+    for _ in range(3):
+        client.emit('send_message', {'message': 'I have itching', 'timestamp': 42})
+    events = received_events(client)
+    assert [name for name, _ in events].count('message') == 2
+    (_, throttled), = [event for event in events if event[0] == 'throttled']
+    assert throttled['reason'] == 'session_rate'
+    assert throttled['message_timestamp'] == 42
+    assert throttled['retry_after'] > 0
+    assert chatbot.throttled_counter.value('session_rate') == before + 1
+    client.disconnect()
+
+
+def test_user_rate_limit_spans_connections(monkeypatch):
+    monkeypatch.setattr(chatbot, 'user_limiter', RateLimiter(rate=0.01, burst=1))
+    first = chatbot.socketio.test_client(chatbot.app)
+    second = chatbot.socketio.test_client(chatbot.app)
+    first.get_received()
+    second.get_received()
+
+    first.emit('send_message', {'message': 'hello', 'user_id': 'flooder'})
+    second.emit('send_message', {'message': 'hello', 'user_id': 'flooder'})
+    assert 'message' in [name for name, _ in received_events(first)]
+    assert [payload['reason'] for name, payload in received_events(second) if name == 'throttled'] == ['user_rate']
+    first.disconnect()
+    second.disconnect()
+
+
+class BusyQueue(PendingQueue):
+    """Backlog whose connections are always mid-answer, so every message waits"""
+
+    def offer(self, key, item):
+        self._queues.setdefault(key, deque())
+        return super().offer(key, item)
+
+
+@pytest.mark.parametrize("overflow, reason", [('coalesce', 'coalesced'), ('drop', 'dropped')])
+def test_backlog_overflow_is_reported(monkeypatch, overflow, reason):
+    merge = chatbot.merge_messages if overflow == 'coalesce' else None
+    backlog = BusyQueue(max_pending=1, merge=merge)
+    monkeypatch.setattr(chatbot, 'pending_messages', backlog)
+    client = chatbot.socketio.test_client(chatbot.app)
+    client.get_received()
+
+    for text in ('I have itching', 'and a skin rash', 'and chills'):
+        client.emit('send_message', {'message': text})
+    events = received_events(client)
+    assert [payload['reason'] for _, payload in events] == [reason, reason]
+    assert [name for name, _ in events] == ['throttled', 'throttled']
+    assert chatbot.metrics_registry.render().count('chatbot_pending_messages 1') == 1
+
+    (key,) = backlog._queues
+    waiting = backlog.next(key)
+    expected = "I have itching\nand a skin rash\nand chills" if overflow == 'coalesce' else "I have itching"
+    assert waiting['message'] == expected
+    client.disconnect()
+
+
+def test_unverified_user_ids_are_not_limited_by_default():
+    assert chatbot.CHAT_USER_RATE == 0
+    assert chatbot.user_limiter.rate == 0
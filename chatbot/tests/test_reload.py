@@ -0,0 +1,149 @@
+import copy
+import threading
+
+import pytest
+
+import app as chatbot
+from bundle import write_bundle
+from conftest import client
+from snapshot import SnapshotError, smoke_test
+
+TOKEN = 'test-admin-token'
+UPDATED = 'Updated description for the reload test.'
+
+
+@pytest.fixture(autouse=True)
+def served_snapshot(monkeypatch):
+    original = chatbot.snapshot
+    monkeypatch.setattr(chatbot, 'ADMIN_TOKEN', TOKEN)
+    chatbot.prediction_cache.clear()
+    yield original
+    chatbot.snapshot = original
+    chatbot.prediction_cache.set_version(original.version)
+
+
+def write_variant(path, bundle, knowledge=None, labels=None):
+    write_bundle(
+        path, bundle.features, labels or bundle.labels, knowledge or bundle.knowledge,
+        dict(bundle.arrays), bundle.metadata,
+    )
+    return str(path)
+
+
+def updated_knowledge(bundle, disease):
+    knowledge = copy.deepcopy(bundle.knowledge)
+    knowledge[disease]['descriptions'] = [UPDATED]
+    return knowledge
+
+
+def reload(token=TOKEN):
+    return client.post('/admin/reload', headers={'X-Admin-Token': token})
+
+
+def test_snapshot_is_immutable(served_snapshot):
+    with pytest.raises(AttributeError):
+        served_snapshot.svc = None
+
+
+def test_reload_requires_a_configured_token(monkeypatch):
+    assert reload('wrong').status_code == 403
+    monkeypatch.setattr(chatbot, 'ADMIN_TOKEN', None)
+    assert reload().status_code == 404
+
+
+def test_unchanged_bundle_keeps_the_snapshot(served_snapshot):
+    body = reload().get_json()
+    assert body['success'] and not body['reloaded']
+    assert chatbot.snapshot is served_snapshot
+
+
+def test_reload_swaps_knowledge_and_in_flight_requests_keep_theirs(tmp_path, monkeypatch, served_snapshot):
+    disease = chatbot.get_predicted_value(['itching', 'skin_rash'])[0]
+    monkeypatch.setattr(chatbot, 'BUNDLE_PATH', write_variant(
+        tmp_path / 'bundle.bin', served_snapshot.bundle, knowledge=updated_knowledge(served_snapshot.bundle, disease)
+    ))
+
+    body = reload().get_json()
+    assert body['success'] and body['reloaded']
+    assert body['previous_version'] == served_snapshot.version
+    assert body['model_version'] != served_snapshot.version
+    assert client.get('/health').get_json()['model_version'] == body['model_version']
+    assert chatbot.prediction_cache.version == body['model_version']
+
+    response = client.post('/api/predict', json={"symptoms": ['itching', 'skin_rash']}).get_json()
+    assert response['prediction']['description'] == UPDATED
+    # A request that started before the swap finishes on the snapshot it captured
+    old = chatbot.process_chat_message("I have itching and skin rash", None, served_snapshot)
+    assert old['data']['disease'] == disease
+    assert UPDATED not in old['response']
+
+
+def test_failed_reload_keeps_serving(tmp_path, monkeypatch, served_snapshot):
+    corrupt = tmp_path / 'corrupt.bin'
+    corrupt.write_bytes(b'not a bundle')
+    monkeypatch.setattr(chatbot, 'BUNDLE_PATH', str(corrupt))
+
+    before = chatbot.reloads_counter.value('failed')
+    response = reload()
+    assert response.status_code == 422
+    assert served_snapshot.version in response.get_json()['error']
+    assert chatbot.snapshot is served_snapshot
+    assert chatbot.reloads_counter.value('failed') == before + 1
+
+
+def test_smoke_test_rejects_unnamed_labels(tmp_path, served_snapshot):
+    path = write_variant(tmp_path / 'bundle.bin', served_snapshot.bundle, labels=served_snapshot.bundle.labels[:-1])
+    with pytest.raises(SnapshotError):
+        smoke_test(chatbot.load_snapshot(path))
+
+
+def test_sessions_survive_a_symptom_index_change(served_snapshot):
+    state = chatbot.new_session_state()
+    chatbot.process_chat_message("I have itching", state)
+    assert state['mask'] and state['catalog'] == served_snapshot.symptom_catalog.version
+
+    # A session recorded against another symptom index starts its mask over
+    state['catalog'] = 'other'
+    response = chatbot.process_chat_message("I also have a skin rash", state)
+    assert response['data']['session_symptoms'] == ['skin_rash']
+
+
+def test_changed_bundle_file_is_reloaded_by_the_watcher(tmp_path, monkeypatch, served_snapshot):
+    path = write_variant(tmp_path / 'bundle.bin', served_snapshot.bundle)
+    monkeypatch.setattr(chatbot, 'BUNDLE_PATH', path)
+    stamp = chatbot.bundle_stamp()
+    assert chatbot.check_bundle(stamp) == stamp
+    assert chatbot.snapshot is served_snapshot
+
+    disease = chatbot.get_predicted_value(['itching', 'skin_rash'])[0]
+    write_variant(tmp_path / 'bundle.bin', served_snapshot.bundle,
+                  knowledge=updated_knowledge(served_snapshot.bundle, disease))
+    assert chatbot.check_bundle(stamp) != stamp
+    assert chatbot.snapshot.version != served_snapshot.version
+    assert chatbot.get_disease_info(disease).description == UPDATED
+
+
+def test_watcher_skips_a_broken_bundle_until_it_changes(tmp_path, monkeypatch, served_snapshot):
+    path = tmp_path / 'bundle.bin'
+    write_variant(path, served_snapshot.bundle)
+    monkeypatch.setattr(chatbot, 'BUNDLE_PATH', str(path))
+    stamp = chatbot.bundle_stamp()
+
+    path.write_bytes(b'not a bundle')
+    before = chatbot.reloads_counter.value('failed')
+    stamp = chatbot.check_bundle(stamp)
+    assert chatbot.check_bundle(stamp) == stamp
+    assert chatbot.reloads_counter.value('failed') == before + 1
+    assert chatbot.snapshot is served_snapshot
+
+
+def test_watcher_thread_polls_until_stopped(monkeypatch):
+    assert chatbot.start_bundle_watcher(interval=0) is None
+    checks = threading.Event()
+    monkeypatch.setattr(chatbot, 'check_bundle', lambda stamp: checks.set() or stamp)
+    stop = threading.Event()
+    watcher = chatbot.start_bundle_watcher(interval=0.01, stop=stop)
+    assert checks.wait(5)
+    stop.set()
+    watcher.join(5)
+    assert not watcher.is_alive()
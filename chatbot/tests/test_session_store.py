@@ -0,0 +1,143 @@
+import app as chatbot
+from conftest import FakeClock, received_events
+from prediction_cache import mask_indices, symptom_mask
+from session_store import InMemorySessionStore, RedisSessionStore, new_session_state
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the few redis-py calls the store makes"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def test_mask_indices_inverts_symptom_mask():
+    assert mask_indices(symptom_mask([131, 3, 0, 64])) == [0, 3, 64, 131]
+    assert mask_indices(0) == []
+
+
+def test_idle_sessions_expire():
+    clock = FakeClock()
+    store = InMemorySessionStore(ttl=60, clock=clock)
+    store.put('a', new_session_state())
+    clock.now = 59
+    assert store.get('a') is not None
+
+    # Reading the session does not extend it; storing a turn does
+    store.put('a', {'mask': 1, 'disease': None, 'turns': 1})
+    clock.now = 118
+    assert store.get('a')['mask'] == 1
+    clock.now = 120
+    assert store.get('a') is None
+    assert store.stats()['expirations'] == 1
+
+
+def test_least_recently_used_session_is_evicted():
+    store = InMemorySessionStore(maxsize=2)
+    store.put('a', new_session_state())
+    store.put('b', new_session_state())
+    store.get('a')
+    store.put('c', new_session_state())
+
+    assert store.get('b') is None
+    assert store.get('a') is not None and store.get('c') is not None
+    assert store.stats()['evictions'] == 1
+
+
+def test_stored_state_is_a_copy():
+    store = InMemorySessionStore()
+    state = new_session_state()
+    store.put('a', state)
+    state['mask'] = 7
+    assert store.get('a')['mask'] == 0
+
+
+def test_redis_store_roundtrip():
+    client = FakeRedis()
+    store = RedisSessionStore(client, ttl=300)
+    store.put('a', {'mask': 1 << 131, 'disease': 'Allergy', 'turns': 2})
+    assert store.get('a') == {'mask': 1 << 131, 'disease': 'Allergy', 'turns': 2}
+    assert client.ttls['chatbot:session:a'] == 300
+    store.delete('a')
+    assert store.get('a') is None
+
+
+def test_symptoms_accumulate_across_turns():
+    state = new_session_state()
+    first = chatbot.process_chat_message("I have itching", state)
+    second = chatbot.process_chat_message("also a skin rash and nodal skin eruptions", state)
+
+    assert first['data']['session_symptoms'] == ['itching']
+    assert second['data']['symptoms_found'] == ['skin_rash', 'nodal_skin_eruptions']
+    assert second['data']['session_symptoms'] == ['itching', 'skin_rash', 'nodal_skin_eruptions']
+    expected = chatbot.process_chat_message("itching, skin rash and nodal skin eruptions")
+    assert second['data']['disease'] == expected['data']['disease']
+    assert state['turns'] == 2
+
+
+def test_repeated_symptoms_reuse_the_last_prediction(monkeypatch):
+    state = new_session_state()
+    chatbot.process_chat_message("I have a cough and high fever", state)
+
+    def fail(*args):
+        raise AssertionError("an unchanged symptom set must not be predicted again")
+
+    monkeypatch.setattr(chatbot, 'predict_symptom_set', fail)
+    response = chatbot.process_chat_message("the cough is still there", state)
+    assert response['type'] == 'diagnosis'
+    assert response['data']['disease'] == state['disease']
+
+
+def test_reset_clears_the_session():
+    state = new_session_state()
+    chatbot.process_chat_message("I have itching", state)
+    assert chatbot.process_chat_message("let's start over", state)['type'] == 'reset'
+    assert state['mask'] == 0 and state['disease'] is None
+
+
+def test_socket_session_accumulates_and_resumes():
+    client = chatbot.socketio.test_client(chatbot.app)
+    (_, greeting), = received_events(client)
+    assert greeting['resumed'] is False
+    session_id = greeting['session_id']
+
+    client.emit('send_message', {'message': 'I have itching'})
+    client.emit('send_message', {'message': 'and a skin rash'})
+    reply = received_events(client)[-1][1]
+    assert reply['data']['session_symptoms'] == ['itching', 'skin_rash']
+    client.disconnect()
+
+    resumed = chatbot.socketio.test_client(chatbot.app, auth={'session_id': session_id})
+    (_, greeting), = received_events(resumed)
+    assert greeting['resumed'] is True
+    assert greeting['session_id'] == session_id
+
+    resumed.emit('send_message', {'message': 'nodal skin eruptions too'})
+    reply = received_events(resumed)[-1][1]
+    assert reply['data']['session_symptoms'] == ['itching', 'skin_rash', 'nodal_skin_eruptions']
+    resumed.disconnect()
+
+
+def test_unknown_session_id_starts_a_new_session():
+    client = chatbot.socketio.test_client(chatbot.app, auth={'session_id': 'not-a-session'})
+    (_, greeting), = received_events(client)
+    assert greeting['resumed'] is False
+    assert greeting['session_id'] != 'not-a-session'
+    client.disconnect()
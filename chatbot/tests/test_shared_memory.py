@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import app as chatbot
+import memory_report
+from bundle import load_bundle
+from inference import LinearOvOClassifier
+
+
+def test_bundle_arrays_are_read_only_file_mappings():
+    bundle = load_bundle()
+    for array in bundle.arrays.values():
+        assert not array.flags.writeable
+
+    in_memory = load_bundle(use_mmap=False)
+    assert in_memory.content_hash == bundle.content_hash
+
+
+def test_classifier_uses_bundle_arrays_in_place():
+    """Serving must not keep private copies of the mapped weights"""
+    bundle = load_bundle()
+    engine = LinearOvOClassifier.from_arrays(bundle.arrays)
+    assert np.shares_memory(engine.coef_t, bundle.arrays['coef_t'])
+    assert np.shares_memory(engine.support_vectors_t, bundle.arrays['support_vectors_t'])
+    assert np.shares_memory(engine._pair_coef, bundle.arrays['pair_coef'])
+
+
+def test_served_classifier_is_mapped():
+    assert not chatbot.snapshot.svc.coef_t.flags.writeable
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup'), reason="needs /proc/<pid>/smaps_rollup")
+def test_report_splits_shared_and_private_memory():
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        assert child.pid in memory_report.child_pids(os.getpid())
+        report = memory_report.build_report(os.getpid())
+    finally:
+        child.kill()
+        child.wait()
+
+    own = report[0]
+    assert own['rss'] > 0
+    assert own['shared'] + own['private'] == pytest.approx(own['rss'], abs=64)
+    assert "Total PSS" in memory_report.format_report(report)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+import app as chatbot
+from conftest import client
+import dataset_cache
+from prediction_cache import symptom_mask
+from signatures import SignatureTable, build_signature_arrays
+
+pytestmark = pytest.mark.usefixtures('empty_cache')
+
+
+def _training_symptoms():
+    data = dataset_cache.load_training_data()
+    return [[data.features[i] for i in np.flatnonzero(row)] for row in data.X]
+
+
+def _unseen_symptoms():
+    names = list(chatbot.snapshot.symptoms_dict)
+    for first in range(len(names)):
+        for second in range(first + 1, len(names)):
+            pair = [names[first], names[second]]
+            if symptom_mask(chatbot.snapshot.symptoms_dict[name] for name in pair) not in chatbot.snapshot.signature_table:
+                return pair
+
+
+def test_arrays_roundtrip_and_skip_ambiguous_patterns():
+    X = np.array([[1, 0, 1], [1, 0, 1], [0, 1, 0], [0, 0, 1], [0, 0, 1]])
+    labels = np.array([4, 4, 2, 0, 1])
+    table = SignatureTable.from_arrays(build_signature_arrays(X, labels))
+
+    assert table.table == {0b101: 4, 0b010: 2}
+    assert table.get(0b101) == 4
+    assert table.get(0b100) is None
+    assert (table.hits, table.misses) == (1, 1)
+    assert len(SignatureTable.from_arrays({})) == 0
+
+
+def test_table_holds_every_training_pattern():
+    patterns = _training_symptoms()
+    assert len(chatbot.snapshot.signature_table) == len(patterns)
+    for symptoms in patterns:
+        assert symptom_mask(chatbot.snapshot.symptoms_dict[name] for name in symptoms) in chatbot.snapshot.signature_table
+
+
+def test_training_patterns_bypass_the_model(monkeypatch):
+    def fail(active_indices):
+        raise AssertionError("the model should not be called for a training pattern")
+    monkeypatch.setattr(chatbot.snapshot.svc, 'predict_indices', fail)
+
+    symptoms = _training_symptoms()[0]
+    body = client.post('/api/predict', json={"symptoms": symptoms}).get_json()
+    assert body['success'] and body['prediction_source'] == 'table'
+
+    batch = client.post('/api/predict/batch', json={"items": [symptoms]}).get_json()
+    assert batch['results'][0]['prediction_source'] == 'table'
+
+
+def test_unseen_combinations_fall_through_to_the_model():
+    before = chatbot.snapshot.signature_table.stats()
+    symptoms = _unseen_symptoms()
+    expected = chatbot.snapshot.diseases_list[chatbot.snapshot.svc.predict_indices(
+        [chatbot.snapshot.symptoms_dict[name] for name in symptoms]
+    )]
+
+    body = client.post('/api/predict', json={"symptoms": symptoms}).get_json()
+    assert body['prediction_source'] == 'model'
+    assert body['prediction']['disease'] == expected
+    # Cached answers still report where they came from
+    assert client.post('/api/predict', json={"symptoms": symptoms}).get_json()['prediction_source'] == 'model'
+
+    chatbot.prediction_cache.clear()
+    batch = client.post('/api/predict/batch', json={"items": [symptoms]}).get_json()
+    assert batch['results'][0]['prediction_source'] == 'model'
+
+    # The cached repeat never reaches the table, so only the first request and the batch count
+    after = client.get('/health').get_json()['signature_table']
+    assert after['misses'] == before['misses'] + 2
+    assert after['hits'] == before['hits']
+    assert 'chatbot_signature_table_hit_ratio' in client.get('/metrics').get_data(as_text=True)
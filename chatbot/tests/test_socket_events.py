@@ -0,0 +1,104 @@
+import threading
+import time
+
+import app as chatbot
+from conftest import received_events
+
+
+def test_connect_sends_greeting():
+    client = chatbot.socketio.test_client(chatbot.app)
+    (name, greeting), = received_events(client)
+    assert name == 'message'
+    assert greeting['type'] == 'greeting'
+    client.disconnect()
+
+
+def test_message_is_answered_without_artificial_delay():
+    client = chatbot.socketio.test_client(chatbot.app)
+    client.get_received()
+
+    started = time.perf_counter()
+    client.emit('send_message', {'message': 'I have itching and a skin rash', 'user_id': 1})
+    elapsed = time.perf_counter() - started
+
+    events = received_events(client)
+    assert [name for name, _ in events] == ['typing', 'typing', 'message']
+    assert events[0][1] == {'typing': True}
+    assert events[1][1] == {'typing': False}
+    assert events[2][1]['type'] == 'diagnosis'
+    assert elapsed < 0.5
+    client.disconnect()
+
+
+def test_classification_runs_off_the_event_loop(monkeypatch):
+    """With an async server the chat logic must execute on a worker thread"""
+    worker_threads = []
+
+    def recording_process(message_text, state=None, snap=None):
+        worker_threads.append(threading.current_thread())
+        return {'response': 'ok', 'type': 'default'}
+
+    monkeypatch.setattr(chatbot, 'process_chat_message', recording_process)
+    client = chatbot.socketio.test_client(chatbot.app)
+    client.emit('send_message', {'message': 'hello'})
+    client.disconnect()
+
+    assert len(worker_threads) == 1
+    if chatbot.socketio.async_mode in ('eventlet', 'gevent'):
+        assert worker_threads[0] is not threading.main_thread()
+
+
+def test_configurable_response_delay(monkeypatch):
+    delays = []
+    monkeypatch.setattr(chatbot, 'CHAT_RESPONSE_DELAY', 0.25)
+    monkeypatch.setattr(chatbot.socketio, 'sleep', delays.append)
+
+    client = chatbot.socketio.test_client(chatbot.app)
+    client.emit('send_message', {'message': 'hello'})
+    client.disconnect()
+    assert delays == [0.25]
+
+
+def test_empty_message_is_rejected():
+    client = chatbot.socketio.test_client(chatbot.app)
+    client.get_received()
+    client.emit('send_message', {'message': '   '})
+    assert received_events(client) == [('error', {'error': 'Message cannot be empty'})]
+    client.disconnect()
+
+
+def test_streamed_diagnosis_sends_disease_then_sections():
+    client = chatbot.socketio.test_client(chatbot.app)
+    client.get_received()
+
+    client.emit('send_message', {'message': 'I have itching and a skin rash', 'stream': True})
+    events = received_events(client)
+    names = [name for name, _ in events]
+    assert names[:3] == ['typing', 'typing', 'message']
+    assert set(names[3:]) == {'message_section'}
+
+    message = events[2][1]
+    disease = message['data']['disease']
+    info = chatbot.get_disease_info(disease)
+    assert message['type'] == 'diagnosis'
+    assert message['text'] == f"Based on your symptoms, you might have: **{disease}**"
+    assert message['sections'] == [section.section for section in info.chat_sections]
+
+    sections = [payload for _, payload in events[3:]]
+    assert [s['section'] for s in sections] == message['sections']
+    assert {s['id'] for s in sections} == {message['id']}
+    assert [s['index'] for s in sections] == list(range(len(sections)))
+    assert [s['final'] for s in sections] == [False] * (len(sections) - 1) + [True]
+    assert sections[0]['text'] == f"**Description:** {info.description}"
+    client.disconnect()
+
+
+def test_streaming_leaves_other_replies_whole():
+    client = chatbot.socketio.test_client(chatbot.app)
+    client.get_received()
+    client.emit('send_message', {'message': 'hello', 'stream': True})
+    events = received_events(client)
+    assert [name for name, _ in events] == ['typing', 'typing', 'message']
+    assert events[2][1]['type'] == 'greeting'
+    assert 'sections' not in events[2][1]
+    client.disconnect()
@@ -0,0 +1,83 @@
+import random
+from difflib import SequenceMatcher, get_close_matches
+
+import pytest
+
+import app as chatbot
+from conftest import client
+from symptom_matcher import SymptomMatcher, space_form
+
+SYMPTOMS = list(chatbot.snapshot.symptoms_dict)
+
+
+def _misspell(rng, word):
+    chars = list(word)
+    for _ in range(rng.randint(1, 3)):
+        position = rng.randrange(len(chars))
+        operation = rng.random()
+        if operation < 0.3 and len(chars) > 1:
+            del chars[position]
+        elif operation < 0.6:
+            chars.insert(position, rng.choice('abcdefghijklmnopqrstuvwxyz_'))
+        elif operation < 0.8:
+            chars[position] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+        elif position + 1 < len(chars):
+            chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    return ''.join(chars)
+
+
+def _best_scores(word, symptoms):
+    matcher = SequenceMatcher()
+    matcher.set_seq2(word)
+    scores = []
+    for symptom in symptoms:
+        form_scores = []
+        for form in (symptom, space_form(symptom)):
+            matcher.set_seq1(form)
+            form_scores.append(matcher.ratio())
+        scores.append(max(form_scores))
+    return sorted(scores, reverse=True)
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return SymptomMatcher(SYMPTOMS, cache_size=0)
+
+
+def test_same_or_better_than_difflib(matcher):
+    """Every suggestion list scores at least as well as difflib's, position by position"""
+    rng = random.Random(3)
+    lay_terms = ['fever', 'tired', 'stomach ache', 'sore throat', 'runny nose', 'diarrhea', 'back pain']
+    words = [_misspell(rng, rng.choice(SYMPTOMS)) for _ in range(1500)]
+    words += [_misspell(rng, rng.choice(lay_terms)) for _ in range(300)] + lay_terms
+
+    for word in words:
+        ours = matcher.suggest(word)
+        reference = get_close_matches(word, SYMPTOMS, n=3, cutoff=0.6)
+        assert len(ours) >= len(reference), word
+        for our_score, reference_score in zip(_best_scores(word, ours), _best_scores(word, reference)):
+            assert our_score >= reference_score, word
+
+
+def test_space_separated_input(matcher):
+    assert matcher.suggest('stomach pain')[0] == 'stomach_pain'
+    assert matcher.suggest('high fevr')[0] == 'high_fever'
+    assert matcher.suggest('fever') == ['mild_fever', 'high_fever']
+
+
+def test_no_suggestions_for_unrelated_words(matcher):
+    assert matcher.suggest('xyzzy') == []
+    assert matcher.suggest('') == []
+
+
+def test_recent_misspellings_are_cached():
+    cached = SymptomMatcher(SYMPTOMS, cache_size=2)
+    first = cached.suggest('skin_rsh')
+    first.append('mutated by caller')
+    assert cached.suggest('skin_rsh') == ['skin_rash']
+    assert cached.cache_info().hits == 1
+
+
+def test_predict_suggestions_use_matcher():
+    response = client.post('/api/predict', json={"symptoms": ["itching", "skin rsh"]})
+    assert response.get_json()["input_analysis"]["suggestions"] == {"skin rsh": ["skin_rash"]}
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.svm import SVC
+
+import train_model
+
+
+def _small_candidates(n_jobs=1):
+    return {'SVC': SVC(kernel='linear'), 'MultinomialNB': MultinomialNB()}
+
+
+def _split():
+    return train_model.prepare_data(train_model.load_training_data())
+
+
+def test_split_weights_cover_every_row():
+    data = train_model.load_training_data()
+    X_train, X_test, y_train, y_test, w_train, w_test = train_model.prepare_data(data)
+    assert w_train.sum() + w_test.sum() == data.n_rows
+    assert len(X_train) == len(y_train) == len(w_train) < w_train.sum()
+
+
+def test_weighted_fit_matches_repeated_rows():
+    X_train, X_test, y_train, y_test, w_train, w_test = _split()
+    repeated_X, repeated_y = np.repeat(X_train, w_train, axis=0), np.repeat(y_train, w_train)
+
+    # MultinomialNB takes sample_weight; KNeighbors falls back to repeating the patterns
+    for make in (MultinomialNB, lambda: KNeighborsClassifier(n_neighbors=5)):
+        weighted = train_model.fit_weighted(make(), X_train, y_train, w_train)
+        expanded = make().fit(repeated_X, repeated_y)
+        np.testing.assert_array_equal(weighted.predict(X_test), expanded.predict(X_test))
+
+
+def test_parallel_training_matches_sequential(monkeypatch):
+    monkeypatch.setattr(train_model, 'build_candidates', _small_candidates)
+    split = _split()
+
+    parallel = train_model.train_and_evaluate_models(*split, workers=2)
+    sequential = train_model.train_and_evaluate_models(*split, workers=1)
+
+    assert list(parallel) == ['SVC', 'MultinomialNB']
+    for name, result in parallel.items():
+        assert result['accuracy'] == sequential[name]['accuracy']
+        assert result['fit_seconds'] > 0 and result['predict_seconds'] > 0
+        assert result['peak_memory_mb'] > 0
+        assert len(result['model'].predict(split[1])) == len(split[1])
+
+
+def test_n_jobs_reaches_supporting_estimators():
+    candidates = train_model.build_candidates(n_jobs=3)
+    assert candidates['RandomForest'].n_jobs == 3
+    assert candidates['KNeighbors'].n_jobs == 3
+    assert 'n_jobs' not in candidates['SVC'].get_params()
+
+
+def _result(accuracy, single_row_ms):
+    return {'model': object(), 'accuracy': accuracy, 'single_row_ms': single_row_ms}
+
+
+def test_selection_prefers_fast_models_among_near_ties():
+    results = {
+        'SVC': _result(0.999, 0.2),
+        'RandomForest': _result(1.0, 6.0),
+        'KNeighbors': _result(0.98, 1.5),
+        'MultinomialNB': _result(0.95, 0.1),
+    }
+    assert train_model.pareto_front(results) == ['SVC', 'RandomForest', 'MultinomialNB']
+
+    _, name, _ = train_model.select_best_model(results)
+    assert name == 'SVC'
+    _, name, _ = train_model.select_best_model(results, accuracy_tolerance=0)
+    assert name == 'RandomForest'
+    _, name, _ = train_model.select_best_model(results, latency_budget_ms=0.15, accuracy_tolerance=0)
+    assert name == 'MultinomialNB'
+    # Nothing fits the budget: the fastest model wins
+    _, name, _ = train_model.select_best_model(results, latency_budget_ms=0.01)
+    assert name == 'MultinomialNB'
+
+
+def test_benchmark_records_latency_and_size():
+    X_train, X_test, y_train, y_test, w_train, w_test = _split()
+    model = train_model.fit_weighted(MultinomialNB(), X_train, y_train, w_train)
+    metrics = train_model.measure_inference(model, X_test, single_calls=20, batch_repeats=2)
+
+    assert metrics['single_row_ms'] > 0 and metrics['batch_ms'] > 0
+    assert metrics['batch_rows'] == len(X_test)
+    assert metrics['size_kb'] > 0
+    recorded = train_model.selection_metrics({'accuracy': 1.0, **metrics}, latency_budget_ms=2.0)
+    assert recorded['latency_budget_ms'] == 2.0 and recorded['size_kb'] == round(metrics['size_kb'], 6)
+
+
+def test_selection_skips_models_the_bundle_cannot_serve():
+    results = {'SVC': _result(1.0, 0.2), 'MultinomialNB': _result(1.0, 0.1)}
+    results['MultinomialNB']['servable'] = False
+    _, name, _ = train_model.select_best_model(results)
+    assert name == 'SVC'
+
+
+def test_servable_pick_must_stay_near_the_best_candidate():
+    results = {'SVC': _result(0.99, 0.2), 'RandomForest': _result(1.0, 6.0)}
+    results['RandomForest']['servable'] = False
+    _, name, _ = train_model.select_best_model(results, accuracy_tolerance=0.02)
+    assert name == 'SVC'
+    with pytest.raises(ValueError, match="RandomForest"):
+        train_model.select_best_model(results, accuracy_tolerance=0.005)
+    # A slower, unservable model outside the budget is not held against the pick
+    _, name, _ = train_model.select_best_model(results, latency_budget_ms=1.0, accuracy_tolerance=0.005)
+    assert name == 'SVC'
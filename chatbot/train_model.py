@@ -8,97 +8,267 @@ import pandas as pd
 import numpy as np
 import pickle
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 from sklearn.svm import SVC
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.metrics import accuracy_score, confusion_matrix
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import inspect
+import json
 import logging
+import os
+import time
+import tracemalloc
+
+from bundle import BUNDLE_FILE, load_bundle, write_bundle
+import dataset_cache
+from inference import LinearOvOClassifier
+from knowledge import collect_knowledge
+from prediction_cache import symptom_mask
+from signatures import SignatureTable, build_signature_arrays
+
+METRICS_FILE = 'svc_metrics.json'
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def load_training_data():
-    """Load and prepare training data"""
+def load_training_data(rebuild=False):
+    """Load the deduplicated training data, rebuilding its cache when Training.csv changed"""
     logger.info("Loading training data...")
     try:
-        dataset = pd.read_csv('Training.csv')
-        logger.info(f"Dataset shape: {dataset.shape}")
-        return dataset
+        data = dataset_cache.load_training_data(rebuild=rebuild)
+        logger.info(f"Dataset: {data.n_rows} rows, {len(data.labels)} distinct patterns, "
+                    f"{len(data.features)} symptoms, {len(data.classes)} diseases")
+        return data
     except FileNotFoundError:
         logger.error("Training.csv not found. Please ensure the training data is available.")
         raise
 
-def prepare_data(dataset):
-    """Prepare data for training"""
+def prepare_data(data):
+    """Split the original rows, then deduplicate each side into weighted patterns"""
     logger.info("Preparing data for training...")
     
-    X = dataset.drop('prognosis', axis=1)
-    y = dataset['prognosis']
-    
-    # Encoding prognosis
-    le = LabelEncoder()
-    le.fit(y)
-    Y = le.transform(y)
-    
-    # Train-test split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, Y, test_size=0.3, random_state=20
+    # Splitting row numbers draws the same rows as splitting the full matrix did
+    train_rows, test_rows = train_test_split(
+        np.arange(data.n_rows), test_size=0.3, random_state=20
     )
+    X_train, y_train, w_train = data.subset(train_rows)
+    X_test, y_test, w_test = data.subset(test_rows)
     
-    logger.info(f"Training set size: {X_train.shape}")
-    logger.info(f"Test set size: {X_test.shape}")
+    logger.info(f"Training set: {len(train_rows)} rows as {len(X_train)} patterns")
+    logger.info(f"Test set: {len(test_rows)} rows as {len(X_test)} patterns")
     
-    return X_train, X_test, y_train, y_test, le
+    return X_train, X_test, y_train, y_test, w_train, w_test
 
-def train_and_evaluate_models(X_train, X_test, y_train, y_test):
-    """Train multiple models and compare performance"""
-    logger.info("Training and evaluating models...")
-    
-    models = {
+def fit_weighted(model, X, y, weights):
+    """Fit with per-pattern weights, repeating patterns for estimators without sample_weight"""
+    if 'sample_weight' in inspect.signature(model.fit).parameters:
+        return model.fit(X, y, sample_weight=weights)
+    return model.fit(np.repeat(X, weights, axis=0), np.repeat(y, weights))
+
+# Rough relative fit cost; the slowest candidates are submitted first so a long
+# fit never starts last when there are fewer workers than candidates
+TRAINING_COST = {'GradientBoosting': 3, 'RandomForest': 2}
+
+def build_candidates(n_jobs=1):
+    """Candidate models, with `n_jobs` passed to the estimators that support it"""
+    return {
         'SVC': SVC(kernel='linear'),
-        'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42),
+        'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs),
         'GradientBoosting': GradientBoostingClassifier(n_estimators=100, random_state=42),
-        'KNeighbors': KNeighborsClassifier(n_neighbors=5),
+        'KNeighbors': KNeighborsClassifier(n_neighbors=5, n_jobs=n_jobs),
         'MultinomialNB': MultinomialNB()
     }
-    
-    results = {}
-    
-    for model_name, model in models.items():
-        logger.info(f"Training {model_name}...")
-        
-        # Train the model
-        model.fit(X_train, y_train)
+
+def fit_and_evaluate(model_name, model, X_train, X_test, y_train, y_test, w_train=None, w_test=None):
+    """Fit and score one model, measuring fit time, predict time and peak traced memory"""
+    if w_train is None:
+        w_train = np.ones(len(y_train), dtype=np.intp)
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        fit_weighted(model, X_train, y_train, w_train)
+        fit_seconds = time.perf_counter() - started
         
-        # Test the model
+        started = time.perf_counter()
         predictions = model.predict(X_test)
+        predict_seconds = time.perf_counter() - started
         
-        # Calculate accuracy
-        accuracy = accuracy_score(y_test, predictions)
-        results[model_name] = {
-            'model': model,
-            'accuracy': accuracy,
-            'predictions': predictions
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'model': model,
+        'accuracy': accuracy_score(y_test, predictions, sample_weight=w_test),
+        'predictions': predictions,
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds,
+        'peak_memory_mb': peak_memory / (1024 * 1024)
+    }
+
+def train_and_evaluate_models(X_train, X_test, y_train, y_test, w_train=None, w_test=None,
+                              workers=None, n_jobs=1):
+    """Train multiple models concurrently in a process pool and compare performance"""
+    models = build_candidates(n_jobs)
+    workers = workers or min(len(models), os.cpu_count() or 1)
+    logger.info(f"Training and evaluating {len(models)} models with {workers} worker(s)...")
+    
+    if workers == 1:
+        outcomes = {
+            name: fit_and_evaluate(name, model, X_train, X_test, y_train, y_test, w_train, w_test)
+            for name, model in models.items()
         }
-        
-        logger.info(f"{model_name} Accuracy: {accuracy:.4f}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            order = sorted(models, key=lambda name: -TRAINING_COST.get(name, 1))
+            futures = {
+                name: pool.submit(
+                    fit_and_evaluate, name, models[name], X_train, X_test, y_train, y_test, w_train, w_test
+                )
+                for name in order
+            }
+            outcomes = {name: future.result() for name, future in futures.items()}
     
+    # Keep the candidate order, which select_best_model uses to break ties
+    results = {}
+    for model_name in models:
+        results[model_name] = outcomes[model_name]
+        logger.info(f"{model_name} Accuracy: {results[model_name]['accuracy']:.4f}")
+    
+    log_timing_report(results)
+    return results
+
+def log_timing_report(results):
+    """Log fit time, predict time and peak memory for every model"""
+    logger.info(f"{'Model':<18}{'Fit (s)':>10}{'Predict (s)':>13}{'Peak (MB)':>11}{'Accuracy':>10}")
+    for model_name, result in results.items():
+        logger.info(
+            f"{model_name:<18}{result['fit_seconds']:>10.2f}{result['predict_seconds']:>13.3f}"
+            f"{result['peak_memory_mb']:>11.1f}{result['accuracy']:>10.4f}"
+        )
+
+def measure_inference(model, X, single_calls=200, batch_repeats=10, predictor=None):
+    """
+    Median single-row and batch predict latency in ms, and the pickled size in KB.
+    `predictor` times a compiled form of the model instead of the model itself.
+    """
+    predictor = predictor or model
+    single = []
+    for i in range(single_calls):
+        row = X[i % len(X)][None, :]
+        started = time.perf_counter()
+        predictor.predict(row)
+        single.append(time.perf_counter() - started)
+    
+    batch = []
+    for _ in range(batch_repeats):
+        started = time.perf_counter()
+        predictor.predict(X)
+        batch.append(time.perf_counter() - started)
+    
+    return {
+        'single_row_ms': float(np.median(single)) * 1e3,
+        'batch_ms': float(np.median(batch)) * 1e3,
+        'batch_rows': len(X),
+        'size_kb': len(pickle.dumps(model)) / 1024,
+    }
+
+def benchmark_candidates(results, X):
+    """
+    Add inference latency and size to every result, measured one model at a time.
+    Models the bundle can serve are timed through the compiled engine the API runs.
+    """
+    for model_name, result in results.items():
+        try:
+            engine = LinearOvOClassifier.from_estimator(result['model'])
+        except ValueError:
+            engine = None
+        result['servable'] = engine is not None
+        result.update(measure_inference(result['model'], X, predictor=engine))
+        logger.info(
+            f"{model_name:<18}single {result['single_row_ms']:>8.3f} ms  "
+            f"batch of {result['batch_rows']} {result['batch_ms']:>8.3f} ms  {result['size_kb']:>9.1f} KB"
+            f"{'' if engine else '  (not servable from the bundle)'}"
+        )
     return results
 
-def select_best_model(results):
-    """Select the best performing model"""
-    best_model_name = max(results.keys(), key=lambda k: results[k]['accuracy'])
+def pareto_front(results):
+    """Models no other model beats on accuracy without also being at least as slow"""
+    front = []
+    for name, result in results.items():
+        dominated = any(
+            other['accuracy'] >= result['accuracy']
+            and other['single_row_ms'] <= result['single_row_ms']
+            and (other['accuracy'] > result['accuracy'] or other['single_row_ms'] < result['single_row_ms'])
+            for other_name, other in results.items() if other_name != name
+        )
+        if not dominated:
+            front.append(name)
+    return front
+
+def within_budget(results, names, latency_budget_ms=None):
+    """The named models whose single-row latency fits the budget, or else the fastest of them"""
+    affordable = [
+        name for name in names
+        if latency_budget_ms is None or results[name]['single_row_ms'] <= latency_budget_ms
+    ]
+    return affordable or [min(names, key=lambda k: results[k]['single_row_ms'])]
+
+def select_best_model(results, latency_budget_ms=None, accuracy_tolerance=0.005):
+    """
+    Select from the accuracy/latency Pareto front: the fastest model within
+    `accuracy_tolerance` of the most accurate one whose single-row latency fits
+    the budget. Models the bundle can serve are preferred over those it cannot,
+    but the pick must stay within `accuracy_tolerance` of the best candidate in
+    the budget, servable or not; otherwise this raises ValueError rather than
+    ship a worse model. Without benchmarks, fall back to accuracy alone.
+    """
+    if not all('single_row_ms' in result for result in results.values()):
+        best_model_name = max(results.keys(), key=lambda k: results[k]['accuracy'])
+    else:
+        servable = {name: result for name, result in results.items() if result.get('servable', True)}
+        if not servable:
+            logger.warning("No candidate can be compiled into the serving bundle")
+        front = pareto_front(servable or results)
+        affordable = within_budget(results, front, latency_budget_ms)
+        if latency_budget_ms is not None and results[affordable[0]]['single_row_ms'] > latency_budget_ms:
+            logger.warning(f"No model serves a single row within {latency_budget_ms} ms; using the fastest")
+        top_accuracy = max(results[name]['accuracy'] for name in affordable)
+        contenders = [name for name in affordable if results[name]['accuracy'] >= top_accuracy - accuracy_tolerance]
+        best_model_name = min(contenders, key=lambda k: results[k]['single_row_ms'])
+        logger.info(f"Pareto front: {', '.join(front)}")
+
+        # Today only the linear SVC is servable, so check what preferring it costs against every candidate
+        reference = max(within_budget(results, list(results), latency_budget_ms), key=lambda k: results[k]['accuracy'])
+        shortfall = results[reference]['accuracy'] - results[best_model_name]['accuracy']
+        if shortfall > accuracy_tolerance:
+            logger.error(
+                f"{best_model_name} is {shortfall:.4f} less accurate than {reference}, "
+                f"beyond the tolerance of {accuracy_tolerance}"
+            )
+            raise ValueError(f"No servable model within {accuracy_tolerance} of {reference}'s accuracy")
+    
     best_model = results[best_model_name]['model']
     best_accuracy = results[best_model_name]['accuracy']
     
     logger.info(f"Best model: {best_model_name} with accuracy: {best_accuracy:.4f}")
     return best_model, best_model_name, best_accuracy
 
-def save_model(model, model_name, accuracy):
-    """Save the trained model"""
+def selection_metrics(result, latency_budget_ms=None):
+    """The chosen model's evaluation and serving metrics, as recorded with it"""
+    metrics = {'latency_budget_ms': latency_budget_ms}
+    for key in ('accuracy', 'fit_seconds', 'servable', 'single_row_ms', 'batch_ms', 'batch_rows', 'size_kb'):
+        if key in result:
+            value = result[key]
+            metrics[key] = round(float(value), 6) if isinstance(value, float) else value
+    return metrics
+
+def save_model(model, model_name, accuracy, data, metrics=None):
+    """Save the trained model, with its selection metrics alongside"""
     filename = 'svc.pkl'
     with open(filename, 'wb') as f:
         pickle.dump(model, f)
@@ -106,37 +276,154 @@ def save_model(model, model_name, accuracy):
     logger.info(f"Model saved as {filename}")
     logger.info(f"Model type: {model_name}")
     logger.info(f"Model accuracy: {accuracy:.4f}")
+    
+    if metrics is not None:
+        with open(METRICS_FILE, 'w') as f:
+            json.dump({'model': model_name, **metrics}, f, indent=2)
+        logger.info(f"Selection metrics saved as {METRICS_FILE}")
+    
+    return export_bundle(
+        model, data.features, data.classes, model_name, accuracy,
+        metrics=metrics, patterns=(data.X, data.labels),
+    )
+
+def load_knowledge_records():
+    """Collect the disease knowledge CSVs into plain records for the bundle"""
+    return collect_knowledge(
+        pd.read_csv("description.csv"),
+        pd.read_csv("precautions_df.csv"),
+        pd.read_csv("medications.csv"),
+        pd.read_csv("diets.csv"),
+        pd.read_csv("workout_df.csv"),
+    )
+
+def export_bundle(model, features, labels, model_name=None, accuracy=None, path=BUNDLE_FILE,
+                  metrics=None, patterns=None):
+    """
+    Write the bundle the API serves from: feature index, labels, knowledge and
+    weights, plus the signature table of the training `patterns` as (X, y)
+    """
+    try:
+        engine = LinearOvOClassifier.from_estimator(model)
+    except ValueError as e:
+        logger.warning(f"Chatbot bundle not exported: {e}")
+        return None
+    if engine.n_features != len(features):
+        raise ValueError(f"Model expects {engine.n_features} symptoms, the dataset has {len(features)}")
+
+    metadata = {'model': model_name or type(model).__name__}
+    if accuracy is not None:
+        metadata['accuracy'] = round(float(accuracy), 6)
+    if metrics:
+        metadata['selection'] = metrics
 
-def validate_model():
+    arrays = engine.to_arrays()
+    if patterns is not None:
+        arrays.update(build_signature_arrays(*patterns))
+        metadata['signatures'] = len(arrays['signature_labels'])
+
+    content_hash = write_bundle(
+        path, list(features), list(labels), load_knowledge_records(),
+        arrays, metadata,
+    )
+    logger.info(f"Chatbot bundle exported as {path} ({content_hash[:16]})")
+    return content_hash
+
+def validate_model(data):
     """Validate the saved model by loading and testing"""
     logger.info("Validating saved model...")
     try:
         with open('svc.pkl', 'rb') as f:
             loaded_model = pickle.load(f)
         logger.info("✅ Model loaded successfully!")
+        
+        # The API serves the bundled weights, which must agree with the model on every
+        # distinct training pattern, and so on every row
+        bundle = load_bundle(BUNDLE_FILE)
+        if bundle.features != data.features or bundle.labels != data.classes:
+            logger.error("❌ Bundle feature index or labels do not match the training data")
+            return False
+        engine = LinearOvOClassifier.from_arrays(bundle.arrays)
+        X = data.X.astype(np.float64)
+        # svc.pkl models fitted on the old DataFrame pipeline expect named columns
+        model_X = pd.DataFrame(X, columns=data.features) if hasattr(loaded_model, 'feature_names_in_') else X
+        mismatches = int((engine.predict(X) != loaded_model.predict(model_X)).sum())
+        if mismatches:
+            logger.error(f"❌ Bundled weights disagree with the model on {mismatches} patterns")
+            return False
+        logger.info(f"✅ Bundled weights match the model on all {len(X)} patterns ({data.n_rows} rows)")
+        
+        # The signature table must give every training pattern its own label; patterns
+        # seen with several labels are left out of it
+        table = SignatureTable.from_arrays(bundle.arrays)
+        answers = [table.table.get(symptom_mask(np.flatnonzero(row).tolist())) for row in data.X]
+        wrong = sum(answer is not None and answer != label for answer, label in zip(answers, data.labels.tolist()))
+        if wrong:
+            logger.error(f"❌ Signature table mislabels {wrong} training patterns")
+            return False
+        covered = sum(answer is not None for answer in answers)
+        logger.info(f"✅ Signature table answers {covered} of {len(answers)} training patterns")
         return True
     except Exception as e:
         logger.error(f"❌ Model validation failed: {e}")
         return False
 
-def main():
+def export_only():
+    """Rebuild the chatbot bundle from the saved model without retraining"""
+    try:
+        data = load_training_data()
+        with open('svc.pkl', 'rb') as f:
+            model = pickle.load(f)
+        exported = export_bundle(model, data.features, data.classes, patterns=(data.X, data.labels))
+        if exported is None or not validate_model(data):
+            return 1
+        return 0
+    except Exception as e:
+        logger.error(f"Bundle export failed: {e}")
+        return 1
+
+def main(argv=None):
     """Main training pipeline"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--export-only', action='store_true',
+                        help=f"rebuild {BUNDLE_FILE} from svc.pkl and the CSVs without retraining")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes training candidates concurrently (default: one per candidate, up to the CPU count)")
+    parser.add_argument('--n-jobs', type=int, default=1,
+                        help="n_jobs for estimators that support it (default: 1)")
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help=f"rebuild {dataset_cache.CACHE_FILE} even if Training.csv is unchanged")
+    parser.add_argument('--latency-budget-ms', type=float, default=None,
+                        help="maximum single-row predict latency of the selected model (default: no budget)")
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.005,
+                        help="accuracy a faster model may give up against the most accurate one (default: 0.005)")
+    args = parser.parse_args(argv)
+    if args.export_only:
+        return export_only()
+
     try:
         # Load and prepare data
-        dataset = load_training_data()
-        X_train, X_test, y_train, y_test, label_encoder = prepare_data(dataset)
+        data = load_training_data(rebuild=args.rebuild_cache)
+        X_train, X_test, y_train, y_test, w_train, w_test = prepare_data(data)
         
         # Train and evaluate models
-        results = train_and_evaluate_models(X_train, X_test, y_train, y_test)
+        results = train_and_evaluate_models(
+            X_train, X_test, y_train, y_test, w_train, w_test,
+            workers=args.workers, n_jobs=args.n_jobs
+        )
         
         # Select best model
-        best_model, model_name, accuracy = select_best_model(results)
+        benchmark_candidates(results, X_test)
+        best_model, model_name, accuracy = select_best_model(
+            results, args.latency_budget_ms, args.accuracy_tolerance
+        )
         
         # Save the model
-        save_model(best_model, model_name, accuracy)
+        metrics = selection_metrics(results[model_name], args.latency_budget_ms)
+        save_model(best_model, model_name, accuracy, data, metrics)
         
         # Validate
-        if validate_model():
+        if validate_model(data):
             logger.info("🎉 Model training completed successfully!")
             logger.info("The new model is ready for use in the API service.")
         else:
@@ -30,11 +30,24 @@ chatbotApi.interceptors.response.use(
   }
 );
 
+// Symptom list from the last symptoms_list event, reused while its version is current
+const SYMPTOM_CATALOG_KEY = 'chatbotSymptomCatalog';
+
+const readCachedCatalog = () => {
+  try {
+    return JSON.parse(localStorage.getItem(SYMPTOM_CATALOG_KEY));
+  } catch (error) {
+    return null;
+  }
+};
+
 // WebSocket connection class
 class ChatbotWebSocket {
   constructor() {
     this.socket = null;
     this.isConnected = false;
+    this.sessionId = null;
+    this.catalogVersion = null;
     this.eventHandlers = new Map();
   }
 
@@ -45,10 +58,12 @@ class ChatbotWebSocket {
 
     this.socket = io(CHATBOT_WS_URL, {
       transports: ['websocket', 'polling'],
-      auth: {
+      // A known session_id lets the server resume the accumulated symptoms
+      auth: (cb) => cb({
         userId: userId,
-        token: localStorage.getItem('accessToken')
-      }
+        token: localStorage.getItem('accessToken'),
+        session_id: this.sessionId
+      })
     });
 
     this.socket.on('connect', () => {
@@ -64,6 +79,12 @@ class ChatbotWebSocket {
     });
 
     this.socket.on('message', (data) => {
+      if (data.session_id) {
+        this.sessionId = data.session_id;
+      }
+      if (data.catalog_version) {
+        this.catalogVersion = data.catalog_version;
+      }
       this.emit('message', data);
     });
 
@@ -75,7 +96,13 @@ class ChatbotWebSocket {
       this.emit('error', data);
     });
 
+    // A message was rate limited, merged into a waiting one or dropped
+    this.socket.on('throttled', (data) => {
+      this.emit('throttled', data);
+    });
+
     this.socket.on('symptoms_list', (data) => {
+      localStorage.setItem(SYMPTOM_CATALOG_KEY, JSON.stringify(data));
       this.emit('symptoms', data);
     });
 
@@ -103,6 +130,12 @@ class ChatbotWebSocket {
   }
 
   getSymptoms() {
+    // Only ask the server when the greeting announced a catalog we have not cached
+    const cached = readCachedCatalog();
+    if (cached && this.catalogVersion && cached.version === this.catalogVersion) {
+      this.emit('symptoms', cached);
+      return true;
+    }
     if (this.socket && this.isConnected) {
       this.socket.emit('get_symptoms');
       return true;
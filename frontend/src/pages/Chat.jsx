@@ -113,6 +113,23 @@ const Chat = () => {
       setIsTyping(false);
     });
 
+    socketRef.current.on('throttled', (throttleData) => {
+      // A merged message is still answered together with the one it joined
+      if (throttleData.reason === 'coalesced') return;
+      const waitText = throttleData.retry_after
+        ? ` Please wait ${Math.ceil(throttleData.retry_after)}s and try again.`
+        : ' Please wait for the current answer before sending more.';
+      const throttleMessage = {
+        id: Date.now(),
+        text: `You're sending messages faster than I can answer.${waitText}`,
+        sender: 'bot',
+        timestamp: new Date().toISOString(),
+        read: true,
+        type: 'error'
+      };
+      setMessages(prevMessages => [...prevMessages, throttleMessage]);
+    });
+
     // Connect to WebSocket
     socketRef.current.connect(user?.id);
   };
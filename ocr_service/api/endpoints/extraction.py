@@ -105,7 +105,9 @@ class OCRProcessor:
                     extracted_text += text + "\n"
                 
             if extracted_text:
-                logger.info(f"Extracted Text from PDF: {extracted_text[:100]}...")  # Log just a preview
+                # Report text can identify a patient; previews are for debugging only
+                logger.info(f"Extracted text from PDF, length: {len(extracted_text)}")
+                logger.debug(f"Extracted Text from PDF: {extracted_text[:100]}...")  # Log just a preview
                 return extracted_text
             else:
                 logger.warning("No text extracted from PDF.")
@@ -155,7 +157,8 @@ class OCRProcessor:
                     text = pytesseract.image_to_string(image, config=custom_config)
                     
                     if text:
-                        logger.info(f"Extracted Text from image: {text[:100]}...")
+                        logger.info(f"Extracted text from image, length: {len(text)}")
+                        logger.debug(f"Extracted Text from image: {text[:100]}...")
                         return text
                     else:
                         logger.warning("No text extracted from image.")
@@ -0,0 +1,168 @@
+"""
+Queued, sampled logging for the OCR service.
+
+Handlers only put records on a bounded queue and a listener thread writes
+them, so a slow or contended stdout never stalls a request. Records that
+arrive while the queue is full are dropped and counted instead of blocking.
+Uvicorn's own loggers are routed through the same queue.
+
+Configured from the environment:
+
+    LOG_LEVEL          root level (default DEBUG when DEBUG=true, otherwise INFO)
+    LOG_LEVELS         per-logger levels, e.g. "uvicorn.access=WARNING"
+    LOG_SAMPLE_RATES   share of records kept per logger, e.g. "uvicorn.access=0.1"
+    LOG_QUEUE_SIZE     records buffered before dropping (default 10000)
+
+Sampling never drops warnings or errors.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Callable, Dict, List, Mapping, Optional, TextIO, TypeVar
+
+T = TypeVar("T")
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+DEFAULT_QUEUE_SIZE = 10000
+# Loggers uvicorn configures with handlers of its own before the app is imported
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_sampled: set = set()
+
+
+def parse_settings(spec: Optional[str], convert: Callable[[str], T]) -> Dict[str, T]:
+    """Parse "name=value,name=value" into a dict, converting each value"""
+    settings: Dict[str, T] = {}
+    for entry in (spec or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, value = entry.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Expected name=value, got {entry!r}")
+        settings[name.strip()] = convert(value.strip())
+    return settings
+
+
+def parse_level(value: str) -> int:
+    level = logging.getLevelName(value.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level {value!r}")
+    return level
+
+
+def parse_rate(value: str) -> float:
+    rate = float(value)
+    if not 0 <= rate <= 1:
+        raise ValueError(f"Sample rate must be between 0 and 1, got {value!r}")
+    return rate
+
+
+class SampleFilter(logging.Filter):
+    """Keep an even `rate` share of records below WARNING; warnings and errors always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._seen = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            self._seen += 1
+            seen = self._seen
+        # Kept whenever seen * rate crosses an integer
+        return int(seen * self.rate) > int((seen - 1) * self.rate)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops and counts records instead of blocking on a full queue"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def stop_logging() -> None:
+    """Flush the queue and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    """Records dropped because the log queue was full"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def setup_logging(
+    environ: Mapping[str, str] = os.environ,
+    debug: bool = False,
+    stream: Optional[TextIO] = None,
+) -> DroppingQueueHandler:
+    """
+    Route every log record through the queue, apply per-logger levels and
+    sample rates from the environment; calling it again reconfigures
+    """
+    global _queue_handler, _listener
+    levels = parse_settings(environ.get("LOG_LEVELS"), parse_level)
+    rates = parse_settings(environ.get("LOG_SAMPLE_RATES"), parse_rate)
+    root_level = parse_level(environ.get("LOG_LEVEL", "DEBUG" if debug else "INFO"))
+    queue_size = int(environ.get("LOG_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+
+    stop_logging()
+    log_queue: queue.Queue = queue.Queue(queue_size)
+    if _queue_handler is None:
+        _queue_handler = DroppingQueueHandler(log_queue)
+    else:
+        _queue_handler.queue = log_queue
+    output = logging.StreamHandler(stream)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(root_level)
+
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        for handler in list(uvicorn_logger.handlers):
+            uvicorn_logger.removeHandler(handler)
+        uvicorn_logger.propagate = True
+
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    stale: List[str] = list(_sampled | set(rates))
+    for name in stale:
+        target = logging.getLogger(name)
+        for old in [f for f in target.filters if isinstance(f, SampleFilter)]:
+            target.removeFilter(old)
+    _sampled.clear()
+    for name, rate in rates.items():
+        if rate < 1:
+            # Logger filters see only records logged on that exact logger, not its children
+            logging.getLogger(name).addFilter(SampleFilter(rate))
+            _sampled.add(name)
+    return _queue_handler
+
+
+atexit.register(stop_logging)
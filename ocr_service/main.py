@@ -2,31 +2,30 @@ from fastapi import FastAPI
 import logging
 import os
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+from core.config import settings
+from core.log_config import setup_logging
+
+# Configure logging; records are written by a background thread
+setup_logging(debug=settings.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Debug: Print environment variables to help diagnose issues
-logger.info("==== DEBUG: Environment Variables ====")
-logger.info(f"GEMINI_API_KEY exists: {'Yes' if 'GEMINI_API_KEY' in os.environ else 'No'}")
-logger.info(f"GEMINI_MODEL: {os.environ.get('GEMINI_MODEL', 'Not found')}")
-logger.info(f"DEBUG setting: {os.environ.get('DEBUG', 'Not found')}")
-logger.info("==== End Environment Debug ====")
+# Debug: Log environment variables to help diagnose issues
+logger.debug("==== DEBUG: Environment Variables ====")
+logger.debug(f"GEMINI_API_KEY exists: {'Yes' if 'GEMINI_API_KEY' in os.environ else 'No'}")
+logger.debug(f"GEMINI_MODEL: {os.environ.get('GEMINI_MODEL', 'Not found')}")
+logger.debug(f"DEBUG setting: {os.environ.get('DEBUG', 'Not found')}")
+logger.debug("==== End Environment Debug ====")
 
 # Import API endpoints
 from api.endpoints.ocr import router as ocr_router
 from api.endpoints.extraction import router as extraction_router
-from core.config import settings
 
-# Debug: Print settings values
-logger.info("==== DEBUG: Settings Values ====")
-logger.info(f"settings.GEMINI_API_KEY exists: {'Yes' if settings.GEMINI_API_KEY else 'No'}")
-logger.info(f"settings.GEMINI_MODEL: {settings.GEMINI_MODEL}")
-logger.info(f"settings.DEBUG: {settings.DEBUG}")
-logger.info("==== End Settings Debug ====")
+# Debug: Log settings values
+logger.debug("==== DEBUG: Settings Values ====")
+logger.debug(f"settings.GEMINI_API_KEY exists: {'Yes' if settings.GEMINI_API_KEY else 'No'}")
+logger.debug(f"settings.GEMINI_MODEL: {settings.GEMINI_MODEL}")
+logger.debug(f"settings.DEBUG: {settings.DEBUG}")
+logger.debug("==== End Settings Debug ====")
 
 # Create FastAPI app
 app = FastAPI(
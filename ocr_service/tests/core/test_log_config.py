@@ -0,0 +1,52 @@
+import io
+import logging
+
+import pytest
+
+from core import log_config
+from core.log_config import DroppingQueueHandler, SampleFilter, parse_level, parse_settings, setup_logging
+
+
+@pytest.fixture
+def log_stream():
+    """Set up logging into a buffer; restore the default setup afterwards"""
+    stream = io.StringIO()
+    yield stream
+    setup_logging({})
+
+
+def test_parse_settings():
+    assert parse_settings("uvicorn.access=warning", parse_level) == {"uvicorn.access": logging.WARNING}
+    with pytest.raises(ValueError):
+        parse_settings("uvicorn.access", parse_level)
+
+
+def test_sample_filter_keeps_rate_share_and_all_warnings():
+    sample = SampleFilter(0.1)
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+    assert sum(sample.filter(record) for _ in range(100)) == 10
+    record.levelno = logging.ERROR
+    assert all(sample.filter(record) for _ in range(10))
+
+
+def test_uvicorn_access_log_is_queued_and_sampled(log_stream):
+    access = logging.getLogger("uvicorn.access")
+    direct = io.StringIO()
+    access.addHandler(logging.StreamHandler(direct))
+    access.propagate = False
+
+    handler = setup_logging({"LOG_SAMPLE_RATES": "uvicorn.access=0.5"}, stream=log_stream)
+    assert isinstance(handler, DroppingQueueHandler)
+    for i in range(10):
+        access.info('%s - "%s %s HTTP/%s" %d', "127.0.0.1:5000", "GET", f"/health/{i}", "1.1", 200)
+    log_config.stop_logging()
+
+    assert direct.getvalue() == ""
+    assert log_stream.getvalue().count('"GET /health/') == 5
+
+
+def test_debug_setting_lowers_root_level(log_stream):
+    setup_logging({}, debug=True, stream=log_stream)
+    assert logging.getLogger().level == logging.DEBUG
+    setup_logging({"LOG_LEVEL": "WARNING"}, debug=True, stream=log_stream)
+    assert logging.getLogger().level == logging.WARNING
@@ -32,14 +32,11 @@ class AIProcessor:
         if GEMINI_AVAILABLE and self.api_key:
             genai.configure(api_key=self.api_key)
     
-    def _print_debug_response(self, title, content):
-        """Print debug response if debug mode is enabled."""
+    def _log_debug_response(self, title, content):
+        """Log debug response as one record if debug mode is enabled."""
         if settings.DEBUG:
-            print("\n" + "=" * 80)
-            print(f"DEBUG - {title}")
-            print("=" * 80)
-            print(content)
-            print("=" * 80 + "\n")
+            rule = "=" * 80
+            logger.debug(f"\n{rule}\nDEBUG - {title}\n{rule}\n{content}\n{rule}\n")
 
     async def process_text_with_ai_async(self, text: str) -> Dict[str, Any]:
         """
@@ -57,8 +54,8 @@ class AIProcessor:
             return await self.structure_medical_data(text)
         
         try:
-            # Debug print - input text
-            self._print_debug_response("INPUT TEXT", text[:500] + "..." if len(text) > 500 else text)
+            # Debug log - input text
+            self._log_debug_response("INPUT TEXT", text[:500] + "..." if len(text) > 500 else text)
             
             # Prepare system prompt for medical data extraction
             # This now includes specific formatting to match the Django models
@@ -153,8 +150,8 @@ class AIProcessor:
             # Extract response content
             response_content = response.text
             
-            # Debug print - raw response from Gemini
-            self._print_debug_response("RAW GEMINI RESPONSE", response_content)
+            # Debug log - raw response from Gemini
+            self._log_debug_response("RAW GEMINI RESPONSE", response_content)
             
             # Clean up the response to ensure it's valid JSON
             # Remove code block markers if present
@@ -174,8 +171,9 @@ class AIProcessor:
             # Parse the JSON response
             structured_data = json.loads(response_content)
             
-            # Debug print - parsed JSON
-            self._print_debug_response("PARSED JSON RESPONSE", json.dumps(structured_data, indent=2))
+            # Debug log - parsed JSON, only serialized when it will be logged
+            if settings.DEBUG:
+                self._log_debug_response("PARSED JSON RESPONSE", json.dumps(structured_data, indent=2))
             
             # Convert to format for backend if needed
             backend_format = self._convert_to_backend_format(structured_data)
@@ -187,8 +185,8 @@ class AIProcessor:
             logger.error(error_msg)
             logger.error(f"Raw response received: {response_content[:500]}...")
             
-            # Debug print - JSON error
-            self._print_debug_response("JSON DECODE ERROR", 
+            # Debug log - JSON error
+            self._log_debug_response("JSON DECODE ERROR", 
                                 f"Error: {str(json_err)}\n\nRaw response: {response_content}")
             
             # Fallback to non-AI processing
@@ -198,8 +196,8 @@ class AIProcessor:
             error_msg = f"Error processing text with Gemini AI: {str(e)}"
             logger.exception(error_msg)
             
-            # Debug print - general error
-            self._print_debug_response("PROCESSING ERROR", str(e))
+            # Debug log - general error
+            self._log_debug_response("PROCESSING ERROR", str(e))
             
             # Fallback to non-AI processing
             return await self.structure_medical_data(text)